@@ -0,0 +1,28 @@
+"""Speaker voice embeddings
+
+Revision ID: 2d6a8f3e1b74
+Revises: 9e4f1c27a8b3
+Create Date: 2026-10-18 22:17:05.473019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d6a8f3e1b74'
+down_revision: Union[str, None] = '9e4f1c27a8b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('dialogs', sa.Column('speaker_confidence', sa.Float(), nullable=True))
+    op.add_column('players', sa.Column('voice_embedding', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('players', 'voice_embedding')
+    op.drop_column('dialogs', 'speaker_confidence')
@@ -0,0 +1,50 @@
+"""Dialog timestamps in milliseconds
+
+Revision ID: 4d8a2f61b9e7
+Revises: 7c1e4b92d0f3
+Create Date: 2026-10-18 14:05:47.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d8a2f61b9e7'
+down_revision: Union[str, None] = '7c1e4b92d0f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('dialogs', sa.Column('start_ms', sa.Integer(), nullable=True))
+    op.add_column('dialogs', sa.Column('end_ms', sa.Integer(), nullable=True))
+    # "HH:MM:SS" -> millisecondes
+    op.execute(
+        'UPDATE dialogs SET '
+        'start_ms = (extract(epoch FROM start::interval) * 1000)::integer, '
+        'end_ms = (extract(epoch FROM "end"::interval) * 1000)::integer'
+    )
+    op.alter_column('dialogs', 'start_ms', nullable=False)
+    op.drop_column('dialogs', 'start')
+    op.drop_column('dialogs', 'end')
+    op.create_index(
+        'ix_dialogs_session_id_start_ms', 'dialogs', ['session_id', 'start_ms']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_dialogs_session_id_start_ms', table_name='dialogs')
+    op.add_column('dialogs', sa.Column('start', sa.VARCHAR(length=8), nullable=True))
+    op.add_column('dialogs', sa.Column('end', sa.VARCHAR(length=8), nullable=True))
+    # Les millisecondes sont perdues : retour à la seconde
+    op.execute(
+        'UPDATE dialogs SET '
+        "start = to_char(start_ms / 1000 * interval '1 second', 'HH24:MI:SS'), "
+        "\"end\" = to_char(end_ms / 1000 * interval '1 second', 'HH24:MI:SS')"
+    )
+    op.alter_column('dialogs', 'start', nullable=False)
+    op.drop_column('dialogs', 'start_ms')
+    op.drop_column('dialogs', 'end_ms')
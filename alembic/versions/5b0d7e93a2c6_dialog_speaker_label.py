@@ -0,0 +1,26 @@
+"""Dialog speaker label
+
+Revision ID: 5b0d7e93a2c6
+Revises: c84e2b6f1d09
+Create Date: 2026-10-18 19:12:08.644302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0d7e93a2c6'
+down_revision: Union[str, None] = 'c84e2b6f1d09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('dialogs', sa.Column('speaker_label', sa.String(length=50), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('dialogs', 'speaker_label')
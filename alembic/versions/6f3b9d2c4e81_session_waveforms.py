@@ -0,0 +1,40 @@
+"""Session waveforms
+
+Revision ID: 6f3b9d2c4e81
+Revises: 2d6a8f3e1b74
+Create Date: 2026-10-18 23:41:52.906114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f3b9d2c4e81'
+down_revision: Union[str, None] = '2d6a8f3e1b74'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('waveforms',
+    sa.Column('session_id', sa.Integer(), nullable=False),
+    sa.Column('zoom', sa.SmallInteger(), nullable=False),
+    sa.Column('samples_per_peak', sa.Integer(), nullable=False),
+    sa.Column('sample_rate', sa.Integer(), nullable=False),
+    sa.Column('peaks8', sa.LargeBinary(), nullable=False),
+    sa.Column('peaks16', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('session_id', 'zoom')
+    )
+    # Les pics se compressent mal : les stocker sans compression évite de
+    # les décompresser à chaque lecture
+    op.execute("ALTER TABLE waveforms ALTER COLUMN peaks8 SET STORAGE EXTERNAL")
+    op.execute("ALTER TABLE waveforms ALTER COLUMN peaks16 SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    op.drop_table('waveforms')
@@ -0,0 +1,58 @@
+"""Add indexes for query patterns
+
+Revision ID: 7c1e4b92d0f3
+Revises: a378ad10d13d
+Create Date: 2026-10-18 10:30:12.418530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4b92d0f3'
+down_revision: Union[str, None] = 'a378ad10d13d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nom de l'index, table, colonnes)
+INDEXES = [
+    # Couvre aussi les recherches sur dialogs.session_id seul
+    ('ix_dialogs_session_id_order', 'dialogs', ['session_id', 'order', 'id']),
+    ('ix_dialogs_speaker_id', 'dialogs', ['speaker_id']),
+    ('ix_sessions_campaign_id', 'sessions', ['campaign_id']),
+    ('ix_players_user_id', 'players', ['user_id']),
+    ('ix_campaigns_mj_id', 'campaigns', ['mj_id']),
+    ('ix_campaigns_created_by', 'campaigns', ['created_by']),
+    ('ix_campaign_users_user_id', 'campaign_users', ['user_id']),
+    ('ix_campaign_players_player_id', 'campaign_players', ['player_id']),
+    ('ix_campaign_npcs_npc_id', 'campaign_npcs', ['npc_id']),
+    ('ix_session_players_player_id', 'session_players', ['player_id']),
+    ('ix_session_npcs_npc_id', 'session_npcs', ['npc_id']),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY ne peut pas s'exécuter dans une transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,27 @@
+"""Session speech segments
+
+Revision ID: 9e4f1c27a8b3
+Revises: 5b0d7e93a2c6
+Create Date: 2026-10-18 21:03:41.218937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4f1c27a8b3'
+down_revision: Union[str, None] = '5b0d7e93a2c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('sessions', sa.Column('speech_segments', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('sessions', 'speech_segments')
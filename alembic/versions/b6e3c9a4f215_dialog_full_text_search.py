@@ -0,0 +1,52 @@
+"""Dialog full-text search
+
+Revision ID: b6e3c9a4f215
+Revises: 4d8a2f61b9e7
+Create Date: 2026-10-18 15:12:09.318876
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e3c9a4f215'
+down_revision: Union[str, None] = '4d8a2f61b9e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'dialogs',
+        sa.Column(
+            'content_tsv',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('french', content)", persisted=True),
+            nullable=True,
+        ),
+    )
+    # CREATE INDEX CONCURRENTLY ne peut pas s'exécuter dans une transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_dialogs_content_tsv',
+            'dialogs',
+            ['content_tsv'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_dialogs_content_tsv',
+            table_name='dialogs',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('dialogs', 'content_tsv')
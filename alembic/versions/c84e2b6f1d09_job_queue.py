@@ -0,0 +1,51 @@
+"""Job queue
+
+Revision ID: c84e2b6f1d09
+Revises: f1a9d3b07c42
+Create Date: 2026-10-18 18:05:41.270153
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c84e2b6f1d09'
+down_revision: Union[str, None] = 'f1a9d3b07c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+job_status = postgresql.ENUM('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', name='jobstatus')
+
+
+def upgrade() -> None:
+    op.create_table('jobs',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('type', sa.String(length=100), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), server_default=sa.text("'{}'::jsonb"), nullable=False),
+    sa.Column('status', job_status, nullable=False),
+    sa.Column('priority', sa.Integer(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('run_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('worker', sa.String(length=255), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_queue', 'jobs', [sa.text('priority DESC'), 'run_at', 'id'], unique=False, postgresql_where=sa.text("status = 'QUEUED'"))
+    op.create_index('ix_jobs_running', 'jobs', ['type', 'heartbeat_at'], unique=False, postgresql_where=sa.text("status = 'RUNNING'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_running', table_name='jobs', postgresql_where=sa.text("status = 'RUNNING'"))
+    op.drop_index('ix_jobs_queue', table_name='jobs', postgresql_where=sa.text("status = 'QUEUED'"))
+    op.drop_table('jobs')
+    job_status.drop(op.get_bind(), checkfirst=False)
@@ -0,0 +1,53 @@
+"""Trigram search for players and NPCs
+
+Revision ID: e2f70d5c8a13
+Revises: b6e3c9a4f215
+Create Date: 2026-10-18 16:02:33.571204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f70d5c8a13'
+down_revision: Union[str, None] = 'b6e3c9a4f215'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nom de l'index, table, définition) ; les expressions doivent rester
+# identiques à celles des modèles (app.db.models.base.search_text)
+INDEXES = [
+    (
+        'ix_npcs_search_text_trgm',
+        'npcs',
+        "USING gist ((name || ' ' || race || ' ' || coalesce(class_name, '')) "
+        "gist_trgm_ops)",
+    ),
+    ('ix_npcs_name_prefix', 'npcs', '((lower(name) COLLATE "C"))'),
+    (
+        'ix_players_search_text_trgm',
+        'players',
+        "USING gist ((name || ' ' || race || ' ' || class_name) gist_trgm_ops)",
+    ),
+    ('ix_players_name_prefix', 'players', '((lower(name) COLLATE "C"))'),
+]
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CREATE INDEX CONCURRENTLY ne peut pas s'exécuter dans une transaction
+    with op.get_context().autocommit_block():
+        for name, table, definition in INDEXES:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {definition}'
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+    # L'extension pg_trgm est conservée : d'autres objets peuvent en dépendre
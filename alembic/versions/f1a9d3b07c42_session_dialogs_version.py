@@ -0,0 +1,27 @@
+"""Session dialogs version
+
+Revision ID: f1a9d3b07c42
+Revises: e2f70d5c8a13
+Create Date: 2026-10-18 16:42:13.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a9d3b07c42'
+down_revision: Union[str, None] = 'e2f70d5c8a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # now() est stable : PostgreSQL ajoute la colonne sans réécrire la table
+    op.add_column('sessions', sa.Column('dialogs_updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('sessions', 'dialogs_updated_at')
@@ -2,6 +2,8 @@ from fastapi import APIRouter
 
 from app.api.endpoints import campaign_controller as campaigns
 from app.api.endpoints import dialog_controller as dialogs
+from app.api.endpoints import internal_controller as internal
+from app.api.endpoints import job_controller as jobs
 from app.api.endpoints import npc_controller as npcs
 from app.api.endpoints import player_controller as players
 from app.api.endpoints import session_controller as sessions
@@ -14,3 +16,5 @@ api_router.include_router(campaigns.router, prefix="/campaigns", tags=["Campaign
 api_router.include_router(players.router, prefix="/players", tags=["Players"])
 api_router.include_router(npcs.router, prefix="/npcs", tags=["NPCs"])
 api_router.include_router(dialogs.router, prefix="/dialogs", tags=["Dialogs"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
+api_router.include_router(internal.router, prefix="/internal", tags=["Internal"])
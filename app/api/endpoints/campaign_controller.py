@@ -1,9 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud import crud_campaign
-from app.db.database import get_db
+from app.crud.crud_dialog import crud_dialog
+from app.crud.crud_job import crud_job
+from app.crud.pagination import InvalidCursorError
+from app.db.database import get_db, get_read_db
+from app.jobs.campaign import PURGE_CAMPAIGN
+from app.schemas.schema_association import AssociationResponse, AssociationUpdate
 from app.schemas.schema_campaign import CampaignCreate, CampaignResponse, CampaignUpdate
+from app.schemas.schema_dialog import DialogSearchHit
+from app.schemas.schema_job import JobAccepted
+from app.schemas.schema_pagination import Page
+from app.utils.conditional import (
+    check_not_modified,
+    make_etag,
+    set_validators,
+    version_of,
+)
 from app.utils.dependencies import verify_token
 
 router = APIRouter(dependencies=[Depends(verify_token)])
@@ -12,17 +36,19 @@ router = APIRouter(dependencies=[Depends(verify_token)])
 @router.post(
     "/create", response_model=CampaignResponse, status_code=status.HTTP_201_CREATED
 )
-def create_campaign(campaign: CampaignCreate, db: Session = Depends(get_db)):
+async def create_campaign(campaign: CampaignCreate, db: AsyncSession = Depends(get_db)):
     # Créer une nouvelle campagne
-    campaign = crud_campaign.create(db=db, obj_in=campaign)
+    campaign = await crud_campaign.create(db=db, obj_in=campaign)
     return campaign
 
 
+@router.patch("/{campaign_id}/update", response_model=CampaignResponse)
 @router.put("/{campaign_id}/update", response_model=CampaignResponse)
-def update_campaign(
-    campaign_id: int, campaign_update: CampaignUpdate, db: Session = Depends(get_db)
+async def update_campaign(
+    campaign_id: int,
+    campaign_update: CampaignUpdate,
+    db: AsyncSession = Depends(get_db),
 ):
-    # Récupérer la campagne
     """
     Mettre à jour une campagne
 
@@ -33,17 +59,16 @@ def update_campaign(
     Raises:
         HTTPException: Si la campagne n'est pas trouvée ou si vous n'êtes pas le propriétaire
     """
-    db_campaign = crud_campaign.get_by_id(db, campaign_id=campaign_id)
-    if not db_campaign:
-        raise HTTPException(status_code=404, detail="Campagne non trouvée")
-    updated_campaign = crud_campaign.update(
-        db=db, db_obj=db_campaign, obj_in=campaign_update
+    updated_campaign = await crud_campaign.update(
+        db=db, campaign_id=campaign_id, obj_in=campaign_update
     )
+    if not updated_campaign:
+        raise HTTPException(status_code=404, detail="Campagne non trouvée")
     return updated_campaign
 
 
 @router.delete("/{campaign_id}/remove", status_code=status.HTTP_204_NO_CONTENT)
-def delete_campaign(campaign_id: int, db: Session = Depends(get_db)):
+async def delete_campaign(campaign_id: int, db: AsyncSession = Depends(get_db)):
     # Récupérer la campagne
     """
     Supprimer une campagne
@@ -54,7 +79,171 @@ def delete_campaign(campaign_id: int, db: Session = Depends(get_db)):
     Raises:
         HTTPException: Si la campagne n'est pas trouvée ou si vous n'êtes pas le propriétaire
     """
-    campaign = crud_campaign.delete(db=db, campaign_id=campaign_id)
+    campaign = await crud_campaign.delete(db=db, campaign_id=campaign_id)
     if not campaign:
         raise HTTPException(status_code=404, detail="Campagne non trouvée")
     return {"detail": "Campagne supprimée avec succès"}
+
+
+@router.post(
+    "/{campaign_id}/purge",
+    response_model=JobAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def purge_campaign(campaign_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Supprimer une campagne volumineuse en tâche de fond
+
+    Répond immédiatement avec l'ID du travail, exécuté par un worker : les
+    dialogues sont supprimés par lots, puis la campagne. Une purge
+    interrompue est reprise là où elle s'est arrêtée.
+
+    Args:
+        campaign_id (int): ID de la campagne
+
+    Raises:
+        HTTPException: Si la campagne n'est pas trouvée
+    """
+    if not await crud_campaign.get_updated_at(db, campaign_id=campaign_id):
+        raise HTTPException(status_code=404, detail="Campagne non trouvée")
+    job = await crud_job.enqueue(db, PURGE_CAMPAIGN, {"campaign_id": campaign_id})
+    await db.commit()
+    return {"job_id": job.id, "detail": "Suppression de la campagne en cours"}
+
+
+@router.get("/", response_model=Page[CampaignResponse])
+async def list_campaigns(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Lister les campagnes, page par page.
+
+    Args:
+        cursor (str): Curseur `next_cursor` ou `prev_cursor` d'une page précédente.
+        limit (int): Nombre maximal d'éléments par page.
+
+    Raises:
+        HTTPException: Si le curseur est invalide.
+    """
+    try:
+        return await crud_campaign.get_multi(db, cursor=cursor, limit=limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get("/{campaign_id}", response_model=CampaignResponse)
+async def get_campaign(
+    campaign_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Récupérer une campagne. Répond 304 sans charger la campagne si la version
+    du client (If-None-Match ou If-Modified-Since) est à jour.
+
+    Args:
+        campaign_id (int): ID de la campagne
+
+    Raises:
+        HTTPException: Si la campagne n'est pas trouvée
+    """
+    updated_at = await crud_campaign.get_updated_at(db, campaign_id=campaign_id)
+    if updated_at is None:
+        raise HTTPException(status_code=404, detail="Campagne non trouvée")
+    etag = make_etag("campaign", campaign_id, version_of(updated_at))
+    not_modified = check_not_modified(request, response, etag, updated_at)
+    if not_modified:
+        return not_modified
+    campaign = await crud_campaign.get_by_id(db, campaign_id=campaign_id)
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campagne non trouvée")
+    if campaign.updated_at and campaign.updated_at != updated_at:
+        # Entrée du cache pas encore invalidée : l'ETag décrit le corps renvoyé
+        etag = make_etag("campaign", campaign_id, version_of(campaign.updated_at))
+        set_validators(response, etag, campaign.updated_at)
+    return campaign
+
+
+@router.get("/{campaign_id}/search", response_model=Page[DialogSearchHit])
+async def search_campaign_dialogs(
+    campaign_id: int,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Rechercher dans les transcriptions de toutes les sessions d'une campagne.
+
+    Args:
+        campaign_id (int): ID de la campagne
+        q (str): Texte recherché ("expression exacte", or, -exclu)
+        cursor (str): Curseur `next_cursor` ou `prev_cursor` d'une page précédente.
+        limit (int): Nombre maximal de résultats par page.
+
+    Raises:
+        HTTPException: Si la campagne n'est pas trouvée ou si le curseur est invalide.
+    """
+    if not await crud_campaign.get_by_id(db, campaign_id=campaign_id):
+        raise HTTPException(status_code=404, detail="Campagne non trouvée")
+    try:
+        return await crud_dialog.search(
+            db, campaign_id=campaign_id, query=q, cursor=cursor, limit=limit
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.post("/{campaign_id}/players/add", response_model=AssociationResponse)
+async def add_campaign_players(
+    campaign_id: int, body: AssociationUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Ajouter plusieurs joueurs à une campagne en une seule instruction SQL.
+    """
+    affected = await crud_campaign.add_players(db, campaign_id, body.ids)
+    if affected is None:
+        raise HTTPException(status_code=404, detail="Campagne non trouvée")
+    return {"requested": len(set(body.ids)), "affected": affected}
+
+
+@router.post("/{campaign_id}/players/remove", response_model=AssociationResponse)
+async def remove_campaign_players(
+    campaign_id: int, body: AssociationUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Retirer plusieurs joueurs d'une campagne en une seule instruction SQL.
+    """
+    affected = await crud_campaign.remove_players(db, campaign_id, body.ids)
+    if affected is None:
+        raise HTTPException(status_code=404, detail="Campagne non trouvée")
+    return {"requested": len(set(body.ids)), "affected": affected}
+
+
+@router.post("/{campaign_id}/npcs/add", response_model=AssociationResponse)
+async def add_campaign_npcs(
+    campaign_id: int, body: AssociationUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Ajouter plusieurs PNJs à une campagne en une seule instruction SQL.
+    """
+    affected = await crud_campaign.add_npcs(db, campaign_id, body.ids)
+    if affected is None:
+        raise HTTPException(status_code=404, detail="Campagne non trouvée")
+    return {"requested": len(set(body.ids)), "affected": affected}
+
+
+@router.post("/{campaign_id}/npcs/remove", response_model=AssociationResponse)
+async def remove_campaign_npcs(
+    campaign_id: int, body: AssociationUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Retirer plusieurs PNJs d'une campagne en une seule instruction SQL.
+    """
+    affected = await crud_campaign.remove_npcs(db, campaign_id, body.ids)
+    if affected is None:
+        raise HTTPException(status_code=404, detail="Campagne non trouvée")
+    return {"requested": len(set(body.ids)), "affected": affected}
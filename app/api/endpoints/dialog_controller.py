@@ -1,12 +1,21 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.crud_dialog import crud_dialog
-from app.db.database import get_db
-from app.schemas.schema_dialog import DialogCreate, DialogResponse, DialogUpdate
+from app.crud.crud_dialog import InvalidDialogError, crud_dialog
+from app.crud.pagination import InvalidCursorError
+from app.db.database import get_db, get_read_db
+from app.schemas.schema_dialog import (
+    DialogBulkResponse,
+    DialogCreate,
+    DialogResponse,
+    DialogUpdate,
+)
+from app.schemas.schema_pagination import Page
+from app.utils.conditional import check_not_modified, make_etag, version_of
 from app.utils.dependencies import verify_token
+from app.utils.streaming import iter_json_records
 
 router = APIRouter(dependencies=[Depends(verify_token)])
 
@@ -14,54 +23,137 @@ router = APIRouter(dependencies=[Depends(verify_token)])
 @router.post(
     "/create", response_model=DialogResponse, status_code=status.HTTP_201_CREATED
 )
-def create_dialog(dialog_in: DialogCreate, db: Session = Depends(get_db)):
+async def create_dialog(dialog_in: DialogCreate, db: AsyncSession = Depends(get_db)):
     """
     Créer un dialogue.
     """
-    dialog = crud_dialog.create(db=db, obj_in=dialog_in)
+    dialog = await crud_dialog.create(db=db, obj_in=dialog_in)
     return dialog
 
 
+@router.post(
+    "/bulk", response_model=DialogBulkResponse, status_code=status.HTTP_201_CREATED
+)
+async def create_dialogs_bulk(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Importer une transcription complète en une seule transaction.
+
+    Le corps est lu au fil de l'eau : un tableau JSON de `DialogCreate`, ou du
+    NDJSON (`Content-Type: application/x-ndjson`, un objet par ligne).
+    Seuls les compteurs sont renvoyés.
+    """
+    ndjson = "ndjson" in request.headers.get("content-type", "")
+    try:
+        return await crud_dialog.bulk_create(
+            db, iter_json_records(request.stream(), ndjson=ndjson)
+        )
+    except InvalidDialogError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
 @router.get("/{dialog_id}", response_model=DialogResponse)
-def get_dialog(dialog_id: int, db: Session = Depends(get_db)):
+async def get_dialog(
+    dialog_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+):
     """
-    Récupérer un dialogue par son ID.
+    Récupérer un dialogue par son ID. Sa version est celle de la transcription
+    de sa session : 304 sans charger le dialogue si elle n'a pas changé.
     """
-    dialog = crud_dialog.get_by_id(db, dialog_id=dialog_id)
-    if not dialog:
+    updated_at = await crud_dialog.get_version(db, dialog_id=dialog_id)
+    if updated_at is None:
         raise HTTPException(status_code=404, detail="Dialog not found")
-    return dialog
+    etag = make_etag("dialog", dialog_id, version_of(updated_at))
+    not_modified = check_not_modified(request, response, etag, updated_at)
+    if not_modified:
+        return not_modified
+    return await crud_dialog.get_by_id(db, dialog_id=dialog_id)
 
 
 @router.get("/session/{session_id}", response_model=List[DialogResponse])
-def get_dialogs_by_session(session_id: int, db: Session = Depends(get_db)):
+async def get_dialogs_by_session(
+    session_id: int,
+    request: Request,
+    response: Response,
+    from_ms: Optional[int] = Query(None, alias="from", ge=0),
+    to_ms: Optional[int] = Query(None, alias="to", ge=0),
+    db: AsyncSession = Depends(get_read_db),
+):
     """
-    Récupérer tous les dialogues d'une session.
+    Récupérer tous les dialogues d'une session, ou seulement ceux qui
+    chevauchent la fenêtre de lecture `from`-`to` (en millisecondes).
+
+    La liste est versionnée par la dernière modification des dialogues de la
+    session : 304 sans requête sur les dialogues si elle n'a pas changé.
     """
-    dialogs = crud_dialog.get_by_session(db, session_id=session_id)
-    return dialogs
+    windowed = from_ms is not None or to_ms is not None
+    if windowed and (from_ms is None or to_ms is None or to_ms <= from_ms):
+        raise HTTPException(
+            status_code=400,
+            detail="Les paramètres from et to sont requis ensemble, avec from < to",
+        )
+    updated_at = await crud_dialog.get_session_version(db, session_id=session_id)
+    if updated_at is None:
+        # Session inconnue : liste vide, comme auparavant
+        return []
+    parts = ("dialogs", session_id, version_of(updated_at))
+    if windowed:
+        parts += (from_ms, to_ms)
+    not_modified = check_not_modified(request, response, make_etag(*parts), updated_at)
+    if not_modified:
+        return not_modified
+    if not windowed:
+        return await crud_dialog.get_by_session(db, session_id=session_id)
+    return await crud_dialog.get_in_window(
+        db, session_id=session_id, from_ms=from_ms, to_ms=to_ms
+    )
 
 
+@router.patch("/{dialog_id}/update", response_model=DialogResponse)
 @router.put("/{dialog_id}/update", response_model=DialogResponse)
-def update_dialog(
-    dialog_id: int, dialog_in: DialogUpdate, db: Session = Depends(get_db)
+async def update_dialog(
+    dialog_id: int, dialog_in: DialogUpdate, db: AsyncSession = Depends(get_db)
 ):
     """
     Mettre à jour un dialogue par son ID.
     """
-    db_dialog = crud_dialog.get_by_id(db, dialog_id=dialog_id)
-    if not db_dialog:
+    updated_dialog = await crud_dialog.update(
+        db=db, dialog_id=dialog_id, obj_in=dialog_in
+    )
+    if not updated_dialog:
         raise HTTPException(status_code=404, detail="Dialog not found")
-    updated_dialog = crud_dialog.update(db=db, db_obj=db_dialog, obj_in=dialog_in)
     return updated_dialog
 
 
 @router.delete("/{dialog_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_dialog(dialog_id: int, db: Session = Depends(get_db)):
+async def delete_dialog(dialog_id: int, db: AsyncSession = Depends(get_db)):
     """
     Supprimer un dialogue par son ID.
     """
-    dialog = crud_dialog.delete(db=db, dialog_id=dialog_id)
+    dialog = await crud_dialog.delete(db=db, dialog_id=dialog_id)
     if not dialog:
         raise HTTPException(status_code=404, detail="Dialog not found")
     return {"detail": "Dialog deleted successfully"}
+
+
+@router.get("/", response_model=Page[DialogResponse])
+async def list_dialogs(
+    session_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Lister les dialogues page par page, dans l'ordre (session, ordre),
+    éventuellement pour une seule session.
+    """
+    try:
+        return await crud_dialog.get_multi(
+            db, session_id=session_id, cursor=cursor, limit=limit
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
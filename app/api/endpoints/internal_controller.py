@@ -0,0 +1,32 @@
+from typing import Literal
+
+from fastapi import APIRouter
+
+from app.db.cache import entity_cache
+from app.db.pool import get_pool_status
+from app.db.session import engine, replica_engine
+from app.schemas.schema_cache import CacheStatusResponse
+from app.schemas.schema_pool import PoolStatusResponse
+from app.schemas.schema_user import UserRole
+from app.utils.dependencies import require_role
+
+router = APIRouter(dependencies=[require_role(UserRole.admin)])
+
+
+@router.get("/db-pool", response_model=PoolStatusResponse)
+async def get_db_pool_status(target: Literal["primary", "replica"] = "primary"):
+    """
+    Exposer l'occupation du pool de connexions et les temps d'attente mesurés,
+    pour dimensionner DB_POOL_SIZE / DB_MAX_OVERFLOW à partir de données réelles.
+    """
+    selected = replica_engine if target == "replica" else engine
+    return get_pool_status(selected.sync_engine.pool)
+
+
+@router.get("/cache", response_model=CacheStatusResponse)
+async def get_cache_status():
+    """
+    Exposer les compteurs du cache des entités de ce worker (succès, échecs,
+    évictions, invalidations reçues).
+    """
+    return entity_cache.status()
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.crud_job import crud_job
+from app.db.database import get_db
+from app.schemas.schema_job import JobResponse
+from app.utils.dependencies import verify_token
+
+router = APIRouter(dependencies=[Depends(verify_token)])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Suivre l'état d'un travail en file d'attente.
+
+    Lu sur le primaire : interrogé en boucle par le client, l'état ne doit
+    pas revenir en arrière à cause du retard de la réplique.
+    """
+    job = await crud_job.get_by_id(db, job_id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Travail non trouvé")
+    return job
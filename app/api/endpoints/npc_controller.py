@@ -1,34 +1,153 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud import crud_npc
-from app.db.database import get_db
+from app.crud.pagination import InvalidCursorError
+from app.db.database import get_db, get_read_db
+from app.schemas.schema_association import AssociationResponse, AssociationUpdate
 from app.schemas.schema_npc import NPCCreate, NPCResponse, NPCUpdate
+from app.schemas.schema_pagination import Page
+from app.schemas.schema_search import SearchMatch
 from app.utils.dependencies import verify_token
 
 router = APIRouter(dependencies=[Depends(verify_token)])
 
 
 @router.post("/create", response_model=NPCResponse, status_code=status.HTTP_201_CREATED)
-def create_npc(npc_data: NPCCreate, db: Session = Depends(get_db)):
+async def create_npc(npc_data: NPCCreate, db: AsyncSession = Depends(get_db)):
     # Créer un nouveau PNJ
-    npc = crud_npc.create(db=db, obj_in=npc_data)
+    npc = await crud_npc.create(db=db, obj_in=npc_data)
     return npc
 
 
+@router.patch("/{npc_id}", response_model=NPCResponse)
 @router.put("/{npc_id}", response_model=NPCResponse)
-def update_npc(npc_id: int, npc_update: NPCUpdate, db: Session = Depends(get_db)):
-    # Récupérer le PNJ
-    db_npc = crud_npc.get_by_id(db, npc_id=npc_id)
-    if not db_npc:
+async def update_npc(
+    npc_id: int, npc_update: NPCUpdate, db: AsyncSession = Depends(get_db)
+):
+    updated_npc = await crud_npc.update(db=db, npc_id=npc_id, obj_in=npc_update)
+    if not updated_npc:
         raise HTTPException(status_code=404, detail="PNJ non trouvé")
-    updated_npc = crud_npc.update(db=db, db_obj=db_npc, obj_in=npc_update)
     return updated_npc
 
 
 @router.delete("/{npc_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_npc(npc_id: int, db: Session = Depends(get_db)):
-    npc = crud_npc.delete(db=db, npc_id=npc_id)
+async def delete_npc(npc_id: int, db: AsyncSession = Depends(get_db)):
+    npc = await crud_npc.delete(db=db, npc_id=npc_id)
     if not npc:
         raise HTTPException(status_code=404, detail="PNJ non trouvé")
     return {"detail": "PNJ supprimé avec succès"}
+
+
+@router.get("/", response_model=Page[NPCResponse])
+async def list_npcs(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Lister les PNJs, page par page.
+
+    Args:
+        cursor (str): Curseur `next_cursor` ou `prev_cursor` d'une page précédente.
+        limit (int): Nombre maximal d'éléments par page.
+
+    Raises:
+        HTTPException: Si le curseur est invalide.
+    """
+    try:
+        return await crud_npc.get_multi(db, cursor=cursor, limit=limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get("/search", response_model=List[SearchMatch])
+async def search_npcs(
+    q: str = Query(..., min_length=1, max_length=100),
+    campaign_id: Optional[int] = None,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Rechercher des PNJs par nom, race ou classe, en tolérant les fautes.
+
+    Args:
+        q (str): Texte saisi.
+        campaign_id (int): Limiter la recherche aux PNJs de cette campagne.
+        limit (int): Nombre maximal de résultats, du plus proche au plus éloigné.
+    """
+    return await crud_npc.search(db, query=q, campaign_id=campaign_id, limit=limit)
+
+
+@router.get("/autocomplete", response_model=List[SearchMatch])
+async def autocomplete_npcs(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    campaign_id: Optional[int] = None,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Proposer les PNJs dont le nom commence par la saisie.
+
+    Args:
+        prefix (str): Début du nom.
+        campaign_id (int): Limiter aux PNJs de cette campagne.
+        limit (int): Nombre maximal de propositions, par ordre alphabétique.
+    """
+    return await crud_npc.autocomplete(
+        db, prefix=prefix, campaign_id=campaign_id, limit=limit
+    )
+
+
+@router.post("/{npc_id}/campaigns/add", response_model=AssociationResponse)
+async def add_npc_campaigns(
+    npc_id: int, body: AssociationUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Ajouter plusieurs campagnes à un PNJ en une seule instruction SQL.
+    """
+    affected = await crud_npc.add_campaigns(db, npc_id, body.ids)
+    if affected is None:
+        raise HTTPException(status_code=404, detail="PNJ non trouvé")
+    return {"requested": len(set(body.ids)), "affected": affected}
+
+
+@router.post("/{npc_id}/campaigns/remove", response_model=AssociationResponse)
+async def remove_npc_campaigns(
+    npc_id: int, body: AssociationUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Retirer plusieurs campagnes d'un PNJ en une seule instruction SQL.
+    """
+    affected = await crud_npc.remove_campaigns(db, npc_id, body.ids)
+    if affected is None:
+        raise HTTPException(status_code=404, detail="PNJ non trouvé")
+    return {"requested": len(set(body.ids)), "affected": affected}
+
+
+@router.post("/{npc_id}/sessions/add", response_model=AssociationResponse)
+async def add_npc_sessions(
+    npc_id: int, body: AssociationUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Ajouter plusieurs sessions à un PNJ en une seule instruction SQL.
+    """
+    affected = await crud_npc.add_sessions(db, npc_id, body.ids)
+    if affected is None:
+        raise HTTPException(status_code=404, detail="PNJ non trouvé")
+    return {"requested": len(set(body.ids)), "affected": affected}
+
+
+@router.post("/{npc_id}/sessions/remove", response_model=AssociationResponse)
+async def remove_npc_sessions(
+    npc_id: int, body: AssociationUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Retirer plusieurs sessions d'un PNJ en une seule instruction SQL.
+    """
+    affected = await crud_npc.remove_sessions(db, npc_id, body.ids)
+    if affected is None:
+        raise HTTPException(status_code=404, detail="PNJ non trouvé")
+    return {"requested": len(set(body.ids)), "affected": affected}
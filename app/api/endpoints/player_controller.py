@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud import crud_player
-from app.db.database import get_db
+from app.crud.pagination import InvalidCursorError
+from app.db.database import get_db, get_read_db
+from app.schemas.schema_association import AssociationResponse, AssociationUpdate
+from app.schemas.schema_pagination import Page
 from app.schemas.schema_player import PlayerCreate, PlayerResponse, PlayerUpdate
+from app.schemas.schema_search import SearchMatch
+from app.services.player_service import PlayerService
+from app.services.session_service import SessionService
 from app.utils.dependencies import verify_token
 
 router = APIRouter(dependencies=[Depends(verify_token)])
@@ -12,7 +20,7 @@ router = APIRouter(dependencies=[Depends(verify_token)])
 @router.post(
     "/create", response_model=PlayerResponse, status_code=status.HTTP_201_CREATED
 )
-def create_player(player_data: PlayerCreate, db: Session = Depends(get_db)):
+async def create_player(player_data: PlayerCreate, db: AsyncSession = Depends(get_db)):
     # Créer un nouveau joueur
     """
     Crée un nouveau personnage
@@ -28,15 +36,15 @@ def create_player(player_data: PlayerCreate, db: Session = Depends(get_db)):
     Raises:
         HTTPException: Si le personnage n'est pas créé (par exemple, si le nom est déjà pris)
     """
-    player = crud_player.create(db=db, obj_in=player_data)
+    player = await crud_player.create(db=db, obj_in=player_data)
     return player
 
 
+@router.patch("/{player_id}", response_model=PlayerResponse)
 @router.put("/{player_id}", response_model=PlayerResponse)
-def update_player(
-    player_id: int, player_update: PlayerUpdate, db: Session = Depends(get_db)
+async def update_player(
+    player_id: int, player_update: PlayerUpdate, db: AsyncSession = Depends(get_db)
 ):
-    # Récupérer le joueur
     """
     Mettre à jour un personnage
 
@@ -47,15 +55,16 @@ def update_player(
     Raises:
         HTTPException: Si le personnage n'est pas trouvé
     """
-    db_player = crud_player.get_by_id(db, player_id=player_id)
-    if not db_player:
+    updated_player = await crud_player.update(
+        db=db, player_id=player_id, obj_in=player_update
+    )
+    if not updated_player:
         raise HTTPException(status_code=404, detail="Joueur non trouvé")
-    updated_player = crud_player.update(db=db, db_obj=db_player, obj_in=player_update)
     return updated_player
 
 
 @router.delete("/{player_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_player(player_id: int, db: Session = Depends(get_db)):
+async def delete_player(player_id: int, db: AsyncSession = Depends(get_db)):
     # Récupérer le joueur
     """
     Supprimer un personnage
@@ -66,7 +75,149 @@ def delete_player(player_id: int, db: Session = Depends(get_db)):
     Raises:
         HTTPException: Si le personnage n'est pas trouvé ou si vous n'êtes pas le propriétaire
     """
-    player = crud_player.delete(db=db, player_id=player_id)
+    player = await crud_player.delete(db=db, player_id=player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Joueur non trouvé")
     return {"detail": "Joueur supprimé avec succès"}
+
+
+@router.put("/{player_id}/voice", status_code=status.HTTP_204_NO_CONTENT)
+async def enroll_player_voice(
+    player_id: int, request: Request, db: AsyncSession = Depends(get_db)
+):
+    """
+    Enrôler la voix d'un joueur : le corps de la requête est un échantillon
+    audio de sa voix (`Content-Type: audio/...`), d'une trentaine de
+    secondes idéalement. Son empreinte, qui remplace la précédente, sert à
+    reconnaître le joueur dans les sessions
+    (`POST /sessions/{session_id}/identify-speakers`).
+
+    Raises:
+        HTTPException: Si le joueur n'est pas trouvé, si le fichier n'est pas
+            un audio, est trop volumineux ou contient trop peu de parole.
+    """
+    SessionService.check_audio(request.headers.get("content-type"))
+    await PlayerService.enroll_voice(db, player_id, request.stream())
+
+
+@router.delete("/{player_id}/voice", status_code=status.HTTP_204_NO_CONTENT)
+async def forget_player_voice(player_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Effacer l'empreinte vocale d'un joueur.
+
+    Raises:
+        HTTPException: Si le joueur n'est pas trouvé.
+    """
+    await PlayerService.forget_voice(db, player_id)
+
+
+@router.get("/", response_model=Page[PlayerResponse])
+async def list_players(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Lister les personnages, page par page.
+
+    Args:
+        cursor (str): Curseur `next_cursor` ou `prev_cursor` d'une page précédente.
+        limit (int): Nombre maximal d'éléments par page.
+
+    Raises:
+        HTTPException: Si le curseur est invalide.
+    """
+    try:
+        return await crud_player.get_multi(db, cursor=cursor, limit=limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get("/search", response_model=List[SearchMatch])
+async def search_players(
+    q: str = Query(..., min_length=1, max_length=100),
+    campaign_id: Optional[int] = None,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Rechercher des joueurs par nom, race ou classe, en tolérant les fautes.
+
+    Args:
+        q (str): Texte saisi.
+        campaign_id (int): Limiter la recherche aux joueurs de cette campagne.
+        limit (int): Nombre maximal de résultats, du plus proche au plus éloigné.
+    """
+    return await crud_player.search(db, query=q, campaign_id=campaign_id, limit=limit)
+
+
+@router.get("/autocomplete", response_model=List[SearchMatch])
+async def autocomplete_players(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    campaign_id: Optional[int] = None,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Proposer les joueurs dont le nom commence par la saisie.
+
+    Args:
+        prefix (str): Début du nom.
+        campaign_id (int): Limiter aux joueurs de cette campagne.
+        limit (int): Nombre maximal de propositions, par ordre alphabétique.
+    """
+    return await crud_player.autocomplete(
+        db, prefix=prefix, campaign_id=campaign_id, limit=limit
+    )
+
+
+@router.post("/{player_id}/campaigns/add", response_model=AssociationResponse)
+async def add_player_campaigns(
+    player_id: int, body: AssociationUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Ajouter plusieurs campagnes à un joueur en une seule instruction SQL.
+    """
+    affected = await crud_player.add_campaigns(db, player_id, body.ids)
+    if affected is None:
+        raise HTTPException(status_code=404, detail="Joueur non trouvé")
+    return {"requested": len(set(body.ids)), "affected": affected}
+
+
+@router.post("/{player_id}/campaigns/remove", response_model=AssociationResponse)
+async def remove_player_campaigns(
+    player_id: int, body: AssociationUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Retirer plusieurs campagnes d'un joueur en une seule instruction SQL.
+    """
+    affected = await crud_player.remove_campaigns(db, player_id, body.ids)
+    if affected is None:
+        raise HTTPException(status_code=404, detail="Joueur non trouvé")
+    return {"requested": len(set(body.ids)), "affected": affected}
+
+
+@router.post("/{player_id}/sessions/add", response_model=AssociationResponse)
+async def add_player_sessions(
+    player_id: int, body: AssociationUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Ajouter plusieurs sessions à un joueur en une seule instruction SQL.
+    """
+    affected = await crud_player.add_sessions(db, player_id, body.ids)
+    if affected is None:
+        raise HTTPException(status_code=404, detail="Joueur non trouvé")
+    return {"requested": len(set(body.ids)), "affected": affected}
+
+
+@router.post("/{player_id}/sessions/remove", response_model=AssociationResponse)
+async def remove_player_sessions(
+    player_id: int, body: AssociationUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Retirer plusieurs sessions d'un joueur en une seule instruction SQL.
+    """
+    affected = await crud_player.remove_sessions(db, player_id, body.ids)
+    if affected is None:
+        raise HTTPException(status_code=404, detail="Joueur non trouvé")
+    return {"requested": len(set(body.ids)), "affected": affected}
@@ -1,20 +1,45 @@
-import cloudinary.uploader
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from sqlalchemy.orm import Session as DBSession
+from typing import Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud import crud_session
-from app.db.database import get_db
-from app.db.models.campaign_session import CampaignSession
+from app.crud.crud_waveform import PEAK_COLUMNS, crud_waveform
+from app.crud.pagination import InvalidCursorError
+from app.db.database import get_db, get_read_db
+from app.schemas.schema_association import AssociationResponse, AssociationUpdate
+from app.schemas.schema_job import JobAccepted
+from app.schemas.schema_pagination import Page
 from app.schemas.schema_session import SessionCreate, SessionResponse, SessionUpdate
+from app.services.session_service import SessionService
+from app.utils.conditional import check_not_modified, make_etag, version_of
 from app.utils.dependencies import verify_token
+from app.utils.streaming import iter_upload_file
 
 router = APIRouter(dependencies=[Depends(verify_token)])
 
+# Version du protocole d'envoi reprenable, annoncée dans chaque réponse
+TUS_HEADERS = {"Tus-Resumable": "1.0.0"}
+# Une forme d'onde demandée avec sa version ne change jamais
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
 
 @router.post(
     "/create", response_model=SessionResponse, status_code=status.HTTP_201_CREATED
 )
-def create_session(session_data: SessionCreate, db: CampaignSession = Depends(get_db)):
+async def create_session(
+    session_data: SessionCreate, db: AsyncSession = Depends(get_db)
+):
     # Vérifier si la campagne existe et appartient à l'utilisateur
     """
     Create a new session within a specific campaign.
@@ -35,17 +60,17 @@ def create_session(session_data: SessionCreate, db: CampaignSession = Depends(ge
     Raises:
         HTTPException: If the campaign is not found or if the user does not own the campaign.
     """
-    session = crud_session.create(db=db, obj_in=session_data)
+    session = await crud_session.create(db=db, obj_in=session_data)
     return session
 
 
+@router.patch("/{session_id}", response_model=SessionResponse)
 @router.put("/{session_id}", response_model=SessionResponse)
-def update_session(
+async def update_session(
     session_id: int,
     session_update: SessionUpdate,
-    db: CampaignSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    # Vérifier si la session existe et appartient à l'utilisateur
     """
     Mettre à jour une session
 
@@ -57,17 +82,16 @@ def update_session(
         HTTPException: Si la session n'est pas trouvée ou si vous n'êtes pas le propriétaire
             de la session.
     """
-    db_session = crud_session.get_by_id(db, session_id=session_id)
-    if not db_session:
-        raise HTTPException(status_code=404, detail="Session non trouvée")
-    updated_session = crud_session.update(
-        db=db, db_obj=db_session, obj_in=session_update
+    updated_session = await crud_session.update(
+        db=db, session_id=session_id, obj_in=session_update
     )
+    if not updated_session:
+        raise HTTPException(status_code=404, detail="Session non trouvée")
     return updated_session
 
 
 @router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_session(session_id: int, db: CampaignSession = Depends(get_db)):
+async def delete_session(session_id: int, db: AsyncSession = Depends(get_db)):
     # Vérifier si la session existe et appartient à l'utilisateur
     """
     Supprimer une session
@@ -87,55 +111,359 @@ def delete_session(session_id: int, db: CampaignSession = Depends(get_db)):
         HTTPException: Si la session n'est pas trouvée ou si l'utilisateur actuel n'est
             pas le propriétaire de la session.
     """
-    session = crud_session.delete(db=db, session_id=session_id)
+    session = await crud_session.delete(db=db, session_id=session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session non trouvée")
     return {"detail": "Session supprimée avec succès"}
 
 
 @router.post("/{session_id}/upload-audio")
-async def upload_audio_to_cloudinary(
-    session_id: int, file: UploadFile = File(...), db: DBSession = Depends(get_db)
+async def upload_audio(
+    session_id: int, file: UploadFile = File(...), db: AsyncSession = Depends(get_db)
 ):
     """
-    Upload an audio file to Cloudinary for a given session.
+    Upload an audio file for a given session, as a multipart form.
+
+    The form is received before this handler runs: prefer
+    `PUT /{session_id}/audio` for large files, or resumable uploads
+    (`POST /{session_id}/uploads`) for long recordings.
 
     Args:
         session_id (int): The ID of the session.
         file (UploadFile): The audio file to upload.
 
     Raises:
-        HTTPException: If the session does not exist or if the file is not an audio.
+        HTTPException: If the session does not exist, if the file is not an
+            audio or is too large, or if the storage fails.
 
     Returns:
         dict: A JSON response with a message and the URL of the uploaded audio.
     """
-    # Vérifiez si la session existe
-    session = db.query(CampaignSession).filter(CampaignSession.id == session_id).first()
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+    SessionService.check_audio(file.content_type, str(file.size))
+    audio_url = await SessionService.upload_audio(
+        db,
+        session_id,
+        file.filename,
+        file.content_type,
+        iter_upload_file(file),
+    )
+    return {"message": "Audio uploaded successfully", "audio_url": audio_url}
 
-    # Vérifiez que le fichier est un audio
-    if not file.content_type.startswith("audio/"):
-        raise HTTPException(status_code=400, detail="File must be an audio")
 
-    # Upload du fichier sur Cloudinary
-    try:
-        upload_result = cloudinary.uploader.upload(
-            file.file,
-            resource_type="video",  # Les fichiers audio sont traités comme des vidéos par Cloudinary
-            folder=f"sessions/{session_id}",
-            public_id=file.filename.split(".")[0],  # Nom du fichier sans extension
-            overwrite=True,
-        )
-    except Exception as e:
+@router.put("/{session_id}/audio")
+async def stream_audio(
+    session_id: int,
+    request: Request,
+    filename: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Envoyer l'audio d'une session en flux : le corps de la requête est le
+    fichier lui-même (`Content-Type: audio/...`).
+
+    Le fichier est transmis au stockage pendant sa réception, sans être
+    gardé en mémoire ni sur disque, et refusé (413) dès qu'il dépasse
+    `AUDIO_MAX_BYTES`.
+
+    Args:
+        filename (str): Nom du fichier ; déduit du type de contenu par défaut.
+    """
+    content_type = request.headers.get("content-type")
+    SessionService.check_audio(content_type, request.headers.get("content-length"))
+    audio_url = await SessionService.upload_audio(
+        db, session_id, filename, content_type, request.stream()
+    )
+    return {"message": "Audio uploaded successfully", "audio_url": audio_url}
+
+
+@router.post("/{session_id}/uploads", status_code=status.HTTP_201_CREATED)
+async def create_audio_upload(
+    session_id: int, request: Request, db: AsyncSession = Depends(get_db)
+):
+    """
+    Déclarer un envoi reprenable de l'audio d'une session (protocole tus).
+
+    En-têtes : `Upload-Length` (taille totale) et `Upload-Metadata`
+    (`filename` et `filetype`, encodés en base64). L'URL de l'envoi est
+    retournée dans `Location`.
+    """
+    upload_id = await SessionService.create_upload(
+        db,
+        session_id,
+        request.headers.get("upload-length"),
+        request.headers.get("upload-metadata"),
+    )
+    location = request.url_for(
+        "get_audio_upload", session_id=session_id, upload_id=upload_id
+    )
+    return Response(
+        status_code=status.HTTP_201_CREATED,
+        headers={**TUS_HEADERS, "Location": str(location)},
+    )
+
+
+@router.head("/{session_id}/uploads/{upload_id}")
+async def get_audio_upload(session_id: int, upload_id: str):
+    """
+    Position atteinte par un envoi reprenable (`Upload-Offset`), d'où
+    reprendre après une coupure.
+    """
+    info = await SessionService.get_upload(session_id, upload_id)
+    return Response(
+        headers={
+            **TUS_HEADERS,
+            "Upload-Offset": str(info["offset"]),
+            "Upload-Length": str(info["length"]),
+            "Cache-Control": "no-store",
+        }
+    )
+
+
+@router.patch("/{session_id}/uploads/{upload_id}")
+async def append_audio_upload(
+    session_id: int,
+    upload_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Envoyer un morceau à la position `Upload-Offset`
+    (`Content-Type: application/offset+octet-stream`). Le dernier morceau
+    transmet l'audio au stockage et met à jour la session.
+    """
+    if request.headers.get("content-type") != "application/offset+octet-stream":
         raise HTTPException(
-            status_code=500, detail=f"Cloudinary upload failed: {e}"
-        ) from e
+            status_code=415,
+            detail="Content-Type must be application/offset+octet-stream",
+        )
+    offset = await SessionService.append_upload(
+        db,
+        session_id,
+        upload_id,
+        request.headers.get("upload-offset"),
+        request.stream(),
+    )
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers={**TUS_HEADERS, "Upload-Offset": str(offset)},
+    )
+
+
+@router.delete("/{session_id}/uploads/{upload_id}")
+async def cancel_audio_upload(session_id: int, upload_id: str):
+    """
+    Abandonner un envoi reprenable.
+    """
+    await SessionService.cancel_upload(session_id, upload_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=TUS_HEADERS)
+
+
+@router.post(
+    "/{session_id}/transcribe",
+    response_model=JobAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def transcribe_session(session_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Transcrire l'audio d'une session en tâche de fond : ses dialogues sont
+    remplacés par le résultat, avec les temps et les locuteurs détectés.
+    """
+    job = await SessionService.transcribe(db, session_id)
+    return {"job_id": job.id, "detail": "Transcription en cours"}
 
-    # Mise à jour de la session avec l'URL de l'audio
-    session.audio_path = upload_result.get("secure_url")
-    db.commit()
-    db.refresh(session)
 
-    return {"message": "Audio uploaded successfully", "audio_url": session.audio_path}
+@router.post(
+    "/{session_id}/identify-speakers",
+    response_model=JobAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def identify_session_speakers(
+    session_id: int, db: AsyncSession = Depends(get_db)
+):
+    """
+    Reconnaître en tâche de fond les joueurs qui parlent dans les dialogues
+    de la session, d'après les empreintes vocales des joueurs de la session
+    (`PUT /players/{player_id}/voice`). Les locuteurs choisis à la main sont
+    conservés.
+    """
+    job = await SessionService.identify_speakers(db, session_id)
+    return {"job_id": job.id, "detail": "Reconnaissance des locuteurs en cours"}
+
+
+@router.post(
+    "/{session_id}/waveform",
+    response_model=JobAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def compute_session_waveform(session_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Recalculer en tâche de fond la forme d'onde de l'audio de la session
+    (pour un audio envoyé avant son calcul automatique).
+    """
+    job = await SessionService.compute_waveform(db, session_id)
+    return {"job_id": job.id, "detail": "Calcul de la forme d'onde en cours"}
+
+
+@router.get("/{session_id}/waveform")
+async def get_session_waveform(
+    session_id: int,
+    request: Request,
+    response: Response,
+    zoom: int = Query(0, ge=0),
+    bits: int = 8,
+    v: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Forme d'onde de l'audio de la session, pour l'afficher sans télécharger
+    l'audio : un niveau de détail, en binaire (`application/octet-stream`).
+
+    Le corps contient, pour chaque tranche de `X-Waveform-Samples-Per-Peak`
+    échantillons (à `X-Waveform-Sample-Rate` Hz), le minimum et le maximum
+    du signal, entrelacés, en entiers signés petit-boutistes de `bits` bits.
+    Le zoom 0 est la vue d'ensemble ; chaque niveau suivant, jusqu'à
+    `X-Waveform-Zoom-Levels` - 1, est 4 fois plus détaillé.
+
+    Demandée avec sa version (`v`, voir `X-Waveform-Version`), la réponse
+    peut être gardée en cache indéfiniment ; sinon elle est revalidée.
+
+    Raises:
+        HTTPException: 400 si `bits` ne vaut ni 8 ni 16, 404 si la forme
+            d'onde n'a pas encore été calculée ou si le niveau de zoom
+            n'existe pas.
+    """
+    if bits not in PEAK_COLUMNS:
+        raise HTTPException(status_code=400, detail="bits doit valoir 8 ou 16")
+    waveform = await crud_waveform.get_version(db, session_id)
+    if waveform is None:
+        raise HTTPException(status_code=404, detail="Forme d'onde non calculée")
+    if zoom >= waveform.levels:
+        raise HTTPException(status_code=404, detail="Niveau de zoom inexistant")
+    version = version_of(waveform.created_at)
+    etag = make_etag("waveform", session_id, version, zoom, bits)
+    not_modified = check_not_modified(request, response, etag, waveform.created_at)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": response.headers["last-modified"],
+        "Cache-Control": response.headers["cache-control"],
+        "X-Waveform-Version": str(version),
+        "X-Waveform-Zoom-Levels": str(waveform.levels),
+    }
+    if v == version:
+        headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    if not_modified:
+        not_modified.headers.update(headers)
+        return not_modified
+
+    level = await crud_waveform.get_level(db, session_id, zoom, bits)
+    if level is None:
+        raise HTTPException(status_code=404, detail="Forme d'onde non calculée")
+    headers.update(
+        {
+            "X-Waveform-Samples-Per-Peak": str(level.samples_per_peak),
+            "X-Waveform-Sample-Rate": str(level.sample_rate),
+            "X-Waveform-Bits": str(bits),
+        }
+    )
+    return Response(level.peaks, media_type="application/octet-stream", headers=headers)
+
+
+@router.get("/", response_model=Page[SessionResponse])
+async def list_sessions(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Lister les sessions, page par page.
+
+    Args:
+        cursor (str): Curseur `next_cursor` ou `prev_cursor` d'une page précédente.
+        limit (int): Nombre maximal d'éléments par page.
+
+    Raises:
+        HTTPException: Si le curseur est invalide.
+    """
+    try:
+        return await crud_session.get_multi(db, cursor=cursor, limit=limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get("/{session_id}", response_model=SessionResponse)
+async def get_session(
+    session_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Récupérer une session. Répond 304 sans charger la session si la version
+    du client (If-None-Match ou If-Modified-Since) est à jour.
+
+    Args:
+        session_id (int): ID de la session
+
+    Raises:
+        HTTPException: Si la session n'est pas trouvée
+    """
+    updated_at = await crud_session.get_updated_at(db, session_id=session_id)
+    if updated_at is None:
+        raise HTTPException(status_code=404, detail="Session non trouvée")
+    etag = make_etag("session", session_id, version_of(updated_at))
+    not_modified = check_not_modified(request, response, etag, updated_at)
+    if not_modified:
+        return not_modified
+    return await crud_session.get_by_id(db, session_id=session_id)
+
+
+@router.post("/{session_id}/players/add", response_model=AssociationResponse)
+async def add_session_players(
+    session_id: int, body: AssociationUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Ajouter plusieurs joueurs à une session en une seule instruction SQL.
+    """
+    affected = await crud_session.add_players(db, session_id, body.ids)
+    if affected is None:
+        raise HTTPException(status_code=404, detail="Session non trouvée")
+    return {"requested": len(set(body.ids)), "affected": affected}
+
+
+@router.post("/{session_id}/players/remove", response_model=AssociationResponse)
+async def remove_session_players(
+    session_id: int, body: AssociationUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Retirer plusieurs joueurs d'une session en une seule instruction SQL.
+    """
+    affected = await crud_session.remove_players(db, session_id, body.ids)
+    if affected is None:
+        raise HTTPException(status_code=404, detail="Session non trouvée")
+    return {"requested": len(set(body.ids)), "affected": affected}
+
+
+@router.post("/{session_id}/npcs/add", response_model=AssociationResponse)
+async def add_session_npcs(
+    session_id: int, body: AssociationUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Ajouter plusieurs PNJs à une session en une seule instruction SQL.
+    """
+    affected = await crud_session.add_npcs(db, session_id, body.ids)
+    if affected is None:
+        raise HTTPException(status_code=404, detail="Session non trouvée")
+    return {"requested": len(set(body.ids)), "affected": affected}
+
+
+@router.post("/{session_id}/npcs/remove", response_model=AssociationResponse)
+async def remove_session_npcs(
+    session_id: int, body: AssociationUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Retirer plusieurs PNJs d'une session en une seule instruction SQL.
+    """
+    affected = await crud_session.remove_npcs(db, session_id, body.ids)
+    if affected is None:
+        raise HTTPException(status_code=404, detail="Session non trouvée")
+    return {"requested": len(set(body.ids)), "affected": affected}
@@ -1,18 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud import crud_user
-from app.db.database import get_db
+from app.crud.crud_user import DuplicateUserError
+from app.crud.pagination import InvalidCursorError
+from app.db.database import get_db, get_read_db
+from app.schemas.schema_pagination import Page
 from app.schemas.schema_token import Token
 from app.schemas.schema_user import UserCreate, UserResponse, UserUpdate
 from app.services.auth_service import AuthService
+from app.utils.dependencies import verify_token
 
 router = APIRouter()
 
 
 @router.post("/create", response_model=UserResponse)
-def create_new_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_new_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Creates a new user in the database.
 
@@ -29,18 +35,20 @@ def create_new_user(user: UserCreate, db: Session = Depends(get_db)):
         User: The newly created user object.
 
     Raises:
-        HTTPException: If the email is already registered.
+        HTTPException: If the username or email is already registered.
     """
     try:
-        user = crud_user.create(db=db, obj_in=user)
+        user = await crud_user.create(db=db, obj_in=user)
         return user
+    except DuplicateUserError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)
 ):
     """
     Authenticates a user and returns an access token.
@@ -61,15 +69,44 @@ def login_for_access_token(
     Raises:
         HTTPException: If the username or password is incorrect.
     """
-    return AuthService.login(
+    return await AuthService.login(
         db=db, username=form_data.username, password=form_data.password
     )
 
 
+@router.patch("/{user_id}", response_model=UserResponse)
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(user_id: int, user_in: UserUpdate, db: Session = Depends(get_db)):
-    db_user = crud_user.get_by_id(db, user_id=user_id)
-    if not db_user:
+async def update_user(
+    user_id: int, user_in: UserUpdate, db: AsyncSession = Depends(get_db)
+):
+    try:
+        updated_user = await crud_user.update(db=db, user_id=user_id, obj_in=user_in)
+    except DuplicateUserError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    if not updated_user:
         raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
-    updated_user = crud_user.update(db=db, db_obj=db_user, obj_in=user_in)
     return updated_user
+
+
+@router.get(
+    "/", response_model=Page[UserResponse], dependencies=[Depends(verify_token)]
+)
+async def list_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Lister les utilisateurs, page par page.
+
+    Args:
+        cursor (str): Curseur `next_cursor` ou `prev_cursor` d'une page précédente.
+        limit (int): Nombre maximal d'éléments par page.
+
+    Raises:
+        HTTPException: Si le curseur est invalide.
+    """
+    try:
+        return await crud_user.get_multi(db, cursor=cursor, limit=limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
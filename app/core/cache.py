@@ -0,0 +1,105 @@
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+
+class CacheStats:
+    """
+    Compteurs d'utilisation du cache, cumulés depuis le démarrage du processus.
+    """
+
+    def __init__(self):
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def snapshot(self) -> dict:
+        hits = self.local_hits + self.shared_hits
+        lookups = hits + self.misses
+        return {
+            "hits": hits,
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class MemoryCache:
+    """
+    Cache en mémoire du processus : LRU borné en nombre d'entrées, avec une
+    durée de vie par entrée (celle du cache, ou plus courte si précisée).
+    """
+
+    def __init__(self, max_entries: int, ttl: float, stats: CacheStats):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = stats
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def delete(self, keys: Iterable[str]):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class RedisCache:
+    """
+    Cache partagé entre les workers, sur un serveur compatible Redis.
+
+    Nécessite le paquet `redis` (client asyncio), importé seulement si ce
+    backend est configuré.
+    """
+
+    def __init__(self, url: str, ttl: float, prefix: str = "rpspy:"):
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "Le paquet redis est requis pour utiliser CACHE_REDIS_URL."
+            ) from e
+        self.client = redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes):
+        await self.client.set(self.prefix + key, value, px=int(self.ttl * 1000))
+
+    async def delete(self, keys: Iterable[str]):
+        keys = [self.prefix + key for key in keys]
+        if keys:
+            await self.client.delete(*keys)
+
+    async def close(self):
+        await self.client.aclose()
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional
 
 import cloudinary
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -12,6 +12,54 @@ class Settings(BaseSettings):
 
     # Base de données
     POSTGRES_URL: Optional[str] = None  # URL de connexion à PostgreSQL
+    POSTGRES_REPLICA_URL: Optional[str] = None  # Réplique en lecture (optionnelle)
+    DB_POOL_SIZE: int = 5  # Connexions gardées ouvertes en permanence
+    DB_MAX_OVERFLOW: int = 10  # Connexions supplémentaires autorisées en pic
+    DB_POOL_TIMEOUT: float = 30.0  # Attente max (s) d'une connexion libre
+    DB_POOL_RECYCLE: int = 1800  # Durée de vie max (s) d'une connexion, -1 = infinie
+    DB_POOL_PRE_PING: bool = True  # Vérifier la connexion avant de l'utiliser
+    DB_PGBOUNCER: bool = False  # Compatibilité PgBouncer en mode "transaction"
+
+    # Cache des entités (campagnes, joueurs, PNJs)
+    CACHE_ENABLED: bool = True  # Désactiver pour lire toujours en base
+    CACHE_TTL: float = 60.0  # Durée de vie (s) d'une entrée
+    CACHE_MAX_ENTRIES: int = 10000  # Entrées gardées en mémoire par worker
+    CACHE_REDIS_URL: Optional[str] = None  # Cache partagé entre workers (optionnel)
+
+    # Suppression en tâche de fond des grosses campagnes
+    PURGE_BATCH_SIZE: int = 5000  # Dialogues supprimés par transaction
+
+    # File de travaux (python -m app.worker)
+    JOB_WORKER_CONCURRENCY: int = 4  # Travaux exécutés en même temps par worker
+    JOB_POLL_INTERVAL: float = 5.0  # Attente max (s) entre deux recherches de travaux
+    JOB_MAX_ATTEMPTS: int = 5  # Essais avant de marquer un travail en échec
+    JOB_RETRY_BASE_DELAY: float = 10.0  # Attente (s) avant le 2e essai, doublée ensuite
+    JOB_RETRY_MAX_DELAY: float = 3600.0  # Attente max (s) entre deux essais
+    JOB_LEASE_TIMEOUT: float = (
+        60.0  # Silence (s) d'un worker avant reprise de ses travaux
+    )
+    JOB_CONCURRENCY_LIMITS: Dict[str, int] = {}  # Travaux en cours max par type
+
+    # Transcription des enregistrements (travail session.transcribe)
+    # stub (tests, sans modèle) ou whisper (faster-whisper sur CPU, à installer)
+    TRANSCRIPTION_BACKEND: str = "stub"
+    TRANSCRIPTION_MODEL: str = "small"  # Modèle Whisper (tiny, base, small, medium...)
+    TRANSCRIPTION_LANGUAGE: Optional[str] = "fr"  # None = détection automatique
+    TRANSCRIPTION_WORKERS: Optional[int] = None  # Processus, un par cœur par défaut
+    TRANSCRIPTION_CHUNK_SECONDS: float = 30.0  # Durée d'un morceau transcrit
+    TRANSCRIPTION_OVERLAP_SECONDS: float = 2.0  # Chevauchement entre deux morceaux
+    TRANSCRIPTION_ON_UPLOAD: bool = False  # Transcrire chaque audio reçu
+    # Détection de la parole : seuls les passages parlés sont transcrits
+    VAD_ENABLED: bool = True
+    VAD_ENERGY_MARGIN_DB: float = 12.0  # Au-dessus du bruit de fond
+    VAD_MAX_ZERO_CROSSING_RATE: float = 0.35  # Au-delà : bruit (dés, souffle)
+    VAD_MIN_SPEECH_MS: int = 250  # Passages plus courts ignorés
+    VAD_MIN_SILENCE_MS: int = 800  # Silences plus courts ignorés
+    VAD_PADDING_MS: int = 200  # Marge autour de chaque passage
+    # Reconnaissance des locuteurs (empreintes vocales des joueurs)
+    VOICE_SAMPLE_MAX_BYTES: int = 20 * 1024 * 1024  # Échantillon d'enrôlement
+    SPEAKER_MATCH_THRESHOLD: float = 0.5  # Similarité minimale pour attribuer
+    WAVEFORM_ON_UPLOAD: bool = True  # Calculer la forme d'onde de chaque audio
 
     # JWT Token
     SECRET_KEY: str = (
@@ -19,6 +67,31 @@ class Settings(BaseSettings):
     )
     ALGORITHM: str = "HS256"  # Algorithme utilisé pour signer le token
     ACCESS_TOKEN_EXPIRE_MINUTES: int  # Durée de validité du token (en minutes)
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000  # Tokens vérifiés en cache (0 = aucun)
+
+    # Hachage des mots de passe (bcrypt), hors des workers HTTP
+    PASSWORD_WORKERS: int = 2  # Processus dédiés au hachage
+    PASSWORD_QUEUE_LIMIT: int = 32  # Demandes en attente avant de répondre 503
+    PASSWORD_RETRY_AFTER: int = 1  # Délai (s) conseillé au client après un 503
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # Coût bcrypt ; le modifier rehache au login
+
+    # Stockage des fichiers audio
+    STORAGE_BACKEND: str = "cloudinary"  # cloudinary, local ou s3
+    STORAGE_LOCAL_DIR: str = "media"  # Répertoire des fichiers (backend local)
+    STORAGE_LOCAL_URL: str = "/media"  # Chemin où ces fichiers sont servis
+    AUDIO_MAX_BYTES: int = 500 * 1024 * 1024  # Taille max (octets) d'un audio
+    UPLOAD_DIR: str = "uploads"  # Parties des envois reprenables en cours
+    UPLOAD_EXPIRATION: int = 24 * 3600  # Inactivité (s) avant suppression d'un envoi
+
+    # Stockage S3 ou compatible (MinIO), nécessite le paquet aiobotocore
+    S3_BUCKET: Optional[str] = None  # Bucket de destination
+    S3_ENDPOINT_URL: Optional[str] = None  # URL du serveur (MinIO), sinon AWS
+    S3_ACCESS_KEY: Optional[str] = None  # Clé d'accès
+    S3_SECRET_KEY: Optional[str] = None  # Clé secrète
+    S3_REGION: str = "us-east-1"  # Région du bucket
+    S3_PUBLIC_URL: Optional[str] = None  # URL publique du bucket, si différente
+    S3_UPLOAD_CONCURRENCY: int = 4  # Parties envoyées en parallèle
+
     # Logging
     LOG_LEVEL: str = "DEBUG"  # Niveau de log par défaut
     LOG_FILE: str = "application"
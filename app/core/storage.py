@@ -0,0 +1,458 @@
+import asyncio
+import os
+import shutil
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import suppress
+from pathlib import Path, PurePosixPath
+from typing import AsyncIterator, Optional
+
+import cloudinary.uploader
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+# Taille des écritures sur disque
+LOCAL_WRITE_SIZE = 1024 * 1024
+# Parties reçues d'avance pendant l'envoi de la précédente
+PREFETCH_PARTS = 2
+
+
+class UploadTooLargeError(Exception):
+    def __init__(self, max_bytes: int):
+        """
+        Initialiser l'exception UploadTooLargeError.
+
+        Args:
+            max_bytes (int): La taille maximale autorisée, en octets.
+        """
+        self.max_bytes = max_bytes
+        super().__init__(
+            f"Le fichier dépasse la taille maximale de {max_bytes} octets."
+        )
+
+
+class StorageError(Exception):
+    def __init__(self, message="Échec de l'enregistrement du fichier."):
+        """
+        Initialiser l'exception StorageError.
+
+        Args:
+            message (str): Le message d'erreur.
+        """
+        super().__init__(message)
+
+
+async def limit_size(
+    chunks: AsyncIterator[bytes], max_bytes: int
+) -> AsyncIterator[bytes]:
+    """
+    Relayer des morceaux en s'arrêtant (UploadTooLargeError) dès que leur
+    total dépasse `max_bytes`, sans attendre la fin du corps.
+    """
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+        yield chunk
+
+
+async def rechunk(chunks: AsyncIterator[bytes], size: int) -> AsyncIterator[bytes]:
+    """
+    Regrouper des morceaux de taille quelconque en blocs de `size` octets
+    (le dernier peut être plus petit).
+    """
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= size:
+            yield bytes(buffer[:size])
+            del buffer[:size]
+    if buffer:
+        yield bytes(buffer)
+
+
+async def prefetch(chunks: AsyncIterator[bytes], depth: int) -> AsyncIterator[bytes]:
+    """
+    Lire la source dans une tâche séparée, jusqu'à `depth` morceaux d'avance.
+
+    Le backend envoie un morceau pendant que les suivants sont reçus : le
+    transfert sortant chevauche la réception du corps au lieu de l'attendre,
+    et la file bornée garde la mémoire utilisée constante.
+    """
+    queue: asyncio.Queue = asyncio.Queue(depth)
+    done = object()
+
+    async def fill():
+        try:
+            async for chunk in chunks:
+                await queue.put(chunk)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(done)
+
+    task = asyncio.create_task(fill())
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
+async def _last_flagged(parts: AsyncIterator[bytes]) -> AsyncIterator[tuple]:
+    """
+    Associer à chaque partie un booléen indiquant si c'est la dernière.
+    """
+    previous = None
+    async for part in parts:
+        if previous is not None:
+            yield previous, False
+        previous = part
+    if previous is not None:
+        yield previous, True
+
+
+async def _prepend(first: tuple, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    for chunk in first:
+        yield chunk
+    async for chunk in rest:
+        yield chunk
+
+
+class Storage(ABC):
+    """
+    Stockage de fichiers reçus en flux.
+
+    `save` consomme les morceaux au fur et à mesure de leur réception : le
+    fichier n'est jamais chargé entièrement en mémoire et les écritures
+    bloquantes ne s'exécutent pas dans la boucle d'événements.
+    """
+
+    # Taille des parties envoyées au backend
+    part_size = LOCAL_WRITE_SIZE
+
+    async def save(
+        self, key: str, chunks: AsyncIterator[bytes], content_type: str
+    ) -> str:
+        """
+        Enregistrer un fichier sous `key` et retourner son URL.
+
+        Raises:
+            UploadTooLargeError: Si la source dépasse la taille maximale ;
+                rien n'est conservé.
+            StorageError: Si le backend refuse le fichier.
+        """
+        parts = prefetch(rechunk(chunks, self.part_size), PREFETCH_PARTS)
+        try:
+            return await self._save(key, parts, content_type)
+        finally:
+            await parts.aclose()
+
+    @abstractmethod
+    async def _save(
+        self, key: str, parts: AsyncIterator[bytes], content_type: str
+    ) -> str:
+        """
+        Enregistrer les parties d'un fichier dans le backend et retourner
+        son URL.
+        """
+
+    async def download(self, url: str, destination: Path):
+        """
+        Copier dans `destination` un fichier enregistré, désigné par l'URL
+        retournée par `save`. Par défaut, il est téléchargé en HTTP.
+
+        Raises:
+            StorageError: Si le fichier est inaccessible.
+        """
+
+        def fetch():
+            with urllib.request.urlopen(url) as response, open(
+                destination, "wb"
+            ) as file:
+                shutil.copyfileobj(response, file, LOCAL_WRITE_SIZE)
+
+        try:
+            await run_in_threadpool(fetch)
+        except OSError as e:
+            raise StorageError(f"Téléchargement impossible : {e}") from e
+
+
+def _key_of(url: str, base_url: str) -> Optional[str]:
+    """
+    Clé d'un fichier d'après son URL, si elle est sous `base_url`.
+    """
+    prefix = base_url + "/"
+    return url[len(prefix) :] if url.startswith(prefix) else None
+
+
+class LocalStorage(Storage):
+    """
+    Fichiers sur le disque local, servis sous `base_url`.
+
+    Le fichier est écrit à côté de sa destination puis renommé : un envoi
+    interrompu ne remplace pas le fichier existant.
+    """
+
+    def __init__(self, root: str, base_url: str):
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+
+    def path_for(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root):
+            raise StorageError(f"Clé de fichier invalide : {key}")
+        return path
+
+    async def _save(
+        self, key: str, parts: AsyncIterator[bytes], content_type: str
+    ) -> str:
+        path = self.path_for(key)
+        partial = path.with_name(f".{path.name}.{uuid.uuid4().hex}.part")
+        await run_in_threadpool(path.parent.mkdir, parents=True, exist_ok=True)
+        file = await run_in_threadpool(open, partial, "wb")
+        try:
+            async for part in parts:
+                await run_in_threadpool(file.write, part)
+            await run_in_threadpool(file.close)
+            await run_in_threadpool(os.replace, partial, path)
+        except BaseException:
+            file.close()
+            with suppress(OSError):
+                os.remove(partial)
+            raise
+        return f"{self.base_url}/{key}"
+
+    async def download(self, url: str, destination: Path):
+        key = _key_of(url, self.base_url)
+        if key is None:
+            return await super().download(url, destination)
+        try:
+            await run_in_threadpool(shutil.copyfile, self.path_for(key), destination)
+        except OSError as e:
+            raise StorageError(f"Téléchargement impossible : {e}") from e
+
+
+class S3Storage(Storage):
+    """
+    Bucket S3 ou compatible (MinIO), par envoi multipart : jusqu'à
+    `concurrency` parties sont envoyées en parallèle, pendant que les
+    suivantes sont reçues. Un fichier plus petit qu'une partie est envoyé en
+    une seule requête.
+
+    Nécessite le paquet `aiobotocore`, importé seulement si ce backend est
+    configuré.
+    """
+
+    # Toutes les parties sauf la dernière doivent faire au moins 5 Mio
+    part_size = 8 * 1024 * 1024
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str],
+        access_key: Optional[str],
+        secret_key: Optional[str],
+        region: str,
+        public_url: Optional[str] = None,
+        concurrency: int = 4,
+    ):
+        try:
+            from aiobotocore.session import get_session
+            from botocore.exceptions import BotoCoreError, ClientError
+        except ImportError as e:
+            raise RuntimeError(
+                "Le paquet aiobotocore est requis pour utiliser STORAGE_BACKEND=s3."
+            ) from e
+        self._session = get_session()
+        self._errors = (BotoCoreError, ClientError)
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.concurrency = concurrency
+        base = public_url or f"{endpoint_url or 'https://s3.amazonaws.com'}/{bucket}"
+        self.public_url = base.rstrip("/")
+
+    def _client(self):
+        return self._session.create_client(
+            "s3",
+            endpoint_url=self.endpoint_url,
+            aws_access_key_id=self.access_key,
+            aws_secret_access_key=self.secret_key,
+            region_name=self.region,
+        )
+
+    async def _save(
+        self, key: str, parts: AsyncIterator[bytes], content_type: str
+    ) -> str:
+        try:
+            async with self._client() as client:
+                first = await anext(parts, b"")
+                second = (
+                    await anext(parts, None) if len(first) == self.part_size else None
+                )
+                if second is None:
+                    await client.put_object(
+                        Bucket=self.bucket,
+                        Key=key,
+                        Body=first,
+                        ContentType=content_type,
+                    )
+                else:
+                    await self._multipart(
+                        client, key, _prepend((first, second), parts), content_type
+                    )
+        except self._errors as e:
+            raise StorageError(f"Échec de l'envoi vers S3 : {e}") from e
+        return f"{self.public_url}/{key}"
+
+    async def _multipart(
+        self, client, key: str, parts: AsyncIterator[bytes], content_type: str
+    ):
+        upload = await client.create_multipart_upload(
+            Bucket=self.bucket, Key=key, ContentType=content_type
+        )
+        upload_id = upload["UploadId"]
+
+        async def send(number: int, part: bytes) -> dict:
+            result = await client.upload_part(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=number,
+                Body=part,
+            )
+            return {"ETag": result["ETag"], "PartNumber": number}
+
+        uploaded, pending = [], set()
+        try:
+            number = 0
+            async for part in parts:
+                # Au plus `concurrency` parties en vol : la mémoire reste bornée
+                if len(pending) >= self.concurrency:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    uploaded.extend(task.result() for task in done)
+                number += 1
+                pending.add(asyncio.create_task(send(number, part)))
+            if pending:
+                done, pending = await asyncio.wait(pending)
+                uploaded.extend(task.result() for task in done)
+            await client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    "Parts": sorted(uploaded, key=lambda part: part["PartNumber"])
+                },
+            )
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            # Sinon les parties déjà envoyées restent facturées dans le bucket
+            with suppress(Exception):
+                await client.abort_multipart_upload(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id
+                )
+            raise
+
+    async def download(self, url: str, destination: Path):
+        key = _key_of(url, self.public_url)
+        if key is None:
+            return await super().download(url, destination)
+        file = await run_in_threadpool(open, destination, "wb")
+        try:
+            async with self._client() as client:
+                response = await client.get_object(Bucket=self.bucket, Key=key)
+                async with response["Body"] as body:
+                    while chunk := await body.read(LOCAL_WRITE_SIZE):
+                        await run_in_threadpool(file.write, chunk)
+        except self._errors as e:
+            raise StorageError(f"Téléchargement impossible : {e}") from e
+        finally:
+            file.close()
+
+
+class CloudinaryStorage(Storage):
+    """
+    Médias Cloudinary, par envoi découpé (chunked upload) : chaque partie est
+    envoyée dans un thread, pendant que la suivante est reçue. La taille
+    totale n'est indiquée qu'avec la dernière partie.
+
+    La clé, sans son extension, sert d'identifiant public (dossiers compris).
+    """
+
+    # Toutes les parties sauf la dernière doivent faire au moins 5 Mo
+    part_size = 8 * 1024 * 1024
+
+    def __init__(self, resource_type: str = "video"):
+        # Cloudinary traite les fichiers audio comme des vidéos
+        self.resource_type = resource_type
+
+    async def _save(
+        self, key: str, parts: AsyncIterator[bytes], content_type: str
+    ) -> str:
+        name = PurePosixPath(key)
+        options = dict(
+            resource_type=self.resource_type,
+            public_id=str(name.with_suffix("")),
+            overwrite=True,
+        )
+        upload_id = uuid.uuid4().hex
+        offset = 0
+        result = None
+        async for part, last in _last_flagged(parts):
+            end = offset + len(part)
+            total = end if last else -1
+            headers = {
+                "Content-Range": f"bytes {offset}-{end - 1}/{total}",
+                "X-Unique-Upload-Id": upload_id,
+            }
+            try:
+                result = await run_in_threadpool(
+                    cloudinary.uploader.upload_large_part,
+                    (name.name, part),
+                    http_headers=headers,
+                    **options,
+                )
+            except Exception as e:
+                raise StorageError(f"Échec de l'envoi vers Cloudinary : {e}") from e
+            offset = end
+        if result is None:
+            raise StorageError("Fichier vide.")
+        return result["secure_url"]
+
+
+def _create_storage() -> Storage:
+    backend = settings.STORAGE_BACKEND
+    if backend == "local":
+        return LocalStorage(settings.STORAGE_LOCAL_DIR, settings.STORAGE_LOCAL_URL)
+    if backend == "s3":
+        return S3Storage(
+            settings.S3_BUCKET,
+            settings.S3_ENDPOINT_URL,
+            settings.S3_ACCESS_KEY,
+            settings.S3_SECRET_KEY,
+            settings.S3_REGION,
+            settings.S3_PUBLIC_URL,
+            settings.S3_UPLOAD_CONCURRENCY,
+        )
+    if backend == "cloudinary":
+        return CloudinaryStorage()
+    raise RuntimeError(f"STORAGE_BACKEND inconnu : {backend}")
+
+
+storage = _create_storage()
@@ -0,0 +1,219 @@
+import base64
+import binascii
+import fcntl
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from contextlib import asynccontextmanager, suppress
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.storage import LOCAL_WRITE_SIZE, UploadTooLargeError
+
+_UPLOAD_ID = re.compile(r"[0-9a-f]{32}")
+_INFO = "info.json"
+_LOCK = "lock"
+
+
+class UploadNotFoundError(Exception):
+    def __init__(self, message="Envoi introuvable ou expiré."):
+        """
+        Initialiser l'exception UploadNotFoundError.
+
+        Args:
+            message (str): Le message d'erreur.
+        """
+        super().__init__(message)
+
+
+class UploadOffsetError(Exception):
+    def __init__(self, offset: int):
+        """
+        Initialiser l'exception UploadOffsetError.
+
+        Args:
+            offset (int): La position réellement atteinte par l'envoi.
+        """
+        self.offset = offset
+        super().__init__(f"Position invalide : l'envoi est à l'octet {offset}.")
+
+
+class UploadLockedError(Exception):
+    def __init__(self, message="Un autre morceau de cet envoi est en cours."):
+        """
+        Initialiser l'exception UploadLockedError.
+
+        Args:
+            message (str): Le message d'erreur.
+        """
+        super().__init__(message)
+
+
+def parse_metadata(header: Optional[str]) -> Dict[str, str]:
+    """
+    Décoder un en-tête tus `Upload-Metadata` : des paires `clé valeur`
+    séparées par des virgules, la valeur étant encodée en base64.
+
+    Raises:
+        ValueError: Si l'en-tête est mal formé.
+    """
+    metadata = {}
+    for pair in filter(None, (item.strip() for item in (header or "").split(","))):
+        key, _, value = pair.partition(" ")
+        try:
+            metadata[key] = base64.b64decode(value, validate=True).decode()
+        except (binascii.Error, UnicodeDecodeError) as e:
+            raise ValueError(f"Métadonnée invalide : {key}") from e
+    return metadata
+
+
+class ResumableUploads:
+    """
+    Envois reprenables (protocole tus) stockés dans des fichiers temporaires.
+
+    Chaque envoi est un répertoire contenant sa description (`info.json`) et
+    une partie par morceau reçu, nommée d'après sa position : la position
+    atteinte est la somme de leurs tailles, et les octets reçus avant une
+    coupure sont conservés. Un verrou `flock` par envoi, libéré par le
+    système si le worker s'arrête, empêche deux workers d'écrire le même
+    envoi à la fois. Les envois sans activité depuis `expiration` secondes
+    sont supprimés.
+    """
+
+    def __init__(self, directory: str, expiration: float):
+        self.directory = Path(directory)
+        self.expiration = expiration
+
+    def _path(self, upload_id: str) -> Path:
+        if not _UPLOAD_ID.fullmatch(upload_id):
+            raise UploadNotFoundError()
+        return self.directory / upload_id
+
+    async def create(self, length: int, **info) -> str:
+        """
+        Déclarer un nouvel envoi de `length` octets et retourner son ID.
+        Les autres arguments sont conservés avec lui (voir `info`).
+        """
+        await run_in_threadpool(self._purge_expired)
+        upload_id = uuid.uuid4().hex
+        path = self._path(upload_id)
+        info = dict(info, length=length)
+        await run_in_threadpool(path.mkdir, parents=True)
+        await run_in_threadpool((path / _INFO).write_text, json.dumps(info))
+        return upload_id
+
+    async def info(self, upload_id: str) -> dict:
+        """
+        Description d'un envoi, avec la position atteinte (`offset`).
+
+        Raises:
+            UploadNotFoundError: Si l'envoi n'existe pas ou a expiré.
+        """
+        return await run_in_threadpool(self._read_info, self._path(upload_id))
+
+    def _read_info(self, path: Path) -> dict:
+        try:
+            if self._expired(path):
+                raise UploadNotFoundError()
+            info = json.loads((path / _INFO).read_text())
+            offset = sum(part.stat().st_size for part in path.glob("*.part"))
+        except FileNotFoundError as e:
+            raise UploadNotFoundError() from e
+        return dict(info, offset=offset)
+
+    def _expired(self, path: Path) -> bool:
+        # Chaque morceau crée une partie, ce qui met à jour le répertoire
+        return path.stat().st_mtime + self.expiration < time.time()
+
+    @asynccontextmanager
+    async def lock(self, upload_id: str):
+        """
+        Réserver un envoi pour y écrire, sans attendre.
+
+        Raises:
+            UploadNotFoundError: Si l'envoi n'existe pas.
+            UploadLockedError: Si un autre morceau est en cours d'écriture.
+        """
+        path = self._path(upload_id)
+        try:
+            fd = os.open(path / _LOCK, os.O_CREAT | os.O_RDWR)
+        except FileNotFoundError as e:
+            raise UploadNotFoundError() from e
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError as e:
+                raise UploadLockedError() from e
+            yield
+        finally:
+            os.close(fd)
+
+    async def append(
+        self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]
+    ) -> int:
+        """
+        Écrire un morceau à la position `offset` et retourner la nouvelle
+        position. À appeler sous `lock`. Les octets reçus sont conservés même
+        si la réception est interrompue.
+
+        Raises:
+            UploadOffsetError: Si `offset` n'est pas la position atteinte.
+            UploadTooLargeError: Si le morceau dépasse la taille déclarée.
+        """
+        path = self._path(upload_id)
+        info = await run_in_threadpool(self._read_info, path)
+        if offset != info["offset"]:
+            raise UploadOffsetError(info["offset"])
+
+        part = path / f"{offset:020d}.part"
+        file = await run_in_threadpool(open, part, "wb")
+        try:
+            # Écrire chaque morceau dès sa réception : une coupure ne perd rien
+            async for chunk in chunks:
+                room = info["length"] - offset
+                if len(chunk) > room:
+                    await run_in_threadpool(file.write, chunk[:room])
+                    raise UploadTooLargeError(info["length"])
+                await run_in_threadpool(file.write, chunk)
+                offset += len(chunk)
+        finally:
+            file.close()
+            if not part.stat().st_size:
+                part.unlink()
+        return offset
+
+    async def read(self, upload_id: str) -> AsyncIterator[bytes]:
+        """
+        Relire le contenu d'un envoi, ses parties dans l'ordre.
+        """
+        path = self._path(upload_id)
+        parts = await run_in_threadpool(lambda: sorted(path.glob("*.part")))
+        for part in parts:
+            file = await run_in_threadpool(open, part, "rb")
+            try:
+                while chunk := await run_in_threadpool(file.read, LOCAL_WRITE_SIZE):
+                    yield chunk
+            finally:
+                file.close()
+
+    async def delete(self, upload_id: str):
+        await run_in_threadpool(
+            shutil.rmtree, self._path(upload_id), ignore_errors=True
+        )
+
+    def _purge_expired(self):
+        if not self.directory.is_dir():
+            return
+        for path in self.directory.iterdir():
+            with suppress(FileNotFoundError):
+                if self._expired(path):
+                    shutil.rmtree(path, ignore_errors=True)
+
+
+resumable_uploads = ResumableUploads(settings.UPLOAD_DIR, settings.UPLOAD_EXPIRATION)
@@ -0,0 +1,173 @@
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    Integer,
+    Table,
+    all_,
+    any_,
+    bindparam,
+    delete,
+    func,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.timestamps import touch
+from app.db.cache import entity_cache
+from app.db.routing import mark_writes
+
+
+@dataclass(frozen=True)
+class Association:
+    """
+    Description d'une table d'association vue depuis l'un de ses côtés.
+    """
+
+    table: Table
+    parent_key: str  # Colonne désignant l'entité parente (ex. "campaign_id")
+    child_key: str  # Colonne désignant l'entité liée (ex. "player_id")
+    parent: type  # Modèle parent
+    child: type  # Modèle lié
+
+
+def _ids_param(ids: Iterable[int]):
+    # Un seul paramètre tableau, quelle que soit la taille de la liste
+    return any_(bindparam("ids", sorted(set(ids)), type_=ARRAY(Integer)))
+
+
+def _all_param(ids: Iterable[int]):
+    # `colonne != ALL(:ids)` : vrai pour une liste vide
+    return all_(bindparam("ids", sorted(set(ids)), type_=ARRAY(Integer)))
+
+
+async def add_links(
+    db: AsyncSession, association: Association, parent_id: int, ids: Iterable[int]
+) -> Optional[int]:
+    """
+    Lier des entités à un parent en une seule instruction
+    (INSERT ... SELECT ... ON CONFLICT DO NOTHING).
+
+    Les IDs inconnus et les liens déjà existants sont ignorés. Ne valide pas la
+    transaction.
+
+    Returns:
+        Optional[int]: Le nombre de liens créés, ou None si le parent n'existe pas.
+    """
+    table, child = association.table, association.child
+    parent = (
+        select(association.parent.id)
+        .where(association.parent.id == parent_id)
+        .cte("parent")
+    )
+    inserted = (
+        insert(table)
+        .from_select(
+            [association.parent_key, association.child_key],
+            select(parent.c.id, child.id).where(child.id == _ids_param(ids)),
+        )
+        .on_conflict_do_nothing()
+        .returning(table.c[association.child_key])
+        .cte("inserted")
+    )
+    return await _run(db, association, parent_id, parent, inserted)
+
+
+async def remove_links(
+    db: AsyncSession, association: Association, parent_id: int, ids: Iterable[int]
+) -> Optional[int]:
+    """
+    Délier des entités d'un parent en une seule instruction
+    (DELETE ... WHERE id = ANY(:ids)). Ne valide pas la transaction.
+
+    Returns:
+        Optional[int]: Le nombre de liens supprimés, ou None si le parent n'existe pas.
+    """
+    table = association.table
+    parent = (
+        select(association.parent.id)
+        .where(association.parent.id == parent_id)
+        .cte("parent")
+    )
+    deleted = (
+        delete(table)
+        .where(
+            table.c[association.parent_key] == parent_id,
+            table.c[association.child_key] == _ids_param(ids),
+        )
+        .returning(table.c[association.child_key])
+        .cte("deleted")
+    )
+    return await _run(db, association, parent_id, parent, deleted)
+
+
+async def set_links(
+    db: AsyncSession, association: Association, parent_id: int, ids: Iterable[int]
+) -> Optional[int]:
+    """
+    Remplacer les entités liées à un parent par exactement `ids`, en une seule
+    instruction : les liens absents de la liste sont supprimés, les nouveaux
+    créés (les IDs inconnus sont ignorés). Ne valide pas la transaction.
+
+    Returns:
+        Optional[int]: Le nombre de liens créés ou supprimés, ou None si le
+        parent n'existe pas.
+    """
+    table, child = association.table, association.child
+    parent_column = table.c[association.parent_key]
+    child_column = table.c[association.child_key]
+    parent = (
+        select(association.parent.id)
+        .where(association.parent.id == parent_id)
+        .cte("parent")
+    )
+    deleted = (
+        delete(table)
+        .where(parent_column == parent_id, child_column != _all_param(ids))
+        .returning(child_column)
+        .cte("deleted")
+    )
+    inserted = (
+        insert(table)
+        .from_select(
+            [association.parent_key, association.child_key],
+            select(parent.c.id, child.id).where(child.id == _ids_param(ids)),
+        )
+        .on_conflict_do_nothing()
+        .returning(child_column)
+        .cte("inserted")
+    )
+    changed = select(deleted).union_all(select(inserted)).cte("changed")
+    return await _run(db, association, parent_id, parent, changed)
+
+
+async def _run(
+    db: AsyncSession,
+    association: Association,
+    parent_id: int,
+    parent,
+    changed,
+) -> Optional[int]:
+    found, linked = (
+        await db.execute(
+            select(
+                select(func.count()).select_from(parent).scalar_subquery(),
+                select(func.array_agg(changed.c[association.child_key]))
+                .select_from(changed)
+                .scalar_subquery(),
+            )
+        )
+    ).one()
+    mark_writes(db)
+    if linked:
+        # Les listes d'IDs projetées changent des deux côtés du lien
+        for model, changed_ids in (
+            (association.parent, [parent_id]),
+            (association.child, linked),
+        ):
+            if hasattr(model, "updated_at"):
+                await touch(db, model.updated_at, changed_ids)
+            else:
+                await entity_cache.invalidate(db, model, changed_ids)
+    return len(linked or ()) if found else None
@@ -1,97 +1,218 @@
+from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.crud.associations import Association, add_links, remove_links
+from app.crud.pagination import CursorPage, paginate
+from app.crud.returning import insert_returning, patch
+from app.db.cache import entity_cache
+from app.db.models.base import (
+    campaign_npcs,
+    campaign_players,
+    session_npcs,
+    session_players,
+)
 from app.db.models.campaign import Campaign
+from app.db.models.campaign_session import CampaignSession
+from app.db.models.dialog import Dialog
+from app.db.models.npc import NPC
+from app.db.models.player import Player
+from app.db.session import SessionLocal
 from app.schemas import CampaignCreate, CampaignUpdate
 
+# Tables d'association, vues depuis la campagne
+CAMPAIGN_PLAYERS = Association(
+    campaign_players, "campaign_id", "player_id", Campaign, Player
+)
+CAMPAIGN_NPCS = Association(campaign_npcs, "campaign_id", "npc_id", Campaign, NPC)
+# Champs des schémas de mise à jour portant des listes d'IDs
+CAMPAIGN_LINKS = {"players": CAMPAIGN_PLAYERS, "npcs": CAMPAIGN_NPCS}
+
 
 class CRUDCampaign:
-    def get_by_id(self, db: Session, campaign_id: int) -> Optional[Campaign]:
+    async def get_by_id(self, db: AsyncSession, campaign_id: int) -> Optional[Campaign]:
         """
         Récupérer une campagne par son ID.
         """
-        return db.query(Campaign).filter(Campaign.id == campaign_id).first()
+        return await entity_cache.get(db, Campaign, campaign_id)
 
-    def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[Campaign]:
+    async def get_updated_at(
+        self, db: AsyncSession, campaign_id: int
+    ) -> Optional[datetime]:
         """
-        Récupérer une liste de campagnes avec pagination.
+        Date de dernière modification d'une campagne, sans charger la ligne.
+        Retourne None si elle n'existe pas.
         """
-        return db.query(Campaign).offset(skip).limit(limit).all()
+        return await db.scalar(
+            select(func.coalesce(Campaign.updated_at, func.to_timestamp(0))).where(
+                Campaign.id == campaign_id
+            )
+        )
 
-    def create(self, db: Session, obj_in: CampaignCreate) -> Campaign:
+    async def get_multi(
+        self, db: AsyncSession, cursor: Optional[str] = None, limit: int = 100
+    ) -> CursorPage:
+        """
+        Récupérer une page de campagnes, paginée par curseur sur l'ID.
+        """
+        return await paginate(
+            db,
+            select(Campaign),
+            keys=(Campaign.id,),
+            cursor=cursor,
+            limit=limit,
+        )
+
+    async def create(self, db: AsyncSession, obj_in: CampaignCreate) -> Campaign:
         """
         Créer une nouvelle campagne.
         """
-        campaign = Campaign(
-            name=obj_in.name,
-            genre=obj_in.genre,
-            description=obj_in.description,
-            map_url=obj_in.map_url,
-            status=obj_in.status,
-            notes_url=obj_in.notes_url,
-            mj_id=obj_in.mj_id,
-            created_by=obj_in.created_by,
+        campaign = await insert_returning(
+            db,
+            Campaign,
+            dict(
+                name=obj_in.name,
+                genre=obj_in.genre,
+                description=obj_in.description,
+                map_url=obj_in.map_url,
+                status=obj_in.status,
+                notes_url=obj_in.notes_url,
+                mj_id=obj_in.mj_id,
+                created_by=obj_in.created_by,
+            ),
         )
-        db.add(campaign)
-        db.commit()
-        db.refresh(campaign)
+        await db.commit()
         return campaign
 
-    def update(self, db: Session, db_obj: Campaign, obj_in: CampaignUpdate) -> Campaign:
+    async def update(
+        self, db: AsyncSession, campaign_id: int, obj_in: CampaignUpdate
+    ) -> Optional[Campaign]:
         """
-        Mettre à jour une campagne existante.
+        Mettre à jour partiellement une campagne en un seul UPDATE ... RETURNING,
+        sans la charger : seuls les champs fournis sont modifiés.
+        Les listes d'IDs fournies remplacent les liens existants.
+        Retourne None si l'entité n'existe pas.
         """
-        update_data = obj_in.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
-
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        campaign = await patch(
+            db, Campaign, campaign_id, obj_in.dict(exclude_unset=True), CAMPAIGN_LINKS
+        )
+        await db.commit()
+        return campaign
 
-    def delete(self, db: Session, campaign_id: int) -> Optional[Campaign]:
+    async def delete(self, db: AsyncSession, campaign_id: int) -> Optional[Campaign]:
         """
         Supprimer une campagne par son ID.
         """
-        campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+        campaign = await db.get(Campaign, campaign_id)
         if campaign:
-            db.delete(campaign)
-            db.commit()
+            await self._invalidate_session_members(db, campaign_id)
+            await db.delete(campaign)
+            await db.commit()
         return campaign
 
-    def add_player(self, db: Session, campaign: Campaign, player_id: int):
+    async def purge(self, campaign_id: int):
+        """
+        Supprimer une campagne volumineuse par lots (travail `campaign.purge`).
+
+        Les dialogues de ses sessions sont supprimés par lots de
+        PURGE_BATCH_SIZE lignes, chacun dans sa propre transaction : les
+        verrous restent courts et la réplication suit. La campagne (et ses
+        sessions, désormais vides) est supprimée en dernier. Interrompue, la
+        purge peut être relancée : elle reprend où elle s'est arrêtée.
+        """
+        sessions = select(CampaignSession.id).where(
+            CampaignSession.campaign_id == campaign_id
+        )
+        batch = (
+            select(Dialog.id)
+            .where(Dialog.session_id.in_(sessions))
+            .limit(settings.PURGE_BATCH_SIZE)
+        )
+        statement = delete(Dialog).where(Dialog.id.in_(batch.scalar_subquery()))
+        deleted = settings.PURGE_BATCH_SIZE
+        while deleted == settings.PURGE_BATCH_SIZE:
+            async with SessionLocal() as db:
+                result = await db.execute(
+                    statement, execution_options={"synchronize_session": False}
+                )
+                await db.commit()
+            deleted = result.rowcount
+        async with SessionLocal() as db:
+            await self.delete(db, campaign_id)
+
+    async def _invalidate_session_members(self, db: AsyncSession, campaign_id: int):
+        """
+        Les liens des sessions supprimées en cascade changent les listes de
+        sessions des joueurs et PNJs en cache.
+        """
+        sessions = select(CampaignSession.id).where(
+            CampaignSession.campaign_id == campaign_id
+        )
+        for association, model in (
+            (session_players.c.player_id, Player),
+            (session_npcs.c.npc_id, NPC),
+        ):
+            ids = await db.scalars(
+                select(association)
+                .where(association.table.c.session_id.in_(sessions))
+                .distinct()
+            )
+            await entity_cache.invalidate(db, model, ids.all())
+
+    async def add_players(
+        self, db: AsyncSession, campaign_id: int, player_ids: List[int]
+    ) -> Optional[int]:
         """
-        Ajouter un joueur à une campagne.
+        Ajouter des joueurs à une campagne, en une seule instruction.
+
+        Returns:
+            Optional[int]: Le nombre de liens créés, ou None si l'entité n'existe pas.
         """
-        if player_id not in [player.id for player in campaign.players]:
-            campaign.players.append(player_id)
-            db.commit()
+        added = await add_links(db, CAMPAIGN_PLAYERS, campaign_id, player_ids)
+        await db.commit()
+        return added
 
-    def remove_player(self, db: Session, campaign: Campaign, player_id: int):
+    async def remove_players(
+        self, db: AsyncSession, campaign_id: int, player_ids: List[int]
+    ) -> Optional[int]:
         """
-        Retirer un joueur d'une campagne.
+        Retirer des joueurs d'une campagne, en une seule instruction.
+
+        Returns:
+            Optional[int]: Le nombre de liens supprimés, ou None si l'entité n'existe pas.
         """
-        campaign.players = [
-            player for player in campaign.players if player.id != player_id
-        ]
-        db.commit()
+        removed = await remove_links(db, CAMPAIGN_PLAYERS, campaign_id, player_ids)
+        await db.commit()
+        return removed
 
-    def add_npc(self, db: Session, campaign: Campaign, npc_id: int):
+    async def add_npcs(
+        self, db: AsyncSession, campaign_id: int, npc_ids: List[int]
+    ) -> Optional[int]:
         """
-        Ajouter un PNJ à une campagne.
+        Ajouter des PNJs à une campagne, en une seule instruction.
+
+        Returns:
+            Optional[int]: Le nombre de liens créés, ou None si l'entité n'existe pas.
         """
-        if npc_id not in [npc.id for npc in campaign.npcs]:
-            campaign.npcs.append(npc_id)
-            db.commit()
+        added = await add_links(db, CAMPAIGN_NPCS, campaign_id, npc_ids)
+        await db.commit()
+        return added
 
-    def remove_npc(self, db: Session, campaign: Campaign, npc_id: int):
+    async def remove_npcs(
+        self, db: AsyncSession, campaign_id: int, npc_ids: List[int]
+    ) -> Optional[int]:
         """
-        Retirer un PNJ d'une campagne.
+        Retirer des PNJs d'une campagne, en une seule instruction.
+
+        Returns:
+            Optional[int]: Le nombre de liens supprimés, ou None si l'entité n'existe pas.
         """
-        campaign.npcs = [npc for npc in campaign.npcs if npc.id != npc_id]
-        db.commit()
+        removed = await remove_links(db, CAMPAIGN_NPCS, campaign_id, npc_ids)
+        await db.commit()
+        return removed
 
 
 # Initialisation de l'instance CRUDCampaign
@@ -1,71 +1,388 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List, Optional, Sequence, Set, Tuple
 
-from sqlalchemy.orm import Session
+from asyncpg.exceptions import ForeignKeyViolationError
+from pydantic import ValidationError
+from sqlalchemy import Float, Integer, bindparam, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import with_expression
 
+from app.crud.pagination import CursorPage, paginate
+from app.crud.returning import insert_returning, patch
+from app.crud.timestamps import touch
+from app.db.models.campaign_session import CampaignSession
 from app.db.models.dialog import Dialog
+from app.db.models.player import Player
+from app.db.routing import mark_writes
 from app.schemas.schema_dialog import DialogCreate, DialogUpdate
 
+# Configuration de recherche plein texte et surlignage des extraits
+SEARCH_CONFIG = "french"
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20"
+
+# Nombre de lignes validées puis copiées ensemble lors d'un import en masse
+BULK_BATCH_SIZE = 1000
+BULK_COLUMNS = (
+    "order",
+    "start_ms",
+    "end_ms",
+    "speaker_id",
+    "speaker_label",
+    "content",
+    "session_id",
+)
+
+
+class InvalidDialogError(Exception):
+    def __init__(self, message="Ligne de dialogue invalide."):
+        """
+        Initialiser l'exception InvalidDialogError.
+
+        Args:
+            message (str): Le message d'erreur.
+        """
+        super().__init__(message)
+
 
 class CRUDDialog:
-    def get_by_id(self, db: Session, dialog_id: int) -> Optional[Dialog]:
+    async def get_by_id(self, db: AsyncSession, dialog_id: int) -> Optional[Dialog]:
         """
         Récupérer un dialogue par son ID.
         """
-        return db.query(Dialog).filter(Dialog.id == dialog_id).first()
+        return await db.scalar(select(Dialog).where(Dialog.id == dialog_id))
+
+    async def get_version(self, db: AsyncSession, dialog_id: int) -> Optional[datetime]:
+        """
+        Version d'un dialogue : celle de la transcription de sa session.
+        Retourne None si le dialogue n'existe pas.
+        """
+        return await db.scalar(
+            select(CampaignSession.dialogs_updated_at)
+            .join(Dialog, Dialog.session_id == CampaignSession.id)
+            .where(Dialog.id == dialog_id)
+        )
+
+    async def get_session_version(
+        self, db: AsyncSession, session_id: int
+    ) -> Optional[datetime]:
+        """
+        Date de la dernière modification des dialogues d'une session.
+        Retourne None si la session n'existe pas.
+        """
+        return await db.scalar(
+            select(CampaignSession.dialogs_updated_at).where(
+                CampaignSession.id == session_id
+            )
+        )
 
-    def get_by_session(self, db: Session, session_id: int) -> List[Dialog]:
+    async def get_by_session(self, db: AsyncSession, session_id: int) -> List[Dialog]:
         """
         Récupérer tous les dialogues liés à une session spécifique.
         """
-        return db.query(Dialog).filter(Dialog.session_id == session_id).all()
+        result = await db.scalars(select(Dialog).where(Dialog.session_id == session_id))
+        return list(result.all())
+
+    async def get_in_window(
+        self, db: AsyncSession, session_id: int, from_ms: int, to_ms: int
+    ) -> List[Dialog]:
+        """
+        Récupérer les dialogues d'une session qui chevauchent la fenêtre
+        [from_ms, to_ms[, triés par début. Une ligne sans fin est ponctuelle.
+        """
+        result = await db.scalars(
+            select(Dialog)
+            .where(
+                Dialog.session_id == session_id,
+                Dialog.start_ms < to_ms,
+                func.coalesce(Dialog.end_ms, Dialog.start_ms) >= from_ms,
+            )
+            .order_by(Dialog.start_ms, Dialog.id)
+        )
+        return list(result.all())
+
+    async def get_multi(
+        self,
+        db: AsyncSession,
+        session_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+    ) -> CursorPage:
+        """
+        Récupérer une page de dialogues, dans l'ordre (session_id, order),
+        éventuellement limitée à une session.
+        """
+        statement = select(Dialog)
+        if session_id is not None:
+            statement = statement.where(Dialog.session_id == session_id)
+        return await paginate(
+            db,
+            statement,
+            keys=(Dialog.session_id, Dialog.order, Dialog.id),
+            cursor=cursor,
+            limit=limit,
+        )
 
-    def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[Dialog]:
+    async def search(
+        self,
+        db: AsyncSession,
+        campaign_id: int,
+        query: str,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> CursorPage:
         """
-        Récupérer plusieurs dialogues avec pagination.
+        Rechercher dans les dialogues de toutes les sessions d'une campagne.
+
+        `query` suit la syntaxe de websearch_to_tsquery ("expression exacte",
+        or, -exclu). Les résultats sont triés par pertinence décroissante,
+        avec un extrait surligné, et paginés par curseur sur (pertinence, ID).
         """
-        return db.query(Dialog).offset(skip).limit(limit).all()
+        tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        rank = func.ts_rank(Dialog.content_tsv, tsquery).label("rank")
+        headline = func.ts_headline(
+            SEARCH_CONFIG, Dialog.content, tsquery, HEADLINE_OPTIONS
+        )
+        statement = (
+            select(Dialog)
+            .join(CampaignSession, CampaignSession.id == Dialog.session_id)
+            .where(
+                CampaignSession.campaign_id == campaign_id,
+                Dialog.content_tsv.bool_op("@@")(tsquery),
+            )
+            .options(
+                with_expression(Dialog.rank, rank),
+                with_expression(Dialog.headline, headline),
+            )
+        )
+        return await paginate(
+            db,
+            statement,
+            keys=(rank, Dialog.id),
+            cursor=cursor,
+            limit=limit,
+            descending=True,
+        )
 
-    def create(self, db: Session, obj_in: DialogCreate) -> Dialog:
+    async def create(self, db: AsyncSession, obj_in: DialogCreate) -> Dialog:
         """
         Créer un nouveau dialogue.
         """
-        dialog = Dialog(
-            order=obj_in.order,
-            start=obj_in.start,
-            end=obj_in.end,
-            speaker_id=obj_in.speaker_id,
-            speaker=obj_in.speaker,
-            content=obj_in.content,
-            session_id=obj_in.session_id,
+        dialog = await insert_returning(
+            db,
+            Dialog,
+            dict(
+                order=obj_in.order,
+                start_ms=obj_in.start_ms,
+                end_ms=obj_in.end_ms,
+                speaker_id=obj_in.speaker_id,
+                content=obj_in.content,
+                session_id=obj_in.session_id,
+            ),
         )
-        db.add(dialog)
-        db.commit()
-        db.refresh(dialog)
+        await self._touch_sessions(db, [dialog.session_id])
+        await db.commit()
         return dialog
 
-    def update(self, db: Session, db_obj: Dialog, obj_in: DialogUpdate) -> Dialog:
+    async def bulk_create(self, db: AsyncSession, records: AsyncIterator[dict]) -> dict:
         """
-        Mettre à jour un dialogue existant.
+        Importer un grand nombre de dialogues dans une seule transaction.
+
+        Les lignes sont copiées par lots avec COPY ; les sessions et locuteurs
+        référencés ne sont vérifiés qu'une fois par lot (et jamais deux fois).
+        En cas d'erreur, rien n'est validé : la transaction est annulée à la
+        fermeture de la session.
         """
-        update_data = obj_in.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
+        known_sessions: Set[int] = set()
+        known_speakers: Set[int] = set()
+        counts = {"inserted": 0, "batches": 0}
+        batch: List[DialogCreate] = []
 
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        async def flush():
+            await self._check_references(
+                db,
+                CampaignSession,
+                {dialog.session_id for dialog in batch},
+                known_sessions,
+                "Session",
+            )
+            await self._check_references(
+                db,
+                Player,
+                {
+                    dialog.speaker_id
+                    for dialog in batch
+                    if dialog.speaker_id is not None
+                },
+                known_speakers,
+                "Locuteur",
+            )
+            connection = await db.connection()
+            raw_connection = await connection.get_raw_connection()
+            try:
+                await raw_connection.driver_connection.copy_records_to_table(
+                    Dialog.__tablename__,
+                    records=[
+                        tuple(getattr(dialog, column) for column in BULK_COLUMNS)
+                        for dialog in batch
+                    ],
+                    columns=BULK_COLUMNS,
+                )
+            except ForeignKeyViolationError as e:
+                # Session ou locuteur supprimé entre la vérification et la copie
+                raise InvalidDialogError(
+                    f"Référence introuvable : {e.detail or e}"
+                ) from e
+            counts["inserted"] += len(batch)
+            counts["batches"] += 1
+            batch.clear()
 
-    def delete(self, db: Session, dialog_id: int) -> Optional[Dialog]:
+        async for record in records:
+            try:
+                batch.append(DialogCreate.model_validate(record))
+            except ValidationError as e:
+                line = counts["inserted"] + len(batch)
+                raise InvalidDialogError(f"Ligne {line} invalide : {e}") from e
+            if len(batch) >= BULK_BATCH_SIZE:
+                await flush()
+        if batch:
+            await flush()
+
+        # COPY contourne l'ORM : signaler l'écriture pour le jeton de cohérence
+        mark_writes(db)
+        await self._touch_sessions(db, known_sessions)
+        await db.commit()
+        return counts
+
+    async def replace_session(
+        self, db: AsyncSession, session_id: int, records: AsyncIterator[dict]
+    ) -> dict:
+        """
+        Remplacer toute la transcription d'une session (transcription
+        automatique) : les dialogues existants sont supprimés et les nouveaux
+        importés dans la même transaction.
+        """
+        result = await db.execute(
+            delete(Dialog)
+            .where(Dialog.session_id == session_id)
+            .execution_options(synchronize_session=False)
+        )
+        await self._touch_sessions(db, [session_id])
+        counts = await self.bulk_create(db, records)
+        return dict(counts, deleted=result.rowcount)
+
+    async def _check_references(
+        self, db: AsyncSession, model, ids: Set[int], known: Set[int], label: str
+    ):
+        """
+        Vérifier en une requête que les IDs inconnus d'un lot existent.
+        """
+        missing = ids - known
+        if not missing:
+            return
+        result = await db.scalars(select(model.id).where(model.id.in_(missing)))
+        found = set(result.all())
+        if missing - found:
+            raise InvalidDialogError(f"{label} introuvable : {sorted(missing - found)}")
+        known.update(found)
+
+    async def update(
+        self, db: AsyncSession, dialog_id: int, obj_in: DialogUpdate
+    ) -> Optional[Dialog]:
+        """
+        Mettre à jour partiellement un dialogue en un seul UPDATE ... RETURNING,
+        sans le charger : seuls les champs fournis sont modifiés.
+        Retourne None si l'entité n'existe pas.
+        """
+        data = obj_in.dict(exclude_unset=True)
+        if "speaker_id" in data:
+            # Locuteur choisi à la main : il n'est plus attribué automatiquement
+            data["speaker_confidence"] = None
+        dialog = await patch(db, Dialog, dialog_id, data)
+        if dialog:
+            await self._touch_sessions(db, [dialog.session_id])
+            await db.commit()
+        return dialog
+
+    async def get_voice_segments(
+        self, db: AsyncSession, session_id: int
+    ) -> List[Tuple[int, int, int, Optional[str]]]:
+        """
+        Extraits audio des dialogues d'une session, sans charger les
+        entités : [(ID, start_ms, end_ms, speaker_label), ...]. Les lignes
+        sans fin, ponctuelles, sont ignorées.
+        """
+        result = await db.execute(
+            select(Dialog.id, Dialog.start_ms, Dialog.end_ms, Dialog.speaker_label)
+            .where(Dialog.session_id == session_id, Dialog.end_ms > Dialog.start_ms)
+            .order_by(Dialog.order, Dialog.id)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def assign_speakers(
+        self,
+        db: AsyncSession,
+        session_id: int,
+        assignments: Sequence[Tuple[int, Optional[int], Optional[float]]],
+    ) -> int:
+        """
+        Attribuer en une instruction les locuteurs reconnus automatiquement :
+        [(ID du dialogue, ID du joueur, similarité), ...]. Les locuteurs
+        choisis à la main (sans similarité) sont conservés.
+
+        Returns:
+            int: Le nombre de dialogues modifiés.
+        """
+        if not assignments:
+            return 0
+        dialog_ids, speaker_ids, confidences = zip(*assignments)
+        values = (
+            func.unnest(
+                bindparam("dialog_ids", list(dialog_ids), type_=ARRAY(Integer)),
+                bindparam("speaker_ids", list(speaker_ids), type_=ARRAY(Integer)),
+                bindparam("confidences", list(confidences), type_=ARRAY(Float)),
+            )
+            .table_valued("dialog_id", "speaker_id", "confidence")
+            .render_derived()
+        )
+        result = await db.execute(
+            update(Dialog)
+            .where(
+                Dialog.id == values.c.dialog_id,
+                Dialog.session_id == session_id,
+                or_(
+                    Dialog.speaker_id.is_(None),
+                    Dialog.speaker_confidence.is_not(None),
+                ),
+            )
+            .values(
+                speaker_id=values.c.speaker_id,
+                speaker_confidence=values.c.confidence,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self._touch_sessions(db, [session_id])
+        await db.commit()
+        return result.rowcount
+
+    async def delete(self, db: AsyncSession, dialog_id: int) -> Optional[Dialog]:
         """
         Supprimer un dialogue par son ID.
         """
-        dialog = db.query(Dialog).filter(Dialog.id == dialog_id).first()
+        dialog = await db.get(Dialog, dialog_id)
         if dialog:
-            db.delete(dialog)
-            db.commit()
+            await db.delete(dialog)
+            await self._touch_sessions(db, [dialog.session_id])
+            await db.commit()
         return dialog
 
+    async def _touch_sessions(self, db: AsyncSession, session_ids: Iterable[int]):
+        """
+        Changer la version des transcriptions modifiées (ETag des listes de
+        dialogues), dans la transaction de l'écriture.
+        """
+        await touch(db, CampaignSession.dialogs_updated_at, session_ids)
+
 
 # Instance CRUDDialog
 crud_dialog = CRUDDialog()
@@ -0,0 +1,243 @@
+import random
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import Integer, any_, bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.returning import insert_returning
+from app.db.models import Job
+from app.db.models.enums.job_status import JobStatus
+
+# Canal PostgreSQL réveillant les workers à chaque nouveau travail
+JOBS_CHANNEL = "rpspy_jobs"
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Attente avant un nouvel essai : exponentielle, plafonnée, avec une part
+    aléatoire pour que les travaux échoués ensemble ne repartent pas ensemble.
+    """
+    delay = min(
+        settings.JOB_RETRY_BASE_DELAY * 2 ** (attempts - 1),
+        settings.JOB_RETRY_MAX_DELAY,
+    )
+    return delay * random.uniform(0.5, 1.0)
+
+
+class CRUDJob:
+    async def get_by_id(self, db: AsyncSession, job_id: int) -> Optional[Job]:
+        """
+        Récupérer un travail par son ID.
+        """
+        return await db.scalar(select(Job).where(Job.id == job_id))
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        job_type: str,
+        payload: Optional[dict] = None,
+        priority: int = 0,
+        max_attempts: Optional[int] = None,
+        delay: Optional[float] = None,
+    ) -> Job:
+        """
+        Mettre un travail en file d'attente et réveiller les workers.
+
+        Ne valide pas la transaction : le travail n'est visible (et les
+        workers réveillés) qu'avec les écritures qui le motivent.
+        """
+        values = dict(
+            type=job_type,
+            payload=payload or {},
+            status=JobStatus.QUEUED,
+            priority=priority,
+            attempts=0,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        )
+        if delay:
+            values["run_at"] = func.now() + timedelta(seconds=delay)
+        job = await insert_returning(db, Job, values)
+        await db.execute(select(func.pg_notify(JOBS_CHANNEL, job_type)))
+        return job
+
+    async def claim(
+        self, db: AsyncSession, limits: Dict[str, Optional[int]], worker: str
+    ) -> Optional[Job]:
+        """
+        Réserver le prochain travail prêt parmi les types de `limits`, par
+        priorité puis ancienneté, et le marquer en cours. Retourne None s'il
+        n'y en a aucun.
+
+        Les lignes déjà réservées par d'autres workers sont sautées
+        (FOR UPDATE SKIP LOCKED) au lieu d'être attendues. Un type dont la
+        limite (nombre de travaux en cours, tous workers confondus) est
+        atteinte est ignoré ; pour que ce comptage reste juste, les
+        réservations d'un même type limité sont sérialisées par un verrou
+        consultatif, que les autres workers n'attendent pas.
+        """
+        excluded = await self._saturated_types(db, limits)
+        candidate = (
+            select(Job.id)
+            .where(
+                Job.status == JobStatus.QUEUED,
+                Job.run_at <= func.now(),
+                Job.type.in_(list(limits)),
+                Job.type.not_in(excluded),
+            )
+            .order_by(Job.priority.desc(), Job.run_at, Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        job = await db.scalar(
+            update(Job)
+            .where(Job.id == candidate)
+            .values(
+                status=JobStatus.RUNNING,
+                attempts=Job.attempts + 1,
+                worker=worker,
+                heartbeat_at=func.now(),
+                started_at=func.now(),
+            )
+            .returning(Job)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return job
+
+    async def _saturated_types(
+        self, db: AsyncSession, limits: Dict[str, Optional[int]]
+    ) -> List[str]:
+        limited = sorted(t for t, limit in limits.items() if limit is not None)
+        if not limited:
+            return []
+        # Verrous de transaction : libérés au commit de la réservation
+        locked = await db.execute(
+            select(
+                *(
+                    func.pg_try_advisory_xact_lock(
+                        func.hashtext(f"{JOBS_CHANNEL}:{job_type}")
+                    )
+                    for job_type in limited
+                )
+            )
+        )
+        acquired = [t for t, ok in zip(limited, locked.one()) if ok]
+        running = dict(
+            (
+                await db.execute(
+                    select(Job.type, func.count())
+                    .where(Job.status == JobStatus.RUNNING, Job.type.in_(acquired))
+                    .group_by(Job.type)
+                )
+            ).all()
+        )
+        return [
+            job_type
+            for job_type in limited
+            if job_type not in acquired or running.get(job_type, 0) >= limits[job_type]
+        ]
+
+    async def succeed(self, db: AsyncSession, job: Job, result: Optional[dict]):
+        """
+        Marquer terminé un travail réservé, s'il est toujours en cours pour
+        cet essai (il a pu être repris après l'expiration de son bail).
+        """
+        await self._finish(
+            db,
+            job,
+            status=JobStatus.SUCCEEDED,
+            result=result,
+            finished_at=func.now(),
+        )
+
+    async def fail(self, db: AsyncSession, job: Job, error: str):
+        """
+        Enregistrer l'échec d'un travail réservé : il est remis en file après
+        une attente croissante, ou marqué en échec après `max_attempts` essais.
+        """
+        if job.attempts < job.max_attempts:
+            values = dict(
+                status=JobStatus.QUEUED,
+                run_at=func.now() + timedelta(seconds=retry_delay(job.attempts)),
+            )
+        else:
+            values = dict(status=JobStatus.FAILED, finished_at=func.now())
+        await self._finish(db, job, last_error=error, **values)
+
+    async def release(self, db: AsyncSession, job: Job):
+        """
+        Remettre en file, sans compter d'essai, un travail interrompu par
+        l'arrêt de son worker.
+        """
+        await self._finish(db, job, status=JobStatus.QUEUED, attempts=Job.attempts - 1)
+
+    async def _finish(self, db: AsyncSession, job: Job, **values):
+        await db.execute(
+            update(Job)
+            .where(
+                Job.id == job.id,
+                Job.attempts == job.attempts,
+                Job.status == JobStatus.RUNNING,
+            )
+            .values(heartbeat_at=None, **values)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+    async def heartbeat(self, db: AsyncSession, job_ids: Iterable[int], worker: str):
+        """
+        Prolonger le bail des travaux en cours d'un worker.
+        """
+        ids = sorted(job_ids)
+        if not ids:
+            return
+        await db.execute(
+            update(Job)
+            .where(
+                Job.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))),
+                Job.worker == worker,
+                Job.status == JobStatus.RUNNING,
+            )
+            .values(heartbeat_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+    async def requeue_expired(self, db: AsyncSession, lease: float) -> int:
+        """
+        Reprendre les travaux dont le worker ne donne plus signe de vie
+        depuis `lease` secondes (processus tué, nœud perdu) : l'essai compte
+        comme un échec. Retourne le nombre de travaux repris.
+        """
+        expired = (
+            Job.status == JobStatus.RUNNING,
+            Job.heartbeat_at < func.now() - timedelta(seconds=lease),
+        )
+        error = "Le worker a cessé de répondre pendant l'exécution."
+        requeued = await db.execute(
+            update(Job)
+            .where(*expired, Job.attempts < Job.max_attempts)
+            .values(status=JobStatus.QUEUED, heartbeat_at=None, last_error=error)
+            .execution_options(synchronize_session=False)
+        )
+        failed = await db.execute(
+            update(Job)
+            .where(*expired, Job.attempts >= Job.max_attempts)
+            .values(
+                status=JobStatus.FAILED,
+                heartbeat_at=None,
+                finished_at=func.now(),
+                last_error=error,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return requeued.rowcount + failed.rowcount
+
+
+# Initialisation de l'instance CRUDJob
+crud_job = CRUDJob()
@@ -1,101 +1,190 @@
 from typing import List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.crud.associations import Association, add_links, remove_links
+from app.crud.pagination import CursorPage, paginate
+from app.crud.returning import insert_returning, patch
+from app.crud.search import autocomplete, fuzzy_search
+from app.crud.timestamps import touch
+from app.db.cache import entity_cache
+from app.db.models.base import campaign_npcs, session_npcs
+from app.db.models.campaign import Campaign
+from app.db.models.campaign_session import CampaignSession
 from app.db.models.npc import NPC
 from app.schemas.schema_npc import NPCCreate, NPCUpdate
 
+# Tables d'association, vues depuis le PNJ
+NPC_CAMPAIGNS = Association(campaign_npcs, "npc_id", "campaign_id", NPC, Campaign)
+NPC_SESSIONS = Association(session_npcs, "npc_id", "session_id", NPC, CampaignSession)
+# Champs des schémas de mise à jour portant des listes d'IDs
+NPC_LINKS = {"campaigns": NPC_CAMPAIGNS, "sessions": NPC_SESSIONS}
+
 
 class CRUDNPC:
-    def get_by_id(self, db: Session, npc_id: int) -> Optional[NPC]:
+    async def get_by_id(self, db: AsyncSession, npc_id: int) -> Optional[NPC]:
         """
         Récupérer un PNJ par son ID.
         """
-        return db.query(NPC).filter(NPC.id == npc_id).first()
+        return await entity_cache.get(db, NPC, npc_id)
 
-    def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[NPC]:
-        """
-        Récupérer une liste de PNJs avec pagination.
-        """
-        return db.query(NPC).offset(skip).limit(limit).all()
+    async def get_multi(
+        self, db: AsyncSession, cursor: Optional[str] = None, limit: int = 100
+    ) -> CursorPage:
+        """
+        Récupérer une page de PNJs, paginée par curseur sur l'ID.
+        """
+        return await paginate(
+            db,
+            select(NPC),
+            keys=(NPC.id,),
+            cursor=cursor,
+            limit=limit,
+        )
 
-    def create(self, db: Session, obj_in: NPCCreate) -> NPC:
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        campaign_id: Optional[int] = None,
+        limit: int = 10,
+    ) -> List[dict]:
+        """
+        Rechercher des PNJs par nom, race ou classe, même mal orthographiés,
+        éventuellement parmi ceux d'une campagne.
+        """
+        return await fuzzy_search(
+            db, NPC, query, limit, *self._campaign_scope(campaign_id)
+        )
+
+    async def autocomplete(
+        self,
+        db: AsyncSession,
+        prefix: str,
+        campaign_id: Optional[int] = None,
+        limit: int = 10,
+    ) -> List[dict]:
+        """
+        Proposer les PNJs dont le nom commence par `prefix`.
+        """
+        return await autocomplete(
+            db, NPC, prefix, limit, *self._campaign_scope(campaign_id)
+        )
+
+    def _campaign_scope(self, campaign_id: Optional[int]) -> list:
+        if campaign_id is None:
+            return []
+        return [
+            NPC.id.in_(
+                select(campaign_npcs.c.npc_id).where(
+                    campaign_npcs.c.campaign_id == campaign_id
+                )
+            )
+        ]
+
+    async def create(self, db: AsyncSession, obj_in: NPCCreate) -> NPC:
         """
         Créer un nouveau PNJ.
         """
-        npc = NPC(
-            name=obj_in.name,
-            race=obj_in.race,
-            class_name=obj_in.class_name,
-            alignment=obj_in.alignment,
-            level=obj_in.level,
-            strength=obj_in.strength,
-            dexterity=obj_in.dexterity,
-            constitution=obj_in.constitution,
-            intelligence=obj_in.intelligence,
-            wisdom=obj_in.wisdom,
-            charisma=obj_in.charisma,
-            description=obj_in.description,
+        npc = await insert_returning(
+            db,
+            NPC,
+            dict(
+                name=obj_in.name,
+                race=obj_in.race,
+                class_name=obj_in.class_name,
+                alignment=obj_in.alignment,
+                level=obj_in.level,
+                strength=obj_in.strength,
+                dexterity=obj_in.dexterity,
+                constitution=obj_in.constitution,
+                intelligence=obj_in.intelligence,
+                wisdom=obj_in.wisdom,
+                charisma=obj_in.charisma,
+                description=obj_in.description,
+            ),
         )
-        db.add(npc)
-        db.commit()
-        db.refresh(npc)
+        await db.commit()
         return npc
 
-    def update(self, db: Session, db_obj: NPC, obj_in: NPCUpdate) -> NPC:
+    async def update(
+        self, db: AsyncSession, npc_id: int, obj_in: NPCUpdate
+    ) -> Optional[NPC]:
         """
-        Mettre à jour un PNJ existant.
+        Mettre à jour partiellement un PNJ en un seul UPDATE ... RETURNING,
+        sans le charger : seuls les champs fournis sont modifiés.
+        Les listes d'IDs fournies remplacent les liens existants.
+        Retourne None si l'entité n'existe pas.
         """
-        update_data = obj_in.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
-
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        npc = await patch(db, NPC, npc_id, obj_in.dict(exclude_unset=True), NPC_LINKS)
+        await db.commit()
+        return npc
 
-    def delete(self, db: Session, npc_id: int) -> Optional[NPC]:
+    async def delete(self, db: AsyncSession, npc_id: int) -> Optional[NPC]:
         """
         Supprimer un PNJ par son ID.
         """
-        npc = db.query(NPC).filter(NPC.id == npc_id).first()
+        npc = await db.get(NPC, npc_id)
         if npc:
-            db.delete(npc)
-            db.commit()
+            await db.delete(npc)
+            # La cascade en base retire ses liens : les listes d'IDs changent
+            await touch(db, Campaign.updated_at, npc.campaign_ids or [])
+            await touch(db, CampaignSession.updated_at, npc.session_ids or [])
+            await db.commit()
         return npc
 
-    def add_campaign(self, db: Session, npc: NPC, campaign_id: int):
+    async def add_campaigns(
+        self, db: AsyncSession, npc_id: int, campaign_ids: List[int]
+    ) -> Optional[int]:
         """
-        Ajouter une campagne à un PNJ.
+        Ajouter des campagnes à un PNJ, en une seule instruction.
+
+        Returns:
+            Optional[int]: Le nombre de liens créés, ou None si l'entité n'existe pas.
         """
-        if campaign_id not in [campaign.id for campaign in npc.campaigns]:
-            npc.campaigns.append(campaign_id)
-            db.commit()
+        added = await add_links(db, NPC_CAMPAIGNS, npc_id, campaign_ids)
+        await db.commit()
+        return added
 
-    def remove_campaign(self, db: Session, npc: NPC, campaign_id: int):
+    async def remove_campaigns(
+        self, db: AsyncSession, npc_id: int, campaign_ids: List[int]
+    ) -> Optional[int]:
         """
-        Retirer une campagne d'un PNJ.
+        Retirer des campagnes d'un PNJ, en une seule instruction.
+
+        Returns:
+            Optional[int]: Le nombre de liens supprimés, ou None si l'entité n'existe pas.
         """
-        npc.campaigns = [
-            campaign for campaign in npc.campaigns if campaign.id != campaign_id
-        ]
-        db.commit()
+        removed = await remove_links(db, NPC_CAMPAIGNS, npc_id, campaign_ids)
+        await db.commit()
+        return removed
 
-    def add_session(self, db: Session, npc: NPC, session_id: int):
+    async def add_sessions(
+        self, db: AsyncSession, npc_id: int, session_ids: List[int]
+    ) -> Optional[int]:
         """
-        Ajouter une session à un PNJ.
+        Ajouter des sessions à un PNJ, en une seule instruction.
+
+        Returns:
+            Optional[int]: Le nombre de liens créés, ou None si l'entité n'existe pas.
         """
-        if session_id not in [session.id for session in npc.sessions]:
-            npc.sessions.append(session_id)
-            db.commit()
+        added = await add_links(db, NPC_SESSIONS, npc_id, session_ids)
+        await db.commit()
+        return added
 
-    def remove_session(self, db: Session, npc: NPC, session_id: int):
+    async def remove_sessions(
+        self, db: AsyncSession, npc_id: int, session_ids: List[int]
+    ) -> Optional[int]:
         """
-        Retirer une session d'un PNJ.
+        Retirer des sessions d'un PNJ, en une seule instruction.
+
+        Returns:
+            Optional[int]: Le nombre de liens supprimés, ou None si l'entité n'existe pas.
         """
-        npc.sessions = [session for session in npc.sessions if session.id != session_id]
-        db.commit()
+        removed = await remove_links(db, NPC_SESSIONS, npc_id, session_ids)
+        await db.commit()
+        return removed
 
 
 # Initialisation de l'instance CRUDNPC
@@ -1,115 +1,245 @@
-from typing import List, Optional
-
-from sqlalchemy.orm import Session
-
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.associations import Association, add_links, remove_links
+from app.crud.pagination import CursorPage, paginate
+from app.crud.returning import insert_returning, patch
+from app.crud.search import autocomplete, fuzzy_search
+from app.crud.timestamps import touch
+from app.db.cache import entity_cache
+from app.db.models.base import campaign_players, session_players
+from app.db.models.campaign import Campaign
+from app.db.models.campaign_session import CampaignSession
 from app.db.models.player import Player
 from app.schemas.schema_player import PlayerCreate, PlayerUpdate
 
+# Tables d'association, vues depuis le joueur
+PLAYER_CAMPAIGNS = Association(
+    campaign_players, "player_id", "campaign_id", Player, Campaign
+)
+PLAYER_SESSIONS = Association(
+    session_players, "player_id", "session_id", Player, CampaignSession
+)
+# Champs des schémas de mise à jour portant des listes d'IDs
+PLAYER_LINKS = {"campaigns": PLAYER_CAMPAIGNS, "sessions": PLAYER_SESSIONS}
+
 
 class CRUDPlayer:
-    def get_by_id(self, db: Session, player_id: int) -> Optional[Player]:
+    async def get_by_id(self, db: AsyncSession, player_id: int) -> Optional[Player]:
         """
         Récupérer un joueur par son ID.
         """
-        return db.query(Player).filter(Player.id == player_id).first()
+        return await entity_cache.get(db, Player, player_id)
 
-    def get_by_user_id(self, db: Session, user_id: int) -> List[Player]:
+    async def get_by_user_id(self, db: AsyncSession, user_id: int) -> List[Player]:
         """
         Récupérer tous les joueurs d'un utilisateur spécifique.
         """
-        return db.query(Player).filter(Player.user_id == user_id).all()
+        result = await db.scalars(select(Player).where(Player.user_id == user_id))
+        return list(result.all())
+
+    async def get_multi(
+        self, db: AsyncSession, cursor: Optional[str] = None, limit: int = 100
+    ) -> CursorPage:
+        """
+        Récupérer une page de joueurs, paginée par curseur sur l'ID.
+        """
+        return await paginate(
+            db,
+            select(Player),
+            keys=(Player.id,),
+            cursor=cursor,
+            limit=limit,
+        )
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        campaign_id: Optional[int] = None,
+        limit: int = 10,
+    ) -> List[dict]:
+        """
+        Rechercher des joueurs par nom, race ou classe, même mal orthographiés,
+        éventuellement parmi ceux d'une campagne.
+        """
+        return await fuzzy_search(
+            db, Player, query, limit, *self._campaign_scope(campaign_id)
+        )
 
-    def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[Player]:
+    async def autocomplete(
+        self,
+        db: AsyncSession,
+        prefix: str,
+        campaign_id: Optional[int] = None,
+        limit: int = 10,
+    ) -> List[dict]:
         """
-        Récupérer une liste de joueurs avec pagination.
+        Proposer les joueurs dont le nom commence par `prefix`.
         """
-        return db.query(Player).offset(skip).limit(limit).all()
+        return await autocomplete(
+            db, Player, prefix, limit, *self._campaign_scope(campaign_id)
+        )
+
+    def _campaign_scope(self, campaign_id: Optional[int]) -> list:
+        if campaign_id is None:
+            return []
+        return [
+            Player.id.in_(
+                select(campaign_players.c.player_id).where(
+                    campaign_players.c.campaign_id == campaign_id
+                )
+            )
+        ]
 
-    def create(self, db: Session, obj_in: PlayerCreate) -> Player:
+    async def create(self, db: AsyncSession, obj_in: PlayerCreate) -> Player:
         """
         Créer un nouveau joueur.
         """
-        player = Player(
-            name=obj_in.name,
-            race=obj_in.race,
-            class_name=obj_in.class_name,
-            background=obj_in.background,
-            alignment=obj_in.alignment,
-            level=obj_in.level,
-            strength=obj_in.strength,
-            dexterity=obj_in.dexterity,
-            constitution=obj_in.constitution,
-            intelligence=obj_in.intelligence,
-            wisdom=obj_in.wisdom,
-            charisma=obj_in.charisma,
-            current_hp=obj_in.current_hp,
-            max_hp=obj_in.max_hp,
-            skills=obj_in.skills,
-            inventory=obj_in.inventory,
-            description=obj_in.description,
-            user_id=obj_in.user_id,
+        player = await insert_returning(
+            db,
+            Player,
+            dict(
+                name=obj_in.name,
+                race=obj_in.race,
+                class_name=obj_in.class_name,
+                background=obj_in.background,
+                alignment=obj_in.alignment,
+                level=obj_in.level,
+                strength=obj_in.strength,
+                dexterity=obj_in.dexterity,
+                constitution=obj_in.constitution,
+                intelligence=obj_in.intelligence,
+                wisdom=obj_in.wisdom,
+                charisma=obj_in.charisma,
+                current_hp=obj_in.current_hp,
+                max_hp=obj_in.max_hp,
+                skills=obj_in.skills,
+                inventory=obj_in.inventory,
+                description=obj_in.description,
+                user_id=obj_in.user_id,
+            ),
         )
-        db.add(player)
-        db.commit()
-        db.refresh(player)
+        await db.commit()
         return player
 
-    def update(self, db: Session, db_obj: Player, obj_in: PlayerUpdate) -> Player:
+    async def update(
+        self, db: AsyncSession, player_id: int, obj_in: PlayerUpdate
+    ) -> Optional[Player]:
         """
-        Mettre à jour un joueur existant.
+        Mettre à jour partiellement un joueur en un seul UPDATE ... RETURNING,
+        sans le charger : seuls les champs fournis sont modifiés.
+        Les listes d'IDs fournies remplacent les liens existants.
+        Retourne None si l'entité n'existe pas.
         """
-        update_data = obj_in.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
+        player = await patch(
+            db, Player, player_id, obj_in.dict(exclude_unset=True), PLAYER_LINKS
+        )
+        await db.commit()
+        return player
+
+    async def set_voice(
+        self, db: AsyncSession, player_id: int, embedding: Optional[bytes]
+    ) -> bool:
+        """
+        Enregistrer l'empreinte vocale d'un joueur, ou l'effacer avec None.
 
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        Returns:
+            bool: False si le joueur n'existe pas.
+        """
+        result = await db.execute(
+            update(Player)
+            .where(Player.id == player_id)
+            .values(voice_embedding=embedding)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount > 0
+
+    async def get_session_voices(
+        self, db: AsyncSession, session_id: int
+    ) -> List[Tuple[int, bytes]]:
+        """
+        Empreintes vocales des joueurs d'une session qui en ont une, en une
+        requête : [(ID du joueur, empreinte), ...].
+        """
+        result = await db.execute(
+            select(Player.id, Player.voice_embedding)
+            .join(session_players, session_players.c.player_id == Player.id)
+            .where(
+                session_players.c.session_id == session_id,
+                Player.voice_embedding.is_not(None),
+            )
+            .order_by(Player.id)
+        )
+        return [(player_id, embedding) for player_id, embedding in result.all()]
 
-    def delete(self, db: Session, player_id: int) -> Optional[Player]:
+    async def delete(self, db: AsyncSession, player_id: int) -> Optional[Player]:
         """
         Supprimer un joueur par son ID.
         """
-        player = db.query(Player).filter(Player.id == player_id).first()
+        player = await db.get(Player, player_id)
         if player:
-            db.delete(player)
-            db.commit()
+            await db.delete(player)
+            # La cascade en base retire ses liens : les listes d'IDs changent
+            await touch(db, Campaign.updated_at, player.campaign_ids or [])
+            await touch(db, CampaignSession.updated_at, player.session_ids or [])
+            await db.commit()
         return player
 
-    def add_campaign(self, db: Session, player: Player, campaign_id: int):
+    async def add_campaigns(
+        self, db: AsyncSession, player_id: int, campaign_ids: List[int]
+    ) -> Optional[int]:
         """
-        Ajouter une campagne à un joueur.
+        Ajouter des campagnes à un joueur, en une seule instruction.
+
+        Returns:
+            Optional[int]: Le nombre de liens créés, ou None si l'entité n'existe pas.
         """
-        if campaign_id not in [campaign.id for campaign in player.campaigns]:
-            player.campaigns.append(campaign_id)
-            db.commit()
+        added = await add_links(db, PLAYER_CAMPAIGNS, player_id, campaign_ids)
+        await db.commit()
+        return added
 
-    def remove_campaign(self, db: Session, player: Player, campaign_id: int):
+    async def remove_campaigns(
+        self, db: AsyncSession, player_id: int, campaign_ids: List[int]
+    ) -> Optional[int]:
         """
-        Retirer une campagne d'un joueur.
+        Retirer des campagnes d'un joueur, en une seule instruction.
+
+        Returns:
+            Optional[int]: Le nombre de liens supprimés, ou None si l'entité n'existe pas.
         """
-        player.campaigns = [
-            campaign for campaign in player.campaigns if campaign.id != campaign_id
-        ]
-        db.commit()
+        removed = await remove_links(db, PLAYER_CAMPAIGNS, player_id, campaign_ids)
+        await db.commit()
+        return removed
 
-    def add_session(self, db: Session, player: Player, session_id: int):
+    async def add_sessions(
+        self, db: AsyncSession, player_id: int, session_ids: List[int]
+    ) -> Optional[int]:
         """
-        Ajouter une session à un joueur.
+        Ajouter des sessions à un joueur, en une seule instruction.
+
+        Returns:
+            Optional[int]: Le nombre de liens créés, ou None si l'entité n'existe pas.
         """
-        if session_id not in [session.id for session in player.sessions]:
-            player.sessions.append(session_id)
-            db.commit()
+        added = await add_links(db, PLAYER_SESSIONS, player_id, session_ids)
+        await db.commit()
+        return added
 
-    def remove_session(self, db: Session, player: Player, session_id: int):
+    async def remove_sessions(
+        self, db: AsyncSession, player_id: int, session_ids: List[int]
+    ) -> Optional[int]:
         """
-        Retirer une session d'un joueur.
+        Retirer des sessions d'un joueur, en une seule instruction.
+
+        Returns:
+            Optional[int]: Le nombre de liens supprimés, ou None si l'entité n'existe pas.
         """
-        player.sessions = [
-            session for session in player.sessions if session.id != session_id
-        ]
-        db.commit()
+        removed = await remove_links(db, PLAYER_SESSIONS, player_id, session_ids)
+        await db.commit()
+        return removed
 
 
 # Initialisation de l'instance CRUDPlayer
@@ -1,102 +1,205 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import CampaignSession
+from app.crud.associations import Association, add_links, remove_links
+from app.crud.crud_waveform import crud_waveform
+from app.crud.pagination import CursorPage, paginate
+from app.crud.returning import insert_returning, patch
+from app.db.models import NPC, CampaignSession, Player
+from app.db.models.base import session_npcs, session_players
 from app.schemas import SessionCreate, SessionUpdate
 
+# Tables d'association, vues depuis la session
+SESSION_PLAYERS = Association(
+    session_players, "session_id", "player_id", CampaignSession, Player
+)
+SESSION_NPCS = Association(session_npcs, "session_id", "npc_id", CampaignSession, NPC)
+# Champs des schémas de mise à jour portant des listes d'IDs
+SESSION_LINKS = {"players": SESSION_PLAYERS, "npcs": SESSION_NPCS}
+
 
 class CRUDSession:
-    def get_by_id(self, db: Session, session_id: int) -> Optional[CampaignSession]:
+    async def get_by_id(
+        self, db: AsyncSession, session_id: int
+    ) -> Optional[CampaignSession]:
         """
         Récupérer une session par son ID.
         """
-        return (
-            db.query(CampaignSession).filter(CampaignSession.id == session_id).first()
+        return await db.scalar(
+            select(CampaignSession).where(CampaignSession.id == session_id)
         )
 
-    def get_multi(
-        self, db: Session, skip: int = 0, limit: int = 100
-    ) -> List[CampaignSession]:
+    async def get_updated_at(
+        self, db: AsyncSession, session_id: int
+    ) -> Optional[datetime]:
         """
-        Récupérer une liste de sessions avec pagination.
+        Date de dernière modification d'une session, sans charger la ligne.
+        Retourne None si elle n'existe pas.
         """
-        return db.query(CampaignSession).offset(skip).limit(limit).all()
+        return await db.scalar(
+            select(
+                func.coalesce(CampaignSession.updated_at, func.to_timestamp(0))
+            ).where(CampaignSession.id == session_id)
+        )
+
+    async def get_multi(
+        self, db: AsyncSession, cursor: Optional[str] = None, limit: int = 100
+    ) -> CursorPage:
+        """
+        Récupérer une page de sessions, paginée par curseur sur l'ID.
+        """
+        return await paginate(
+            db,
+            select(CampaignSession),
+            keys=(CampaignSession.id,),
+            cursor=cursor,
+            limit=limit,
+        )
 
-    def create(self, db: Session, obj_in: SessionCreate) -> CampaignSession:
+    async def create(self, db: AsyncSession, obj_in: SessionCreate) -> CampaignSession:
         """
         Créer une nouvelle session.
         """
-        session = CampaignSession(
-            title=obj_in.title,
-            date=obj_in.date,
-            description=obj_in.description,
-            audio_path=obj_in.audio_path,
-            campaign_id=obj_in.campaign_id,
+        session = await insert_returning(
+            db,
+            CampaignSession,
+            dict(
+                title=obj_in.title,
+                date=obj_in.date,
+                description=obj_in.description,
+                audio_path=obj_in.audio_path,
+                campaign_id=obj_in.campaign_id,
+            ),
         )
-        db.add(session)
-        db.commit()
-        db.refresh(session)
+        await db.commit()
         return session
 
-    def update(
-        self, db: Session, db_obj: CampaignSession, obj_in: SessionUpdate
-    ) -> CampaignSession:
+    async def update(
+        self, db: AsyncSession, session_id: int, obj_in: SessionUpdate
+    ) -> Optional[CampaignSession]:
+        """
+        Mettre à jour partiellement une session en un seul UPDATE ... RETURNING,
+        sans la charger : seuls les champs fournis sont modifiés.
+        Les listes d'IDs fournies remplacent les liens existants.
+        Retourne None si l'entité n'existe pas.
+        """
+        data = obj_in.dict(exclude_unset=True)
+        if "audio_path" in data:
+            # Les passages parlés et la forme d'onde décrivaient l'ancien audio
+            data["speech_segments"] = None
+            await crud_waveform.delete_for_session(db, session_id)
+        session = await patch(db, CampaignSession, session_id, data, SESSION_LINKS)
+        await db.commit()
+        return session
+
+    async def get_speech_segments(
+        self, db: AsyncSession, session_id: int
+    ) -> Optional[List[List[int]]]:
         """
-        Mettre à jour une session existante.
+        Passages parlés détectés dans l'audio d'une session, ou None s'ils
+        n'ont pas encore été calculés.
         """
-        update_data = obj_in.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
+        return await db.scalar(
+            select(CampaignSession.speech_segments).where(
+                CampaignSession.id == session_id
+            )
+        )
 
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+    async def set_speech_segments(
+        self,
+        db: AsyncSession,
+        session_id: int,
+        audio_path: str,
+        segments: Sequence[Tuple[int, int]],
+    ) -> bool:
+        """
+        Enregistrer les passages parlés détectés dans `audio_path`, si c'est
+        toujours l'audio de la session. Données dérivées : la date de
+        modification de la session n'est pas changée.
 
-    def delete(self, db: Session, session_id: int) -> Optional[CampaignSession]:
+        Returns:
+            bool: False si la session n'existe plus ou a changé d'audio.
+        """
+        result = await db.execute(
+            update(CampaignSession)
+            .where(
+                CampaignSession.id == session_id,
+                CampaignSession.audio_path == audio_path,
+            )
+            .values(
+                speech_segments=[list(segment) for segment in segments],
+                updated_at=CampaignSession.updated_at,
+            )
+        )
+        await db.commit()
+        return result.rowcount > 0
+
+    async def delete(
+        self, db: AsyncSession, session_id: int
+    ) -> Optional[CampaignSession]:
         """
         Supprimer une session par son ID.
         """
-        session = (
-            db.query(CampaignSession).filter(CampaignSession.id == session_id).first()
-        )
+        session = await db.get(CampaignSession, session_id)
         if session:
-            db.delete(session)
-            db.commit()
+            await db.delete(session)
+            await db.commit()
         return session
 
-    def add_player(self, db: Session, session: CampaignSession, player_id: int):
+    async def add_players(
+        self, db: AsyncSession, session_id: int, player_ids: List[int]
+    ) -> Optional[int]:
         """
-        Ajouter un joueur à une session.
+        Ajouter des joueurs à une session, en une seule instruction.
+
+        Returns:
+            Optional[int]: Le nombre de liens créés, ou None si l'entité n'existe pas.
         """
-        if player_id not in [player.id for player in session.players]:
-            session.players.append(player_id)
-            db.commit()
+        added = await add_links(db, SESSION_PLAYERS, session_id, player_ids)
+        await db.commit()
+        return added
 
-    def remove_player(self, db: Session, session: CampaignSession, player_id: int):
+    async def remove_players(
+        self, db: AsyncSession, session_id: int, player_ids: List[int]
+    ) -> Optional[int]:
         """
-        Retirer un joueur d'une session.
+        Retirer des joueurs d'une session, en une seule instruction.
+
+        Returns:
+            Optional[int]: Le nombre de liens supprimés, ou None si l'entité n'existe pas.
         """
-        session.players = [
-            player for player in session.players if player.id != player_id
-        ]
-        db.commit()
+        removed = await remove_links(db, SESSION_PLAYERS, session_id, player_ids)
+        await db.commit()
+        return removed
 
-    def add_npc(self, db: Session, session: CampaignSession, npc_id: int):
+    async def add_npcs(
+        self, db: AsyncSession, session_id: int, npc_ids: List[int]
+    ) -> Optional[int]:
         """
-        Ajouter un PNJ à une session.
+        Ajouter des PNJs à une session, en une seule instruction.
+
+        Returns:
+            Optional[int]: Le nombre de liens créés, ou None si l'entité n'existe pas.
         """
-        if npc_id not in [npc.id for npc in session.npcs]:
-            session.npcs.append(npc_id)
-            db.commit()
+        added = await add_links(db, SESSION_NPCS, session_id, npc_ids)
+        await db.commit()
+        return added
 
-    def remove_npc(self, db: Session, session: CampaignSession, npc_id: int):
+    async def remove_npcs(
+        self, db: AsyncSession, session_id: int, npc_ids: List[int]
+    ) -> Optional[int]:
         """
-        Retirer un PNJ d'une session.
+        Retirer des PNJs d'une session, en une seule instruction.
+
+        Returns:
+            Optional[int]: Le nombre de liens supprimés, ou None si l'entité n'existe pas.
         """
-        session.npcs = [npc for npc in session.npcs if npc.id != npc_id]
-        db.commit()
+        removed = await remove_links(db, SESSION_NPCS, session_id, npc_ids)
+        await db.commit()
+        return removed
 
 
 # Initialisation de l'instance CRUDSession
@@ -1,9 +1,18 @@
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.crud.pagination import CursorPage, paginate
+from app.crud.returning import insert_returning, patch
 from app.db.models.user import User
 from app.schemas.schema_user import UserCreate, UserUpdate
+from app.utils.password_pool import password_pool
+
+# Code SQLSTATE d'une violation de contrainte d'unicité
+UNIQUE_VIOLATION = "23505"
 
 
 class DuplicateUserError(Exception):
@@ -17,89 +26,126 @@ class DuplicateUserError(Exception):
         super().__init__(message)
 
 
+@asynccontextmanager
+async def _unique_user():
+    """
+    Traduire une violation d'unicité (username, email) en DuplicateUserError.
+    La session est annulée par l'appelant (fermeture de la requête).
+    """
+    try:
+        yield
+    except IntegrityError as e:
+        if getattr(e.orig, "sqlstate", None) == UNIQUE_VIOLATION:
+            raise DuplicateUserError() from e
+        raise
+
+
 class CRUDUser:
 
-    def get_by_id(self, db: Session, user_id: int) -> Optional[User]:
+    async def get_by_id(self, db: AsyncSession, user_id: int) -> Optional[User]:
         """
         Récupérer un utilisateur par son ID.
         """
-        return db.query(User).filter(User.id == user_id).first()
+        return await db.scalar(select(User).where(User.id == user_id))
 
-    def get_by_username(self, db: Session, username: str) -> Optional[User]:
+    async def get_by_username(self, db: AsyncSession, username: str) -> Optional[User]:
         """
         Récupérer un utilisateur par son nom d'utilisateur.
         """
-        return db.query(User).filter(User.username == username).first()
+        return await db.scalar(select(User).where(User.username == username))
 
-    def get_by_email(self, db: Session, email: str) -> Optional[User]:
+    async def get_by_email(self, db: AsyncSession, email: str) -> Optional[User]:
         """
         Récupérer un utilisateur par son email.
         """
-        return db.query(User).filter(User.email == email).first()
-
-    def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-        """
-        Récupérer une liste d'utilisateurs avec pagination.
-        """
-        return db.query(User).offset(skip).limit(limit).all()
+        return await db.scalar(select(User).where(User.email == email))
 
-    def create(self, db: Session, obj_in: UserCreate) -> User:
+    async def get_multi(
+        self, db: AsyncSession, cursor: Optional[str] = None, limit: int = 100
+    ) -> CursorPage:
         """
-        Créer un utilisateur avec gestion des doublons explicite.
+        Récupérer une page de utilisateurs, paginée par curseur sur l'ID.
         """
-        existing_user = (
-            db.query(User)
-            .filter((User.username == obj_in.username) | (User.email == obj_in.email))
-            .first()
+        return await paginate(
+            db,
+            select(User),
+            keys=(User.id,),
+            cursor=cursor,
+            limit=limit,
         )
 
-        if existing_user:
-            raise DuplicateUserError()
-
-        new_user = User(
-            username=obj_in.username,
-            email=obj_in.email,
-            hashed_password=obj_in.hashed_password,
-            is_active=obj_in.is_active,
-            is_superuser=obj_in.is_superuser,
-            role=obj_in.role,
-        )
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+    async def create(self, db: AsyncSession, obj_in: UserCreate) -> User:
+        """
+        Créer un utilisateur. Les doublons sont détectés par les contraintes
+        d'unicité, sans requête préalable.
+
+        Raises:
+            DuplicateUserError: Si le nom d'utilisateur ou l'email est déjà utilisé.
+        """
+        async with _unique_user():
+            new_user = await insert_returning(
+                db,
+                User,
+                dict(
+                    username=obj_in.username,
+                    email=obj_in.email,
+                    hashed_password=obj_in.hashed_password,
+                    is_active=obj_in.is_active,
+                    is_superuser=obj_in.is_superuser,
+                    role=obj_in.role,
+                ),
+            )
+            await db.commit()
         return new_user
 
-    def update(self, db: Session, db_obj: User, obj_in: UserUpdate) -> User:
+    async def update(
+        self, db: AsyncSession, user_id: int, obj_in: UserUpdate
+    ) -> Optional[User]:
         """
-        Mettre à jour un utilisateur existant.
-        """
-        update_data = obj_in.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
+        Mettre à jour partiellement un utilisateur en un seul UPDATE ... RETURNING,
+        sans le charger : seuls les champs fournis sont modifiés.
+        Retourne None si l'entité n'existe pas.
 
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        Raises:
+            DuplicateUserError: Si le nom d'utilisateur ou l'email est déjà utilisé.
+        """
+        async with _unique_user():
+            user = await patch(db, User, user_id, obj_in.dict(exclude_unset=True))
+            await db.commit()
+        return user
 
-    def delete(self, db: Session, user_id: int) -> Optional[User]:
+    async def delete(self, db: AsyncSession, user_id: int) -> Optional[User]:
         """
         Supprimer un utilisateur par son ID.
         """
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.get(User, user_id)
         if user:
-            db.delete(user)
-            db.commit()
+            await db.delete(user)
+            await db.commit()
         return user
 
-    def authenticate(self, db: Session, username: str, password: str) -> Optional[User]:
+    async def authenticate(
+        self, db: AsyncSession, username: str, password: str
+    ) -> Optional[User]:
         """
         Authentifier un utilisateur en comparant le mot de passe haché.
-        """
-        user = self.get_by_username(db, username)
-        if user and self.verify_password(password, user.hashed_password):
-            return user
-        return None
+
+        bcrypt tourne dans le pool de processus dédié. Si le coût bcrypt a
+        changé depuis le hachage, le mot de passe est rehaché et enregistré.
+
+        Raises:
+            PasswordPoolBusyError: Si le pool de hachage est saturé.
+        """
+        user = await self.get_by_username(db, username)
+        if not user:
+            return None
+        valid, new_hash = await password_pool.verify(password, user.hashed_password)
+        if not valid:
+            return None
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
+        return user
 
     def is_superuser(self, user: User) -> bool:
         """
@@ -107,22 +153,18 @@ class CRUDUser:
         """
         return user.is_superuser
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """
-        Vérifier le mot de passe (implémentez cette méthode avec votre fonction de hashage).
+        Vérifier un mot de passe, dans le pool de hachage.
         """
-        # Implémentez ici la vérification de mot de passe avec votre méthode de hashage
-        from app.utils.security import verify_password as verify_password_hash
+        valid, _ = await password_pool.verify(plain_password, hashed_password)
+        return valid
 
-        return verify_password_hash(plain_password, hashed_password)
-
-    def set_password(self, user: User, plain_password: str):
+    async def set_password(self, user: User, plain_password: str):
         """
         Définir un mot de passe pour un utilisateur.
         """
-        from app.utils.security import get_password_hash
-
-        user.hashed_password = get_password_hash(plain_password)
+        user.hashed_password = await password_pool.hash(plain_password)
 
 
 # Initialisation d'une instance CRUDUser
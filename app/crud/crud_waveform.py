@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import CampaignSession, Waveform
+
+# Colonne des pics pour chaque taille d'entier
+PEAK_COLUMNS = {8: Waveform.peaks8, 16: Waveform.peaks16}
+
+
+class CRUDWaveform:
+    async def get_version(self, db: AsyncSession, session_id: int) -> Optional[Row]:
+        """
+        Version de la forme d'onde d'une session et nombre de ses niveaux,
+        sans lire les pics : (created_at, levels). Retourne None si elle
+        n'a pas été calculée.
+        """
+        row = (
+            await db.execute(
+                select(
+                    func.max(Waveform.created_at).label("created_at"),
+                    func.count().label("levels"),
+                ).where(Waveform.session_id == session_id)
+            )
+        ).one()
+        return row if row.levels else None
+
+    async def get_level(
+        self, db: AsyncSession, session_id: int, zoom: int, bits: int
+    ) -> Optional[Row]:
+        """
+        Un niveau de détail de la forme d'onde, avec les seuls pics de la
+        taille demandée : (samples_per_peak, sample_rate, peaks).
+        """
+        result = await db.execute(
+            select(
+                Waveform.samples_per_peak,
+                Waveform.sample_rate,
+                PEAK_COLUMNS[bits].label("peaks"),
+            ).where(Waveform.session_id == session_id, Waveform.zoom == zoom)
+        )
+        return result.one_or_none()
+
+    async def replace(
+        self,
+        db: AsyncSession,
+        session_id: int,
+        audio_path: str,
+        levels: Sequence[dict],
+    ) -> bool:
+        """
+        Remplacer la forme d'onde d'une session par celle calculée depuis
+        `audio_path`, si c'est toujours son audio. La ligne de la session
+        est verrouillée (FOR SHARE) jusqu'à la validation : un nouvel audio
+        enregistré entre-temps attend, puis efface ce résultat.
+
+        Returns:
+            bool: False si la session n'existe plus ou a changé d'audio.
+        """
+        current = await db.scalar(
+            select(CampaignSession.id)
+            .where(
+                CampaignSession.id == session_id,
+                CampaignSession.audio_path == audio_path,
+            )
+            .with_for_update(read=True)
+        )
+        if current is None:
+            await db.rollback()
+            return False
+        await self.delete_for_session(db, session_id)
+        created_at = datetime.now(timezone.utc)
+        await db.execute(
+            insert(Waveform),
+            [
+                dict(level, session_id=session_id, zoom=zoom, created_at=created_at)
+                for zoom, level in enumerate(levels)
+            ],
+        )
+        await db.commit()
+        return True
+
+    async def delete_for_session(self, db: AsyncSession, session_id: int):
+        """
+        Supprimer la forme d'onde d'une session. Ne valide pas la transaction.
+        """
+        await db.execute(
+            delete(Waveform)
+            .where(Waveform.session_id == session_id)
+            .execution_options(synchronize_session=False)
+        )
+
+
+# Instance CRUDWaveform
+crud_waveform = CRUDWaveform()
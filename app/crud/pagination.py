@@ -0,0 +1,105 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.elements import Label
+
+
+class InvalidCursorError(ValueError):
+    def __init__(self, message="Curseur de pagination invalide."):
+        """
+        Initialiser l'exception InvalidCursorError.
+
+        Args:
+            message (str): Le message d'erreur.
+        """
+        super().__init__(message)
+
+
+@dataclass
+class CursorPage:
+    """
+    Page de résultats avec les curseurs opaques des pages voisines.
+    """
+
+    items: List = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def encode_cursor(values: Sequence, backward: bool = False) -> str:
+    """
+    Encoder la clé de tri d'une ligne en curseur opaque.
+    """
+    payload = json.dumps({"k": list(values), "b": backward}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple[list, bool]:
+    """
+    Décoder un curseur en (valeurs de la clé de tri, sens de lecture).
+
+    Raises:
+        InvalidCursorError: Si le curseur est illisible ou ne correspond pas à la clé.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        values, backward = payload["k"], payload["b"]
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError() from e
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError()
+    return values, bool(backward)
+
+
+async def paginate(
+    db: AsyncSession,
+    statement: Select,
+    keys: Sequence[Union[InstrumentedAttribute, Label]],
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    descending: bool = False,
+) -> CursorPage:
+    """
+    Paginer une requête par jeu de clés (keyset) plutôt que par OFFSET.
+
+    La requête est triée sur `keys`, qui doit former une clé unique, et filtrée
+    par comparaison de tuples avec la clé du curseur : le coût d'une page ne
+    dépend pas de sa position dans le résultat. Une clé peut aussi être une
+    expression étiquetée (`label`) chargée sur les objets sous le même nom.
+    """
+    values, backward = decode_cursor(cursor, len(keys)) if cursor else ([], False)
+    reverse = backward != descending
+    if values:
+        key, bound = tuple_(*keys), tuple_(*values)
+        statement = statement.where(key < bound if reverse else key > bound)
+    order = [column.desc() for column in keys] if reverse else list(keys)
+    result = await db.scalars(statement.order_by(*order).limit(limit + 1))
+    items = list(result.all())
+    has_more = len(items) > limit
+    items = items[:limit]
+    if backward:
+        items.reverse()
+
+    def key_of(item) -> list:
+        return [getattr(item, column.key) for column in keys]
+
+    page = CursorPage(items=items)
+    if items:
+        if has_more or backward:
+            page.next_cursor = encode_cursor(key_of(items[-1]))
+        if values and (has_more or not backward):
+            page.prev_cursor = encode_cursor(key_of(items[0]), backward=True)
+    elif values:
+        # Page vide : permettre de revenir en arrière depuis la borne demandée
+        if backward:
+            page.next_cursor = encode_cursor(values)
+        else:
+            page.prev_cursor = encode_cursor(values, backward=True)
+    return page
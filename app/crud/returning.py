@@ -0,0 +1,134 @@
+from typing import Dict, Optional
+
+from sqlalchemy import Column, insert, inspect, literal_column, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.elements import Label
+from sqlalchemy.sql.selectable import ScalarSelect
+
+from app.crud.associations import Association, set_links
+from app.db.cache import entity_cache
+
+
+def returning_columns(model) -> list:
+    """
+    Colonnes chargées d'une entité (colonnes de la table et listes d'IDs
+    projetées), nommées comme ses attributs, pour une clause RETURNING.
+
+    PostgreSQL accepte des sous-requêtes corrélées dans RETURNING, mais
+    SQLAlchemy n'y corrèle pas la table écrite : les listes d'IDs désignent
+    donc ses colonnes par leur nom qualifié.
+    """
+    mapper = inspect(model)
+    table = mapper.local_table
+    columns = []
+    for attribute in mapper.column_attrs:
+        if attribute.deferred:
+            continue
+        column = attribute.columns[0]
+        if isinstance(column, Column) and column.table is table:
+            columns.append(column.label(attribute.key))
+        elif isinstance(column, Label) and isinstance(column.element, ScalarSelect):
+            columns.append(_by_name(column.element, table).label(attribute.key))
+    return columns
+
+
+def _by_name(expression, table):
+    return visitors.replacement_traverse(
+        expression,
+        {},
+        lambda element: (
+            literal_column(f"{table.name}.{element.name}")
+            if isinstance(element, Column) and element.table is table
+            else None
+        ),
+    )
+
+
+def _load(db: AsyncSession, model, values: dict):
+    """
+    Rattacher à la session l'entité décrite par une ligne RETURNING, ou
+    mettre à jour celle qu'elle contient déjà, sans nouvelle requête.
+    """
+    mapper = inspect(model)
+    identity = mapper.identity_key_from_primary_key([values["id"]])
+    entity = db.sync_session.identity_map.get(identity)
+    fresh = entity is None
+    if fresh:
+        entity = mapper.class_manager.new_instance()
+    for key, value in values.items():
+        set_committed_value(entity, key, value)
+    if fresh:
+        make_transient_to_detached(entity)
+        db.add(entity)
+    return entity
+
+
+async def insert_returning(db: AsyncSession, model, values: dict):
+    """
+    Insérer une ligne et retourner l'entité complète en un seul aller-retour
+    (INSERT ... RETURNING). Ne valide pas la transaction.
+    """
+    result = await db.execute(
+        insert(model).values(values).returning(*returning_columns(model))
+    )
+    return _load(db, model, result.one()._asdict())
+
+
+async def update_returning(db: AsyncSession, model, entity_id: int, values: dict):
+    """
+    Modifier une ligne par son ID et retourner l'entité complète en un seul
+    aller-retour (UPDATE ... RETURNING). Retourne None si elle n'existe pas.
+    Ne valide pas la transaction.
+
+    Les valeurs `onupdate` des colonnes (updated_at) sont appliquées.
+    """
+    columns = returning_columns(model)
+    if values:
+        statement = (
+            update(model)
+            .where(model.id == entity_id)
+            .values(values)
+            .returning(*columns)
+        )
+    else:
+        statement = select(*columns).where(model.id == entity_id)
+    row = (await db.execute(statement)).one_or_none()
+    if row is None:
+        return None
+    if values:
+        await entity_cache.invalidate(db, model, [entity_id])
+    return _load(db, model, row._asdict())
+
+
+def column_values(model, data: dict) -> dict:
+    """
+    Garder, parmi des champs de schéma, ceux qui sont des colonnes de la table.
+    """
+    table = inspect(model).local_table
+    return {key: value for key, value in data.items() if key in table.c}
+
+
+async def patch(
+    db: AsyncSession,
+    model,
+    entity_id: int,
+    data: dict,
+    links: Optional[Dict[str, Association]] = None,
+):
+    """
+    Appliquer une mise à jour partielle sans charger l'entité au préalable.
+
+    `data` ne contient que les champs fournis par le client (exclude_unset).
+    Les listes d'IDs désignées par `links` remplacent les liens existants par
+    des écritures ensemblistes, les autres champs forment un seul UPDATE ...
+    RETURNING, exécuté après elles pour retourner des listes à jour. Retourne
+    None si l'entité n'existe pas. Ne valide pas la transaction.
+    """
+    for field, association in (links or {}).items():
+        ids = data.get(field)
+        if ids is not None and await set_links(db, association, entity_id, ids) is None:
+            return None
+    return await update_returning(db, model, entity_id, column_values(model, data))
@@ -0,0 +1,73 @@
+import sys
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.base import name_prefix
+
+
+def _prefix_bounds(prefix: str) -> Tuple[str, Optional[str]]:
+    # [prefix, prefix suivant[ : un intervalle, contrairement à LIKE 'prefix%',
+    # reste indexable quand le préfixe est un paramètre (plans génériques).
+    # Les derniers caractères U+10FFFF n'ont pas de suivant : ils sont retirés
+    # de la borne haute, absente si rien ne reste.
+    stem = prefix.rstrip(chr(sys.maxunicode))
+    if not stem:
+        return prefix, None
+    next_char = ord(stem[-1]) + 1
+    if 0xD800 <= next_char <= 0xDFFF:
+        next_char = 0xE000
+    return prefix, stem[:-1] + chr(next_char)
+
+
+def _match_columns(model, score):
+    return (
+        model.id,
+        model.name,
+        model.race,
+        model.class_name,
+        score.label("score"),
+    )
+
+
+async def fuzzy_search(
+    db: AsyncSession, model, query: str, limit: int, *criteria
+) -> List[dict]:
+    """
+    Recherche approximative (trigrammes) sur le `search_text` d'un modèle.
+
+    Tolère les fautes de frappe et les mots partiels : les lignes dont un
+    fragment ressemble assez à `query` (pg_trgm.word_similarity_threshold)
+    sont triées par distance, ce que l'index GiST sert directement.
+    """
+    term = literal(query)
+    statement = (
+        select(*_match_columns(model, func.word_similarity(term, model.search_text)))
+        .where(term.op("<%")(model.search_text), *criteria)
+        .order_by(term.op("<<->")(model.search_text))
+        .limit(limit)
+    )
+    result = await db.execute(statement)
+    return [dict(row) for row in result.mappings().all()]
+
+
+async def autocomplete(
+    db: AsyncSession, model, prefix: str, limit: int, *criteria
+) -> List[dict]:
+    """
+    Autocomplétion : noms commençant par `prefix` (sans tenir compte de la
+    casse), dans l'ordre de l'index de préfixe.
+    """
+    name = name_prefix(model.name)
+    lower, upper = _prefix_bounds(prefix.lower())
+    if upper is not None:
+        criteria += (name < upper,)
+    statement = (
+        select(*_match_columns(model, func.similarity(model.name, prefix)))
+        .where(name >= lower, *criteria)
+        .order_by(name, model.id)
+        .limit(limit)
+    )
+    result = await db.execute(statement)
+    return [dict(row) for row in result.mappings().all()]
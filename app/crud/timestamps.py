@@ -0,0 +1,29 @@
+from typing import Iterable
+
+from sqlalchemy import Integer, any_, bindparam, func, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.db.cache import entity_cache
+
+
+async def touch(db: AsyncSession, column: InstrumentedAttribute, ids: Iterable[int]):
+    """
+    Horodater maintenant des lignes modifiées indirectement (liens, dialogues),
+    pour que leurs validateurs HTTP (ETag, Last-Modified) changent.
+
+    clock_timestamp() plutôt que now() : l'heure de l'instruction, et non du
+    début de la transaction, suit mieux l'ordre des commits.
+    """
+    ids = sorted(set(ids))
+    if not ids:
+        return
+    model = column.class_
+    await db.execute(
+        update(model)
+        .where(model.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))))
+        .values({column: func.clock_timestamp()})
+        .execution_options(synchronize_session=False)
+    )
+    await entity_cache.invalidate(db, model, ids)
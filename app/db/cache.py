@@ -0,0 +1,268 @@
+import asyncio
+import logging
+import pickle
+from itertools import chain
+from typing import Iterable, List, Optional, Set
+
+import asyncpg
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.cache import CacheStats, MemoryCache, RedisCache
+from app.core.config import settings
+from app.db.models import NPC, Campaign, CampaignSession, Player
+from app.db.session import RoutingSession, SessionLocal, engine, replica_engine
+
+logger = logging.getLogger(__name__)
+
+# Canal PostgreSQL transportant les clés invalidées vers tous les workers
+INVALIDATION_CHANNEL = "rpspy_cache_invalidation"
+# Une notification PostgreSQL est limitée à 8000 octets
+NOTIFY_PAYLOAD_LIMIT = 7000
+LISTEN_RETRY_DELAY = 5.0
+_PENDING = "cache_invalidations"
+
+# Entités lues sur presque toutes les pages et rarement modifiées
+CACHED_MODELS = (Campaign, Player, NPC)
+# Listes d'IDs désignant des entités en cache : supprimer l'entité (et ses
+# liens, en cascade) modifie aussi la liste vue depuis l'autre côté.
+RELATED_IDS = {
+    Campaign: {"player_ids": Player, "npc_ids": NPC},
+    CampaignSession: {"player_ids": Player, "npc_ids": NPC},
+    Player: {"campaign_ids": Campaign},
+    NPC: {"campaign_ids": Campaign},
+}
+
+
+def cache_key(model, entity_id: int) -> str:
+    return f"{model.__tablename__}:{entity_id}"
+
+
+class EntityCache:
+    """
+    Cache en lecture (read-through) des entités, par ID.
+
+    Les entrées sont des instantanés des colonnes chargées (dont les listes
+    d'IDs projetées), rattachés à la session de l'appelant sans requête. Un
+    cache local LRU+TTL est consulté en premier, puis le cache partagé s'il
+    est configuré. Les écritures invalident les entrées concernées dans la
+    même transaction (NOTIFY), ce qui atteint tous les workers au commit.
+    """
+
+    def __init__(
+        self, enabled: bool, local: MemoryCache, shared: Optional[RedisCache] = None
+    ):
+        self.enabled = enabled
+        self.local = local
+        self.shared = shared
+        self.stats = local.stats
+        # Incrémenté à chaque invalidation : un chargement concurrent d'une
+        # invalidation n'est pas mis en cache
+        self._generation = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def get(self, db: AsyncSession, model, entity_id: int):
+        """
+        Récupérer une entité par son ID, depuis le cache si possible.
+        """
+        statement = select(model).where(model.id == entity_id)
+        if not self.enabled:
+            return await db.scalar(statement)
+
+        key = cache_key(model, entity_id)
+        payload = self.local.get(key)
+        if payload is not None:
+            self.stats.local_hits += 1
+        elif self.shared is not None:
+            payload = await self.shared.get(key)
+            if payload is not None:
+                self.stats.shared_hits += 1
+                self.local.set(key, payload)
+        if payload is not None:
+            return self._restore(db, model, pickle.loads(payload))
+
+        self.stats.misses += 1
+        generation = self._generation
+        if db.info.get("read_only") and replica_engine is not engine:
+            # Remplir depuis le primaire : le retard de la réplique ne doit pas
+            # réintroduire une valeur qui vient d'être invalidée
+            async with SessionLocal() as primary:
+                entity = await primary.scalar(statement)
+                snapshot = self._snapshot(entity) if entity else None
+            entity = self._restore(db, model, snapshot) if snapshot else None
+        else:
+            entity = await db.scalar(statement)
+            snapshot = self._snapshot(entity) if entity else None
+        if snapshot is not None and generation == self._generation:
+            payload = pickle.dumps(snapshot)
+            self.local.set(key, payload)
+            if self.shared is not None:
+                await self.shared.set(key, payload)
+        return entity
+
+    async def invalidate(self, db: AsyncSession, model, ids: Iterable[int]):
+        """
+        Invalider des entités modifiées hors de l'ORM (instructions SQL
+        directes). Prend effet au commit de la transaction en cours.
+        """
+        if not self.enabled or model not in CACHED_MODELS:
+            return
+        keys = {cache_key(model, entity_id) for entity_id in ids}
+        if keys:
+            await db.run_sync(lambda session: self._publish(session, keys))
+            if self.shared is not None:
+                await self.shared.delete(keys)
+
+    def keys_for(self, entity, deleted: bool = False) -> Set[str]:
+        """
+        Clés à invalider lorsqu'une entité est modifiée ou supprimée.
+        """
+        model = type(entity)
+        keys = set()
+        if model in CACHED_MODELS:
+            keys.add(cache_key(model, entity.id))
+        if deleted:
+            loaded = inspect(entity).dict
+            for attribute, related in RELATED_IDS.get(model, {}).items():
+                keys.update(cache_key(related, i) for i in loaded.get(attribute) or ())
+        return keys
+
+    def _publish(self, session, keys: Set[str]):
+        # NOTIFY est transactionnel : rien n'est envoyé en cas de rollback
+        session.info.setdefault(_PENDING, set()).update(keys)
+        connection = session.connection()
+        for payload in _chunks(sorted(keys)):
+            connection.execute(select(func.pg_notify(INVALIDATION_CHANNEL, payload)))
+
+    def _drop(self, keys: Iterable[str]):
+        self._generation += 1
+        self.local.delete(keys)
+
+    def _snapshot(self, entity) -> dict:
+        state = inspect(entity)
+        return {
+            attribute.key: state.dict[attribute.key]
+            for attribute in state.mapper.column_attrs
+            if attribute.key in state.dict
+        }
+
+    def _restore(self, db: AsyncSession, model, snapshot: dict):
+        mapper = inspect(model)
+        identity = mapper.identity_key_from_primary_key([snapshot["id"]])
+        existing = db.sync_session.identity_map.get(identity)
+        if existing is not None:
+            return existing
+        entity = mapper.class_manager.new_instance()
+        for key, value in snapshot.items():
+            set_committed_value(entity, key, value)
+        make_transient_to_detached(entity)
+        db.add(entity)
+        return entity
+
+    async def listen(self):
+        """
+        Écouter les invalidations publiées par tous les workers (LISTEN), en
+        se reconnectant si la connexion est perdue.
+        """
+        dsn = make_url(settings.POSTGRES_URL).set(drivername="postgresql")
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(
+                    dsn.render_as_string(hide_password=False)
+                )
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(
+                    INVALIDATION_CHANNEL, self._on_notification
+                )
+                # Des invalidations ont pu être manquées hors écoute
+                self._generation += 1
+                self.local.clear()
+                await closed.wait()
+            except asyncio.CancelledError:
+                if connection is not None:
+                    await connection.close()
+                raise
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("Écoute des invalidations de cache interrompue : %s", e)
+            await asyncio.sleep(LISTEN_RETRY_DELAY)
+
+    def _on_notification(self, connection, pid, channel, payload: str):
+        keys = payload.split()
+        self.stats.invalidations += len(keys)
+        self._drop(keys)
+        if self.shared is not None:
+            task = asyncio.create_task(self.shared.delete(keys))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def status(self) -> dict:
+        return {
+            **self.stats.snapshot(),
+            "enabled": self.enabled,
+            "shared": self.shared is not None,
+            "entries": len(self.local),
+            "max_entries": self.local.max_entries,
+            "ttl": self.local.ttl,
+        }
+
+
+def _chunks(keys: List[str]) -> Iterable[str]:
+    chunk: List[str] = []
+    size = 0
+    for key in keys:
+        if chunk and size + len(key) + 1 > NOTIFY_PAYLOAD_LIMIT:
+            yield " ".join(chunk)
+            chunk, size = [], 0
+        chunk.append(key)
+        size += len(key) + 1
+    if chunk:
+        yield " ".join(chunk)
+
+
+def _create_entity_cache() -> EntityCache:
+    stats = CacheStats()
+    local = MemoryCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL, stats)
+    shared = (
+        RedisCache(settings.CACHE_REDIS_URL, settings.CACHE_TTL)
+        if settings.CACHE_REDIS_URL
+        else None
+    )
+    return EntityCache(settings.CACHE_ENABLED, local, shared)
+
+
+entity_cache = _create_entity_cache()
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _invalidate_flushed(session, flush_context):
+    if not entity_cache.enabled:
+        return
+    keys = set(
+        chain.from_iterable(
+            [entity_cache.keys_for(entity) for entity in session.dirty]
+            + [
+                entity_cache.keys_for(entity, deleted=True)
+                for entity in session.deleted
+            ]
+        )
+    )
+    if keys:
+        entity_cache._publish(session, keys)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _drop_committed(session):
+    keys = session.info.pop(_PENDING, None)
+    if keys:
+        # Lecture de ses propres écritures dans ce worker, sans attendre NOTIFY
+        entity_cache._drop(keys)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_invalidations(session):
+    session.info.pop(_PENDING, None)
@@ -1,9 +1,23 @@
+from typing import Optional
+
+from fastapi import Header
+
+from app.db.routing import CONSISTENCY_HEADER, replica_has_caught_up
 from app.db.session import SessionLocal
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
+        yield db
+
+
+async def get_read_db(
+    consistency_token: Optional[str] = Header(None, alias=CONSISTENCY_HEADER)
+):
+    """
+    Session de lecture : routée vers la réplique, sauf si celle-ci n'a pas
+    encore rejoué la dernière écriture du client (jeton de cohérence).
+    """
+    async with SessionLocal() as db:
+        db.info["read_only"] = await replica_has_caught_up(consistency_token)
         yield db
-    finally:
-        db.close()
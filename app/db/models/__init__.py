@@ -5,8 +5,20 @@ from .base import Base
 from .campaign import Campaign
 from .campaign_session import CampaignSession
 from .dialog import Dialog
+from .job import Job
 from .npc import NPC
 from .player import Player
 from .user import User
+from .waveform import Waveform
 
-__all__ = ["Base", "Campaign", "CampaignSession", "Dialog", "NPC", "Player", "User"]
+__all__ = [
+    "Base",
+    "Campaign",
+    "CampaignSession",
+    "Dialog",
+    "Job",
+    "NPC",
+    "Player",
+    "User",
+    "Waveform",
+]
@@ -1,10 +1,84 @@
-from sqlalchemy import Column, ForeignKey, Integer, Table
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    Table,
+    cast,
+    func,
+    literal_column,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, array
 from sqlalchemy.ext.declarative import declarative_base
 
 # Déclarez la base SQLAlchemy
 Base = declarative_base()
 
+
+def id_list(column, *criteria):
+    """
+    Sous-requête corrélée renvoyant, en un tableau trié, les IDs liés à la ligne
+    parente (tableau vide s'il n'y en a aucun). Utilisée via `column_property`
+    pour projeter les relations en listes d'IDs dans la même requête.
+    """
+    return (
+        select(
+            func.coalesce(
+                func.array_agg(aggregate_order_by(column, column)),
+                cast(array([], type_=Integer), ARRAY(Integer)),
+            )
+        )
+        .where(*criteria)
+        .correlate_except(column.table)
+        .scalar_subquery()
+    )
+
+
+def search_text(*columns):
+    """
+    Concaténer des colonnes texte, séparées par une espace, pour la recherche
+    approximative (pg_trgm). L'expression ne contient que des constantes
+    littérales : elle reste immuable et identique à celle de l'index qui la
+    couvre.
+    """
+    parts = [
+        func.coalesce(column, literal_column("''")) if column.nullable else column
+        for column in columns
+    ]
+    expression = parts[0]
+    for part in parts[1:]:
+        expression = expression + literal_column("' '") + part
+    return expression.self_group()
+
+
+def name_prefix(name):
+    """
+    Nom en minuscules, collation "C" (ordre des octets) : un B-tree sur cette
+    expression sert à la fois la recherche par préfixe et le tri.
+    """
+    return func.lower(name).collate("C")
+
+
+def search_indexes(table: str, text, name):
+    """
+    Index de la recherche approximative (GiST trigrammes, pour l'ordre par
+    distance) et de l'autocomplétion (préfixe du nom).
+    """
+    return (
+        Index(
+            f"ix_{table}_search_text_trgm",
+            text.label("search_text"),
+            postgresql_using="gist",
+            postgresql_ops={"search_text": "gist_trgm_ops"},
+        ),
+        Index(f"ix_{table}_name_prefix", name_prefix(name)),
+    )
+
+
 # Tables d'association
+# La clé primaire composite indexe (parent, lié) ; l'index secondaire sur la
+# colonne "liée" sert les recherches inverses (ex. campagnes d'un joueur).
 campaign_users = Table(
     "campaign_users",
     Base.metadata,
@@ -17,6 +91,7 @@ campaign_users = Table(
     Column(
         "user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
     ),
+    Index("ix_campaign_users_user_id", "user_id"),
 )
 
 campaign_players = Table(
@@ -34,6 +109,7 @@ campaign_players = Table(
         ForeignKey("players.id", ondelete="CASCADE"),
         primary_key=True,
     ),
+    Index("ix_campaign_players_player_id", "player_id"),
 )
 
 campaign_npcs = Table(
@@ -48,6 +124,7 @@ campaign_npcs = Table(
     Column(
         "npc_id", Integer, ForeignKey("npcs.id", ondelete="CASCADE"), primary_key=True
     ),
+    Index("ix_campaign_npcs_npc_id", "npc_id"),
 )
 
 session_npcs = Table(
@@ -62,6 +139,7 @@ session_npcs = Table(
     Column(
         "npc_id", Integer, ForeignKey("npcs.id", ondelete="CASCADE"), primary_key=True
     ),
+    Index("ix_session_npcs_npc_id", "npc_id"),
 )
 
 session_players = Table(
@@ -79,4 +157,5 @@ session_players = Table(
         ForeignKey("players.id", ondelete="CASCADE"),
         primary_key=True,
     ),
+    Index("ix_session_players_player_id", "player_id"),
 )
@@ -1,9 +1,15 @@
 from datetime import datetime, timezone
 
 from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String, Text, event
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 
-from app.db.models.base import Base
+from app.db.models.base import (
+    Base,
+    campaign_npcs,
+    campaign_players,
+    campaign_users,
+    id_list,
+)
 from app.db.models.enums.campaign_genre import CampaignGenre
 from app.db.models.enums.campaign_status import CampaignStatus
 
@@ -18,8 +24,12 @@ class Campaign(Base):
     map_url = Column(
         String(2083), nullable=True
     )  # 2083 est la longueur maximale d'une URL
-    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)  # Créateur
-    mj_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Maître du Jeu
+    created_by = Column(
+        Integer, ForeignKey("users.id"), nullable=False, index=True
+    )  # Créateur
+    mj_id = Column(
+        Integer, ForeignKey("users.id"), nullable=False, index=True
+    )  # Maître du Jeu
     created_at = Column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
@@ -43,21 +53,42 @@ class Campaign(Base):
         "Player",
         secondary="campaign_players",  # Table d'association
         back_populates="campaigns",
+        passive_deletes=True,
     )
     npcs = relationship(
         "NPC",
         secondary="campaign_npcs",  # Table d'association
         back_populates="campaigns",
+        passive_deletes=True,
     )
     authorized_users = relationship(
-        "User", secondary="campaign_users", back_populates="accessible_campaigns"
+        "User",
+        secondary="campaign_users",
+        back_populates="accessible_campaigns",
+        passive_deletes=True,
     )
+    # Sessions, dialogues et liens sont supprimés par PostgreSQL (ON DELETE
+    # CASCADE) : l'ORM ne les charge pas pour les supprimer un par un
     sessions = relationship(
-        "CampaignSession", back_populates="campaign", cascade="all, delete-orphan"
+        "CampaignSession",
+        back_populates="campaign",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    # IDs des relations, chargés dans la même requête que la campagne
+    player_ids = column_property(
+        id_list(campaign_players.c.player_id, campaign_players.c.campaign_id == id)
+    )
+    npc_ids = column_property(
+        id_list(campaign_npcs.c.npc_id, campaign_npcs.c.campaign_id == id)
+    )
+    authorized_user_ids = column_property(
+        id_list(campaign_users.c.user_id, campaign_users.c.campaign_id == id)
     )
 
 
 # Écouteur pour mettre à jour `updated_at`
 @event.listens_for(Campaign, "before_update")
-def update_timestamp(target):
+def update_timestamp(mapper, connection, target):
     target.updated_at = datetime.now(timezone.utc)
@@ -1,9 +1,10 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, event
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, event, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import column_property, deferred, relationship
 
-from app.db.models.base import Base
+from app.db.models.base import Base, id_list, session_npcs, session_players
 
 
 class CampaignSession(Base):
@@ -21,10 +22,16 @@ class CampaignSession(Base):
     audio_path = Column(
         String(2083), nullable=True
     )  # 2083 est la longueur maximale d'une URL
+    # Passages parlés de l'audio, [[début_ms, fin_ms], ...] : calculés une
+    # fois, effacés quand l'audio change. Chargés seulement sur demande.
+    speech_segments = deferred(Column(JSONB, nullable=True))
 
     # Relation avec Campaign
     campaign_id = Column(
-        Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False
+        Integer,
+        ForeignKey("campaigns.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
     campaign = relationship("Campaign", back_populates="sessions")
 
@@ -33,14 +40,27 @@ class CampaignSession(Base):
         "Player",
         secondary="session_players",  # Table d'association
         back_populates="sessions",
+        passive_deletes=True,
     )
     npcs = relationship(
         "NPC",
         secondary="session_npcs",  # Table d'association
         back_populates="sessions",
+        passive_deletes=True,
     )
     dialogs = relationship(
-        "Dialog", back_populates="session", cascade="all, delete-orphan"
+        "Dialog",
+        back_populates="session",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    # IDs des relations, chargés dans la même requête que la session
+    player_ids = column_property(
+        id_list(session_players.c.player_id, session_players.c.session_id == id)
+    )
+    npc_ids = column_property(
+        id_list(session_npcs.c.npc_id, session_npcs.c.session_id == id)
     )
     # Timestamps
     created_at = Column(
@@ -51,9 +71,14 @@ class CampaignSession(Base):
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
     )
+    # Dernière modification de la transcription (ajout, édition ou suppression
+    # d'un dialogue) : version de la collection de dialogues
+    dialogs_updated_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
 
 
 # Écouteur pour mettre à jour `updated_at`
 @event.listens_for(CampaignSession, "before_update")
-def update_timestamp(target):
+def update_timestamp(mapper, connection, target):
     target.updated_at = datetime.now(timezone.utc)
@@ -1,20 +1,51 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column,
+    Computed,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, query_expression, relationship
 
 from app.db.models.base import Base
 
 
 class Dialog(Base):
     __tablename__ = "dialogs"
+    __table_args__ = (
+        # Transcription d'une session dans l'ordre, et pagination par curseur
+        Index("ix_dialogs_session_id_order", "session_id", "order", "id"),
+        # Lignes d'une fenêtre de lecture
+        Index("ix_dialogs_session_id_start_ms", "session_id", "start_ms"),
+        # Recherche plein texte
+        Index("ix_dialogs_content_tsv", "content_tsv", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order = Column(Integer, nullable=False)  # Order of the dialog line
-    start = Column(String(8), nullable=False)  # Start time (HH:MM:SS)
-    end = Column(String(8), nullable=True)  # End time (HH:MM:SS)
+    start_ms = Column(Integer, nullable=False)  # Start time (ms from session start)
+    end_ms = Column(Integer, nullable=True)  # End time (ms from session start)
     speaker_id = Column(
-        Integer, ForeignKey("players.id")
+        Integer, ForeignKey("players.id"), index=True
     )  # ID of the player or GM (Game Master)
+    # Locuteur détecté par la diarisation (ex. "SPEAKER_1"), avant attribution
+    speaker_label = Column(String(50), nullable=True)
+    # Similarité de la voix avec celle du locuteur attribué automatiquement ;
+    # None si le locuteur a été choisi à la main
+    speaker_confidence = Column(Float, nullable=True)
     content = Column(Text, nullable=False)  # Text of the dialog line
+    # Vecteur de recherche (français), calculé par PostgreSQL
+    content_tsv = deferred(
+        Column(TSVECTOR, Computed("to_tsvector('french', content)", persisted=True))
+    )
+
+    # Renseignés uniquement par la recherche plein texte
+    rank = query_expression()
+    headline = query_expression()
 
     session_id = Column(
         Integer, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False
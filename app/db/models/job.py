@@ -0,0 +1,63 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Enum,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.models.base import Base
+from app.db.models.enums.job_status import JobStatus
+
+
+class Job(Base):
+    """
+    Travail en file d'attente, exécuté par un worker (`python -m app.worker`).
+    """
+
+    __tablename__ = "jobs"
+
+    id = Column(BigInteger, primary_key=True)
+    type = Column(String(100), nullable=False)  # Nom du handler à exécuter
+    payload = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    priority = Column(Integer, nullable=False, default=0)  # Plus grand = plus urgent
+    attempts = Column(Integer, nullable=False, default=0)  # Exécutions commencées
+    max_attempts = Column(Integer, nullable=False)
+    # Pas exécuté avant cette date (délai demandé, ou attente avant un nouvel essai)
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Worker qui exécute le travail, et dernier signe de vie de celui-ci
+    worker = Column(String(255), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    result = Column(JSONB, nullable=True)
+    # Timestamps
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # File d'attente : les travaux prêts, par priorité puis ancienneté
+        Index(
+            "ix_jobs_queue",
+            priority.desc(),
+            run_at,
+            id,
+            postgresql_where=status == JobStatus.QUEUED,
+        ),
+        # Travaux en cours : limites de concurrence par type et baux expirés
+        Index(
+            "ix_jobs_running",
+            type,
+            heartbeat_at,
+            postgresql_where=status == JobStatus.RUNNING,
+        ),
+    )
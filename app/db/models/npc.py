@@ -1,7 +1,14 @@
 from sqlalchemy import Column, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 
-from app.db.models.base import Base
+from app.db.models.base import (
+    Base,
+    campaign_npcs,
+    id_list,
+    search_indexes,
+    search_text,
+    session_npcs,
+)
 
 
 class NPC(Base):
@@ -21,10 +28,29 @@ class NPC(Base):
     charisma = Column(Integer, default=10)
     description = Column(Text, nullable=True)
 
+    # Texte de la recherche approximative (nom, race, classe)
+    search_text = column_property(search_text(name, race, class_name), deferred=True)
+
     # Relations
     campaigns = relationship(
-        "Campaign", secondary="campaign_npcs", back_populates="npcs"
+        "Campaign",
+        secondary="campaign_npcs",
+        back_populates="npcs",
+        passive_deletes=True,
     )
     sessions = relationship(
-        "CampaignSession", secondary="session_npcs", back_populates="npcs"
+        "CampaignSession",
+        secondary="session_npcs",
+        back_populates="npcs",
+        passive_deletes=True,
+    )
+
+    # IDs des relations, chargés dans la même requête que le PNJ
+    campaign_ids = column_property(
+        id_list(campaign_npcs.c.campaign_id, campaign_npcs.c.npc_id == id)
     )
+    session_ids = column_property(
+        id_list(session_npcs.c.session_id, session_npcs.c.npc_id == id)
+    )
+
+    __table_args__ = search_indexes("npcs", search_text.expression, name)
@@ -1,7 +1,14 @@
-from sqlalchemy import Column, Float, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Float, ForeignKey, Integer, LargeBinary, String, Text
+from sqlalchemy.orm import column_property, deferred, relationship
 
-from app.db.models.base import Base
+from app.db.models.base import (
+    Base,
+    campaign_players,
+    id_list,
+    search_indexes,
+    search_text,
+    session_players,
+)
 
 
 class Player(Base):
@@ -25,13 +32,37 @@ class Player(Base):
     skills = Column(Text, nullable=True)  # Liste des compétences (JSON ou texte)
     inventory = Column(Text, nullable=True)  # Liste d'équipement
     description = Column(Text, nullable=True)
+    # Empreinte vocale (float32), pour reconnaître le joueur dans les
+    # enregistrements. Chargée seulement sur demande.
+    voice_embedding = deferred(Column(LargeBinary, nullable=True))
+
+    # Texte de la recherche approximative (nom, race, classe)
+    search_text = column_property(search_text(name, race, class_name), deferred=True)
 
     # Relations
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Lien vers User
+    user_id = Column(
+        Integer, ForeignKey("users.id"), nullable=False, index=True
+    )  # Lien vers User
     user = relationship("User", back_populates="players")
     campaigns = relationship(
-        "Campaign", secondary="campaign_players", back_populates="players"
+        "Campaign",
+        secondary="campaign_players",
+        back_populates="players",
+        passive_deletes=True,
     )
     sessions = relationship(
-        "CampaignSession", secondary="session_players", back_populates="players"
+        "CampaignSession",
+        secondary="session_players",
+        back_populates="players",
+        passive_deletes=True,
+    )
+
+    # IDs des relations, chargés dans la même requête que le joueur
+    campaign_ids = column_property(
+        id_list(campaign_players.c.campaign_id, campaign_players.c.player_id == id)
     )
+    session_ids = column_property(
+        id_list(session_players.c.session_id, session_players.c.player_id == id)
+    )
+
+    __table_args__ = search_indexes("players", search_text.expression, name)
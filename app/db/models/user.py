@@ -1,7 +1,8 @@
 from sqlalchemy import Boolean, Column, Enum, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 
-from app.db.models.base import Base
+from app.db.models.base import Base, campaign_users, id_list
+from app.db.models.campaign import Campaign
 from app.schemas.schema_user import UserRole
 
 
@@ -24,8 +25,20 @@ class User(Base):
         "Campaign", foreign_keys="Campaign.mj_id", back_populates="mj"
     )
     accessible_campaigns = relationship(
-        "Campaign", secondary="campaign_users", back_populates="authorized_users"
+        "Campaign",
+        secondary="campaign_users",
+        back_populates="authorized_users",
+        passive_deletes=True,
     )
     players = relationship(
         "Player", back_populates="user", cascade="all, delete-orphan"
     )
+
+    # IDs des campagnes liées, chargés dans la même requête que l'utilisateur
+    created_campaign_ids = column_property(
+        id_list(Campaign.id, Campaign.created_by == id)
+    )
+    mj_campaign_ids = column_property(id_list(Campaign.id, Campaign.mj_id == id))
+    accessible_campaign_ids = column_property(
+        id_list(campaign_users.c.campaign_id, campaign_users.c.user_id == id)
+    )
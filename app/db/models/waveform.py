@@ -0,0 +1,32 @@
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    SmallInteger,
+)
+
+from app.db.models.base import Base
+
+
+class Waveform(Base):
+    """
+    Niveau de détail de la forme d'onde de l'audio d'une session : le
+    minimum et le maximum des échantillons par tranche de
+    `samples_per_peak`, entrelacés (min, max, min, max...), en entiers
+    signés 8 et 16 bits petit-boutistes. Calculée une fois par audio.
+    """
+
+    __tablename__ = "waveforms"
+
+    session_id = Column(
+        Integer, ForeignKey("sessions.id", ondelete="CASCADE"), primary_key=True
+    )
+    zoom = Column(SmallInteger, primary_key=True)  # 0 = vue d'ensemble
+    samples_per_peak = Column(Integer, nullable=False)
+    sample_rate = Column(Integer, nullable=False)
+    peaks8 = Column(LargeBinary, nullable=False)
+    peaks16 = Column(LargeBinary, nullable=False)
+    # Version de la forme d'onde, commune à tous ses niveaux
+    created_at = Column(DateTime(timezone=True), nullable=False)
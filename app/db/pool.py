@@ -0,0 +1,84 @@
+import time
+from collections import deque
+from statistics import quantiles
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolStats:
+    """
+    Statistiques d'attente lors de l'emprunt d'une connexion au pool.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent = deque(maxlen=window)  # Dernières attentes, en secondes
+
+    def record(self, wait: float, timed_out: bool = False):
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self._recent.append(wait)
+
+    def snapshot(self) -> dict:
+        """
+        Retourner les compteurs cumulés et les percentiles récents (en ms).
+        """
+        recent = sorted(self._recent)
+        if len(recent) >= 2:
+            cuts = quantiles(recent, n=100, method="inclusive")
+            p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        else:
+            p50 = p95 = p99 = recent[0] if recent else 0.0
+        attempts = self.checkouts + self.timeouts
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": (self.total_wait / attempts * 1000) if attempts else 0.0,
+            "wait_max_ms": self.max_wait * 1000,
+            "wait_p50_ms": p50 * 1000,
+            "wait_p95_ms": p95 * 1000,
+            "wait_p99_ms": p99 * 1000,
+        }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Pool asynchrone mesurant le temps passé à attendre une connexion libre.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return connection
+
+
+def get_pool_status(pool: InstrumentedPool) -> dict:
+    """
+    Construire l'état courant du pool : occupation et temps d'attente.
+    """
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "timeout": pool.timeout(),
+        **pool.stats.snapshot(),
+    }
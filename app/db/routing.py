@@ -0,0 +1,123 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event, text
+
+from app.db.session import RoutingSession, engine, replica_engine
+
+# En-tête transportant le jeton de cohérence (LSN du primaire après écriture)
+CONSISTENCY_HEADER = "X-Consistency-Token"
+
+
+@dataclass
+class ConsistencyState:
+    """
+    État de cohérence de la requête en cours.
+    """
+
+    wrote: bool = False  # Une transaction d'écriture a été validée
+
+
+_consistency: ContextVar[Optional[ConsistencyState]] = ContextVar(
+    "consistency", default=None
+)
+# Dernière position de rejeu observée sur la réplique (monotone croissante)
+_replica_replay_lsn = 0
+
+
+def parse_lsn(lsn: str) -> int:
+    """
+    Convertir un LSN PostgreSQL ("16/B374D848") en entier comparable.
+    """
+    high, low = lsn.split("/")
+    return (int(high, 16) << 32) + int(low, 16)
+
+
+def mark_writes(session):
+    """
+    Signaler une écriture invisible pour les événements ORM (COPY, CTE d'écriture).
+    """
+    session.info["has_writes"] = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_flush_writes(session, flush_context):
+    mark_writes(session)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _mark_statement_writes(orm_execute_state):
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        mark_writes(orm_execute_state.session)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _record_commit(session):
+    state = _consistency.get()
+    if session.info.pop("has_writes", False) and state is not None:
+        state.wrote = True
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_writes(session):
+    session.info.pop("has_writes", None)
+
+
+async def get_primary_lsn() -> str:
+    """
+    Position WAL courante du primaire, incluant toutes les transactions validées.
+    """
+    async with engine.connect() as conn:
+        return await conn.scalar(text("SELECT pg_current_wal_lsn()::text"))
+
+
+async def replica_has_caught_up(token: Optional[str]) -> bool:
+    """
+    Indiquer si la réplique a rejoué le WAL au moins jusqu'au jeton fourni.
+
+    Sans jeton, la réplique est toujours acceptable. Un jeton illisible est
+    traité comme non atteint : la lecture part alors sur le primaire.
+    """
+    global _replica_replay_lsn
+
+    if replica_engine is engine:
+        return True
+    if not token:
+        return True
+    try:
+        required = parse_lsn(token)
+    except ValueError:
+        return False
+    if required <= _replica_replay_lsn:
+        return True
+
+    async with replica_engine.connect() as conn:
+        replayed = await conn.scalar(
+            text(
+                "SELECT coalesce(pg_last_wal_replay_lsn(), pg_current_wal_lsn())::text"
+            )
+        )
+    _replica_replay_lsn = max(_replica_replay_lsn, parse_lsn(replayed))
+    return required <= _replica_replay_lsn
+
+
+async def consistency_middleware(request: Request, call_next):
+    """
+    Ajouter un jeton de cohérence aux réponses ayant validé une écriture, afin
+    que le client le renvoie lors de sa prochaine lecture (read-your-writes).
+    """
+    state = ConsistencyState()
+    reset_token = _consistency.set(state)
+    try:
+        response = await call_next(request)
+    finally:
+        _consistency.reset(reset_token)
+    if state.wrote:
+        response.headers[CONSISTENCY_HEADER] = await get_primary_lsn()
+    return response
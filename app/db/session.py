@@ -1,15 +1,86 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from uuid import uuid4
+
+from sqlalchemy import Delete, Insert, Update
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.db.models import Base
+from app.db.pool import InstrumentedPool
+
+
+def get_async_url(url: str) -> str:
+    """
+    Convertir une URL PostgreSQL (psycopg2) en URL utilisant le driver asyncpg.
+    """
+    return (
+        make_url(url)
+        .set(drivername="postgresql+asyncpg")
+        .render_as_string(hide_password=False)
+    )
+
+
+def get_engine_options() -> dict:
+    """
+    Options du pool de connexions, lues depuis les paramètres de l'application.
+    """
+    options = {
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_PGBOUNCER:
+        # En mode transaction, PgBouncer peut changer de connexion serveur entre
+        # deux requêtes : les requêtes préparées nommées ne doivent pas être réutilisées.
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return options
+
+
+engine = create_async_engine(
+    get_async_url(settings.POSTGRES_URL), **get_engine_options()
+)
+# Sans réplique configurée, les lectures restent sur le primaire
+replica_engine = (
+    create_async_engine(
+        get_async_url(settings.POSTGRES_REPLICA_URL), **get_engine_options()
+    )
+    if settings.POSTGRES_REPLICA_URL
+    else engine
+)
+
+
+class RoutingSession(Session):
+    """
+    Session envoyant les lectures vers la réplique lorsque `info["read_only"]`
+    est positionné ; les écritures et les flush vont toujours au primaire.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            self.info.get("read_only")
+            and not self._flushing
+            and not isinstance(clause, (Insert, Update, Delete))
+        ):
+            return replica_engine.sync_engine
+        return engine.sync_engine
+
 
-engine = create_engine(settings.POSTGRES_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = async_sessionmaker(
+    sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False
+)
 
 
 # Fonction pour initialiser la base de données
-def init_db():
+async def init_db():
     import app.db.models  # Assurez-vous que tous les modèles sont importés
 
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
@@ -0,0 +1,6 @@
+# Importer les modules de handlers pour les enregistrer auprès des workers
+
+from . import campaign, session
+from .registry import JOB_HANDLERS, JobHandler, job_handler
+
+__all__ = ["JOB_HANDLERS", "JobHandler", "job_handler"]
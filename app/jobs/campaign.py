@@ -0,0 +1,13 @@
+from app.crud import crud_campaign
+from app.jobs.registry import job_handler
+
+PURGE_CAMPAIGN = "campaign.purge"
+
+
+@job_handler(PURGE_CAMPAIGN, concurrency=1)
+async def purge_campaign(payload: dict):
+    """
+    Supprimer une campagne volumineuse par lots. Une seule purge à la fois :
+    chacune génère beaucoup d'écritures à répliquer.
+    """
+    await crud_campaign.purge(payload["campaign_id"])
@@ -0,0 +1,37 @@
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+
+Handler = Callable[[dict], Awaitable[Optional[dict]]]
+
+
+class JobHandler:
+    """
+    Fonction exécutant un type de travail, avec sa limite de travaux en
+    cours (tous workers confondus ; None = aucune).
+    """
+
+    def __init__(self, job_type: str, function: Handler, concurrency: Optional[int]):
+        self.type = job_type
+        self.function = function
+        self.concurrency = concurrency
+
+
+# Handlers connus des workers, par type de travail
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(job_type: str, concurrency: Optional[int] = None):
+    """
+    Déclarer la fonction qui exécute un type de travail. Elle reçoit le
+    `payload` du travail et peut retourner un résultat (dict JSON) ; une
+    exception provoque un nouvel essai. JOB_CONCURRENCY_LIMITS remplace la
+    limite déclarée ici.
+    """
+
+    def register(function: Handler) -> Handler:
+        limit = settings.JOB_CONCURRENCY_LIMITS.get(job_type, concurrency)
+        JOB_HANDLERS[job_type] = JobHandler(job_type, function, limit)
+        return function
+
+    return register
@@ -0,0 +1,36 @@
+from app.jobs.registry import job_handler
+from app.transcription.pipeline import (
+    compute_waveform,
+    identify_speakers,
+    transcribe_session,
+)
+
+TRANSCRIBE_SESSION = "session.transcribe"
+IDENTIFY_SPEAKERS = "session.identify_speakers"
+COMPUTE_WAVEFORM = "session.waveform"
+
+
+@job_handler(TRANSCRIBE_SESSION)
+async def transcribe(payload: dict):
+    """
+    Transcrire l'audio d'une session et remplacer ses dialogues. Les
+    transcriptions simultanées d'un worker se partagent son pool de
+    processus.
+    """
+    return await transcribe_session(payload["session_id"])
+
+
+@job_handler(IDENTIFY_SPEAKERS)
+async def identify(payload: dict):
+    """
+    Reconnaître les joueurs qui parlent dans les dialogues d'une session.
+    """
+    return await identify_speakers(payload["session_id"])
+
+
+@job_handler(COMPUTE_WAVEFORM)
+async def waveform(payload: dict):
+    """
+    Calculer la forme d'onde de l'audio d'une session.
+    """
+    return await compute_waveform(payload["session_id"])
@@ -1,7 +1,42 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
 
 from app.api.api import api_router
+from app.core.config import settings
+from app.core.storage import storage
+from app.db.cache import entity_cache
+from app.db.routing import consistency_middleware
+from app.utils.password_pool import password_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Recevoir les invalidations de cache publiées par les autres workers
+    listener = (
+        asyncio.create_task(entity_cache.listen()) if entity_cache.enabled else None
+    )
+    yield
+    if listener is not None:
+        listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await listener
+    if entity_cache.shared is not None:
+        await entity_cache.shared.close()
+    password_pool.shutdown()
 
-app = FastAPI(title="rpspy_back")
+
+app = FastAPI(title="rpspy_back", lifespan=lifespan)
+app.middleware("http")(consistency_middleware)
 
 app.include_router(api_router, prefix="/api/v1")
+
+if settings.STORAGE_BACKEND == "local":
+    # Servir les fichiers du stockage local (en production, plutôt un serveur web)
+    app.mount(
+        settings.STORAGE_LOCAL_URL,
+        StaticFiles(directory=storage.root, check_dir=False),
+        name="media",
+    )
@@ -1,20 +1,30 @@
 # Permet d'importer tous les endpoints depuis app.api.routes
 
+from .schema_association import AssociationResponse, AssociationUpdate
+from .schema_cache import CacheStatusResponse
 from .schema_campaign import CampaignCreate, CampaignResponse, CampaignUpdate
 from .schema_dialog import DialogCreate, DialogResponse, DialogUpdate
+from .schema_job import JobAccepted, JobResponse
 from .schema_npc import NPCCreate, NPCResponse, NPCUpdate
 from .schema_player import PlayerCreate, PlayerResponse, PlayerUpdate
+from .schema_pool import PoolStatusResponse
+from .schema_search import SearchMatch
 from .schema_session import SessionCreate, SessionResponse, SessionUpdate
 from .schema_token import Token
 from .schema_user import UserCreate, UserResponse, UserRole, UserUpdate
 
 __all__ = [
+    "AssociationResponse",
+    "AssociationUpdate",
+    "CacheStatusResponse",
     "CampaignCreate",
     "CampaignUpdate",
     "CampaignResponse",
     "DialogCreate",
     "DialogResponse",
     "DialogUpdate",
+    "JobAccepted",
+    "JobResponse",
     "NPCCreate",
     "NPCResponse",
     "NPCUpdate",
@@ -28,5 +38,7 @@ __all__ = [
     "PlayerCreate",
     "PlayerUpdate",
     "PlayerResponse",
+    "PoolStatusResponse",
+    "SearchMatch",
     "Token",
 ]
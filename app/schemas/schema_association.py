@@ -0,0 +1,14 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class AssociationUpdate(BaseModel):
+    ids: List[int] = Field(
+        ..., min_length=1, description="IDs des entités à lier ou à délier"
+    )
+
+
+class AssociationResponse(BaseModel):
+    requested: int = Field(..., description="Nombre d'IDs distincts demandés")
+    affected: int = Field(..., description="Nombre de liens créés ou supprimés")
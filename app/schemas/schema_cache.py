@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+
+
+class CacheStatusResponse(BaseModel):
+    enabled: bool = Field(..., description="Cache des entités activé")
+    shared: bool = Field(..., description="Cache partagé entre workers configuré")
+    entries: int = Field(..., description="Entrées en mémoire dans ce worker")
+    max_entries: int = Field(..., description="Nombre maximal d'entrées en mémoire")
+    ttl: float = Field(..., description="Durée de vie d'une entrée (s)")
+    hits: int = Field(..., description="Lectures servies par le cache")
+    local_hits: int = Field(..., description="Lectures servies par la mémoire locale")
+    shared_hits: int = Field(..., description="Lectures servies par le cache partagé")
+    misses: int = Field(..., description="Lectures ayant dû interroger la base")
+    hit_ratio: float = Field(..., description="Part des lectures servies par le cache")
+    evictions: int = Field(..., description="Entrées évincées faute de place")
+    invalidations: int = Field(..., description="Clés invalidées reçues par NOTIFY")
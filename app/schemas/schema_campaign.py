@@ -1,7 +1,7 @@
 import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
 
 from app.db.models.enums.campaign_genre import CampaignGenre
 from app.db.models.enums.campaign_status import CampaignStatus
@@ -23,13 +23,13 @@ class CampaignCreate(CampaignBase):
 
 
 class CampaignUpdate(BaseModel):
-    name: Optional[str]
-    genre: Optional[CampaignGenre]
-    description: Optional[str]
-    map_url: Optional[str]
-    status: Optional[CampaignStatus]
-    notes_url: Optional[str]
-    mj_id: Optional[int]
+    name: Optional[str] = None
+    genre: Optional[CampaignGenre] = None
+    description: Optional[str] = None
+    map_url: Optional[str] = None
+    status: Optional[CampaignStatus] = None
+    notes_url: Optional[str] = None
+    mj_id: Optional[int] = None
     players: Optional[List[int]] = None  # Liste des IDs des joueurs
     npcs: Optional[List[int]] = None  # Liste des IDs des PNJs
 
@@ -39,9 +39,15 @@ class CampaignResponse(CampaignBase):
     created_at: datetime
     updated_at: datetime
     sessions_count: int
-    players: List[int] = []  # Liste des IDs des joueurs
-    npcs: List[int] = []  # Liste des IDs des PNJs
-    authorized_users: List[int] = []  # Liste des IDs des utilisateurs autorisés
+    players: List[int] = Field(
+        [], validation_alias=AliasChoices("player_ids", "players")
+    )  # Liste des IDs des joueurs
+    npcs: List[int] = Field(
+        [], validation_alias=AliasChoices("npc_ids", "npcs")
+    )  # Liste des IDs des PNJs
+    authorized_users: List[int] = Field(
+        [], validation_alias=AliasChoices("authorized_user_ids", "authorized_users")
+    )  # Liste des IDs des utilisateurs autorisés
 
     model_config = {
         "arbitrary_types_allowed": True,  # Permet les types arbitraires comme datetime
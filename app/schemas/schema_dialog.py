@@ -5,11 +5,20 @@ from pydantic import BaseModel, Field
 
 class DialogBase(BaseModel):
     order: int = Field(..., description="Order of the dialog line")
-    start: str = Field(..., description="Start time of the dialog (HH:MM:SS)")
-    end: Optional[str] = Field(None, description="End time of the dialog (HH:MM:SS)")
+    start_ms: int = Field(
+        ..., ge=0, description="Start time of the dialog, in ms from session start"
+    )
+    end_ms: Optional[int] = Field(
+        None, ge=0, description="End time of the dialog, in ms from session start"
+    )
     speaker_id: Optional[int] = Field(
         None, description="ID of the speaker (player or GM)"
     )
+    speaker_label: Optional[str] = Field(
+        None,
+        max_length=50,
+        description="Speaker label from diarization, before a player is assigned",
+    )
     content: str = Field(..., description="Content of the dialog line")
 
 
@@ -18,16 +27,39 @@ class DialogCreate(DialogBase):
 
 
 class DialogUpdate(BaseModel):
-    order: Optional[int]
-    start: Optional[str]
-    end: Optional[str]
-    speaker_id: Optional[int]
-    content: Optional[str]
+    order: Optional[int] = None
+    start_ms: Optional[int] = None
+    end_ms: Optional[int] = None
+    speaker_id: Optional[int] = None
+    speaker_label: Optional[str] = Field(None, max_length=50)
+    content: Optional[str] = None
 
 
 class DialogResponse(DialogBase):
     id: int
     session_id: int
+    speaker_confidence: Optional[float] = Field(
+        None,
+        description="Voice similarity of an automatically assigned speaker",
+    )
 
     class Config:
         orm_mode = True
+
+
+class DialogBulkResponse(BaseModel):
+    inserted: int = Field(..., description="Number of dialog lines inserted")
+    batches: int = Field(..., description="Number of batches copied")
+
+
+class DialogSearchHit(BaseModel):
+    id: int
+    session_id: int
+    order: int
+    start_ms: int
+    end_ms: Optional[int]
+    speaker_id: Optional[int]
+    headline: str = Field(..., description="Extract with matches wrapped in <mark>")
+    rank: float = Field(..., description="Relevance score")
+
+    model_config = {"from_attributes": True}
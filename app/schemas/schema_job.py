@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.db.models.enums.job_status import JobStatus
+
+
+class JobResponse(BaseModel):
+    id: int
+    type: str
+    status: JobStatus
+    priority: int
+    attempts: int = Field(..., description="Exécutions commencées")
+    max_attempts: int
+    run_at: datetime = Field(..., description="Pas exécuté avant cette date")
+    last_error: Optional[str] = None
+    result: Optional[dict] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
+class JobAccepted(BaseModel):
+    job_id: int = Field(..., description="Travail à suivre via GET /jobs/{id}")
+    detail: str
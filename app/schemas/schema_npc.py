@@ -1,6 +1,6 @@
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
 
 
 class NPCBase(BaseModel):
@@ -23,26 +23,30 @@ class NPCCreate(NPCBase):
 
 
 class NPCUpdate(BaseModel):
-    name: Optional[str]
-    race: Optional[str]
-    class_name: Optional[str]
-    alignment: Optional[str]
-    level: Optional[int]
-    strength: Optional[int]
-    dexterity: Optional[int]
-    constitution: Optional[int]
-    intelligence: Optional[int]
-    wisdom: Optional[int]
-    charisma: Optional[int]
-    description: Optional[str]
+    name: Optional[str] = None
+    race: Optional[str] = None
+    class_name: Optional[str] = None
+    alignment: Optional[str] = None
+    level: Optional[int] = None
+    strength: Optional[int] = None
+    dexterity: Optional[int] = None
+    constitution: Optional[int] = None
+    intelligence: Optional[int] = None
+    wisdom: Optional[int] = None
+    charisma: Optional[int] = None
+    description: Optional[str] = None
     campaigns: Optional[List[int]] = None  # Liste des IDs des campagnes
     sessions: Optional[List[int]] = None  # Liste des IDs des sessions
 
 
 class NPCResponse(NPCBase):
     id: int
-    campaigns: List[int] = []  # Liste des IDs des campagnes
-    sessions: List[int] = []  # Liste des IDs des sessions
+    campaigns: List[int] = Field(
+        [], validation_alias=AliasChoices("campaign_ids", "campaigns")
+    )  # Liste des IDs des campagnes
+    sessions: List[int] = Field(
+        [], validation_alias=AliasChoices("session_ids", "sessions")
+    )  # Liste des IDs des sessions
 
     class Config:
         orm_mode = True
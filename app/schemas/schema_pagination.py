@@ -0,0 +1,17 @@
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel, Field
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = Field(
+        None, description="Curseur opaque de la page suivante"
+    )
+    prev_cursor: Optional[str] = Field(
+        None, description="Curseur opaque de la page précédente"
+    )
+
+    model_config = {"from_attributes": True}
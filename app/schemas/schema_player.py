@@ -1,6 +1,6 @@
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
 
 
 class PlayerBase(BaseModel):
@@ -28,23 +28,23 @@ class PlayerCreate(PlayerBase):
 
 
 class PlayerUpdate(BaseModel):
-    name: Optional[str]
-    race: Optional[str]
-    class_name: Optional[str]
-    background: Optional[str]
-    alignment: Optional[str]
-    level: Optional[int]
-    strength: Optional[int]
-    dexterity: Optional[int]
-    constitution: Optional[int]
-    intelligence: Optional[int]
-    wisdom: Optional[int]
-    charisma: Optional[int]
-    current_hp: Optional[float]
-    max_hp: Optional[float]
-    skills: Optional[str]
-    inventory: Optional[str]
-    description: Optional[str]
+    name: Optional[str] = None
+    race: Optional[str] = None
+    class_name: Optional[str] = None
+    background: Optional[str] = None
+    alignment: Optional[str] = None
+    level: Optional[int] = None
+    strength: Optional[int] = None
+    dexterity: Optional[int] = None
+    constitution: Optional[int] = None
+    intelligence: Optional[int] = None
+    wisdom: Optional[int] = None
+    charisma: Optional[int] = None
+    current_hp: Optional[float] = None
+    max_hp: Optional[float] = None
+    skills: Optional[str] = None
+    inventory: Optional[str] = None
+    description: Optional[str] = None
     campaigns: Optional[List[int]] = None  # Liste des IDs des campagnes
     sessions: Optional[List[int]] = None  # Liste des IDs des sessions
 
@@ -52,8 +52,12 @@ class PlayerUpdate(BaseModel):
 class PlayerResponse(PlayerBase):
     id: int
     user_id: int
-    campaigns: List[int] = []  # Liste des IDs des campagnes
-    sessions: List[int] = []  # Liste des IDs des sessions
+    campaigns: List[int] = Field(
+        [], validation_alias=AliasChoices("campaign_ids", "campaigns")
+    )  # Liste des IDs des campagnes
+    sessions: List[int] = Field(
+        [], validation_alias=AliasChoices("session_ids", "sessions")
+    )  # Liste des IDs des sessions
 
     class Config:
         orm_mode = True
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+
+
+class PoolStatusResponse(BaseModel):
+    size: int = Field(..., description="Taille configurée du pool")
+    checked_out: int = Field(..., description="Connexions actuellement empruntées")
+    checked_in: int = Field(..., description="Connexions libres dans le pool")
+    overflow: int = Field(..., description="Connexions ouvertes au-delà du pool")
+    max_overflow: int = Field(..., description="Nombre maximal de connexions en plus")
+    timeout: float = Field(..., description="Attente maximale d'une connexion (s)")
+    checkouts: int = Field(..., description="Nombre total d'emprunts réussis")
+    timeouts: int = Field(..., description="Nombre d'emprunts ayant expiré")
+    wait_avg_ms: float = Field(..., description="Attente moyenne d'une connexion")
+    wait_max_ms: float = Field(..., description="Attente maximale observée")
+    wait_p50_ms: float = Field(..., description="Médiane des attentes récentes")
+    wait_p95_ms: float = Field(..., description="95e percentile des attentes récentes")
+    wait_p99_ms: float = Field(..., description="99e percentile des attentes récentes")
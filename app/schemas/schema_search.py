@@ -0,0 +1,11 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class SearchMatch(BaseModel):
+    id: int
+    name: str
+    race: str
+    class_name: Optional[str] = None
+    score: float = Field(..., description="Similarité trigramme avec la saisie (0 à 1)")
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
 
 
 class SessionBase(BaseModel):
@@ -17,11 +17,11 @@ class SessionCreate(SessionBase):
 
 
 class SessionUpdate(BaseModel):
-    title: Optional[str]
-    date: Optional[datetime]
-    description: Optional[str]
-    audio_path: Optional[str]
-    campaign_id: Optional[int]
+    title: Optional[str] = None
+    date: Optional[datetime] = None
+    description: Optional[str] = None
+    audio_path: Optional[str] = None
+    campaign_id: Optional[int] = None
     players: Optional[List[int]] = None  # Liste des IDs des joueurs
     npcs: Optional[List[int]] = None  # Liste des IDs des PNJs
 
@@ -30,8 +30,12 @@ class SessionResponse(SessionBase):
     id: int
     created_at: datetime
     updated_at: datetime
-    players: List[int] = []  # Liste des IDs des joueurs
-    npcs: List[int] = []  # Liste des IDs des PNJs
+    players: List[int] = Field(
+        [], validation_alias=AliasChoices("player_ids", "players")
+    )  # Liste des IDs des joueurs
+    npcs: List[int] = Field(
+        [], validation_alias=AliasChoices("npc_ids", "npcs")
+    )  # Liste des IDs des PNJs
 
     model_config = {
         "arbitrary_types_allowed": True,  # Permet les types arbitraires comme datetime
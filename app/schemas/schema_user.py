@@ -1,6 +1,6 @@
 from typing import List, Optional
 
-from pydantic import BaseModel, EmailStr
+from pydantic import AliasChoices, BaseModel, EmailStr, Field
 
 from app.db.models.enums.user_role import UserRole
 
@@ -18,19 +18,28 @@ class UserCreate(UserBase):
 
 
 class UserUpdate(BaseModel):
-    username: Optional[str]
-    email: Optional[EmailStr]
-    hashed_password: Optional[str]
-    is_active: Optional[bool]
-    is_superuser: Optional[bool]
-    role: Optional[UserRole]
+    username: Optional[str] = None
+    email: Optional[EmailStr] = None
+    hashed_password: Optional[str] = None
+    is_active: Optional[bool] = None
+    is_superuser: Optional[bool] = None
+    role: Optional[UserRole] = None
 
 
 class UserResponse(UserBase):
     id: int
-    created_campaigns: List[int] = []  # Liste des IDs des campagnes créées
-    mj_campaigns: List[int] = []  # Liste des IDs des campagnes où l'utilisateur est MJ
-    accessible_campaigns: List[int] = []  # Liste des IDs des campagnes accessibles
+    created_campaigns: List[int] = Field(
+        [], validation_alias=AliasChoices("created_campaign_ids", "created_campaigns")
+    )  # Liste des IDs des campagnes créées
+    mj_campaigns: List[int] = Field(
+        [], validation_alias=AliasChoices("mj_campaign_ids", "mj_campaigns")
+    )  # Liste des IDs des campagnes où l'utilisateur est MJ
+    accessible_campaigns: List[int] = Field(
+        [],
+        validation_alias=AliasChoices(
+            "accessible_campaign_ids", "accessible_campaigns"
+        ),
+    )  # Liste des IDs des campagnes accessibles
 
     class Config:
         orm_mode = True
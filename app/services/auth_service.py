@@ -1,31 +1,39 @@
 from datetime import timedelta
 
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.crud.crud_user import crud_user
-from app.utils.security import create_access_token, verify_password
+from app.utils.password_pool import PasswordPoolBusyError
+from app.utils.security import create_access_token
 
 
 class AuthService:
     @staticmethod
-    def authenticate_user(db: Session, username: str, password: str):
+    async def authenticate_user(db: AsyncSession, username: str, password: str):
         """
         Authentifie un utilisateur en vérifiant le mot de passe.
+
+        Raises:
+            HTTPException: 503 si le pool de hachage est saturé.
         """
-        user = crud_user.get_by_username(db, username=username)
-        if not user or not verify_password(password, user.hashed_password):
-            return None
-        return user
+        try:
+            return await crud_user.authenticate(db, username, password)
+        except PasswordPoolBusyError as e:
+            raise HTTPException(
+                status_code=503,
+                detail=str(e),
+                headers={"Retry-After": str(settings.PASSWORD_RETRY_AFTER)},
+            ) from e
 
     @staticmethod
-    def login(db: Session, username: str, password: str):
+    async def login(db: AsyncSession, username: str, password: str):
         """
         Authentifie un utilisateur, génère un token JWT et retourne les informations d'authentification.
         """
         # Authentification de l'utilisateur
-        user = AuthService.authenticate_user(db, username, password)
+        user = await AuthService.authenticate_user(db, username, password)
         if not user:
             raise HTTPException(
                 status_code=400, detail="Incorrect username or password"
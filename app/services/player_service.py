@@ -0,0 +1,65 @@
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.storage import UploadTooLargeError, limit_size
+from app.crud import crud_player
+from app.transcription.audio import AudioDecodeError, decode
+from app.transcription.speakers import file_embedding, to_bytes
+from app.utils.streaming import write_file
+
+
+class PlayerService:
+    @staticmethod
+    async def enroll_voice(
+        db: AsyncSession, player_id: int, chunks: AsyncIterator[bytes]
+    ):
+        """
+        Enregistrer l'empreinte vocale d'un joueur à partir d'un échantillon
+        de sa voix, reçu en flux. L'échantillon n'est pas conservé.
+
+        Raises:
+            HTTPException: 404 si le joueur n'existe pas, 413 si l'échantillon
+                dépasse VOICE_SAMPLE_MAX_BYTES, 422 s'il ne peut pas être
+                décodé ou contient trop peu de parole.
+        """
+        if not await crud_player.get_by_id(db, player_id=player_id):
+            raise HTTPException(status_code=404, detail="Joueur non trouvé")
+        # Rendre la connexion au pool pendant la réception et l'analyse
+        await db.rollback()
+
+        with tempfile.TemporaryDirectory(prefix="voice-") as directory:
+            source = Path(directory) / "source"
+            try:
+                await write_file(
+                    source, limit_size(chunks, settings.VOICE_SAMPLE_MAX_BYTES)
+                )
+                audio = await decode(source, Path(directory) / "audio.wav")
+                embedding = await run_in_threadpool(file_embedding, audio)
+            except UploadTooLargeError as e:
+                raise HTTPException(status_code=413, detail=str(e)) from e
+            except AudioDecodeError as e:
+                raise HTTPException(status_code=422, detail=str(e)) from e
+        if embedding is None:
+            raise HTTPException(
+                status_code=422, detail="L'échantillon contient trop peu de parole"
+            )
+
+        if not await crud_player.set_voice(db, player_id, to_bytes(embedding)):
+            raise HTTPException(status_code=404, detail="Joueur non trouvé")
+
+    @staticmethod
+    async def forget_voice(db: AsyncSession, player_id: int):
+        """
+        Effacer l'empreinte vocale d'un joueur.
+
+        Raises:
+            HTTPException: 404 si le joueur n'existe pas.
+        """
+        if not await crud_player.set_voice(db, player_id, None):
+            raise HTTPException(status_code=404, detail="Joueur non trouvé")
@@ -0,0 +1,278 @@
+import mimetypes
+from pathlib import PurePosixPath
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.storage import StorageError, UploadTooLargeError, limit_size, storage
+from app.core.uploads import (
+    UploadLockedError,
+    UploadNotFoundError,
+    UploadOffsetError,
+    parse_metadata,
+    resumable_uploads,
+)
+from app.crud.crud_job import crud_job
+from app.crud.crud_session import crud_session
+from app.db.models import Job
+from app.jobs.session import COMPUTE_WAVEFORM, IDENTIFY_SPEAKERS, TRANSCRIBE_SESSION
+from app.schemas.schema_session import SessionUpdate
+from app.transcription.pool import backend_error
+
+
+class SessionService:
+    @staticmethod
+    def check_audio(content_type: Optional[str], content_length: Optional[str] = None):
+        """
+        Refuser un audio avant d'en recevoir le contenu, sur ses en-têtes.
+
+        Raises:
+            HTTPException: 400 si ce n'est pas un audio, 413 si sa taille
+                annoncée dépasse le maximum.
+        """
+        if not content_type or not content_type.startswith("audio/"):
+            raise HTTPException(status_code=400, detail="File must be an audio")
+        if content_length and content_length.isdigit():
+            if int(content_length) > settings.AUDIO_MAX_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=str(UploadTooLargeError(settings.AUDIO_MAX_BYTES)),
+                )
+
+    @staticmethod
+    async def upload_audio(
+        db: AsyncSession,
+        session_id: int,
+        filename: Optional[str],
+        content_type: str,
+        chunks: AsyncIterator[bytes],
+    ) -> str:
+        """
+        Enregistrer l'audio d'une session au fil de sa réception, dans le
+        stockage configuré, et retourner son URL.
+
+        Raises:
+            HTTPException: 404 si la session n'existe pas, 413 si l'audio
+                dépasse la taille maximale, 500 si le stockage échoue.
+        """
+        if not await crud_session.get_updated_at(db, session_id=session_id):
+            raise HTTPException(status_code=404, detail="Session not found")
+        # Rendre la connexion au pool pendant le transfert
+        await db.rollback()
+
+        return await SessionService._store_audio(
+            db, session_id, filename, content_type, chunks
+        )
+
+    @staticmethod
+    async def _store_audio(
+        db: AsyncSession,
+        session_id: int,
+        filename: Optional[str],
+        content_type: str,
+        chunks: AsyncIterator[bytes],
+    ) -> str:
+        name = PurePosixPath(filename or "").name
+        if not name:
+            name = "audio" + (mimetypes.guess_extension(content_type) or "")
+        try:
+            url = await storage.save(
+                f"sessions/{session_id}/{name}",
+                limit_size(chunks, settings.AUDIO_MAX_BYTES),
+                content_type,
+            )
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e)) from e
+        except StorageError as e:
+            raise HTTPException(
+                status_code=500, detail=f"Audio upload failed: {e}"
+            ) from e
+
+        session = await crud_session.update(
+            db, session_id, SessionUpdate(audio_path=url)
+        )
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        if settings.WAVEFORM_ON_UPLOAD:
+            await crud_job.enqueue(db, COMPUTE_WAVEFORM, {"session_id": session_id})
+        if settings.TRANSCRIPTION_ON_UPLOAD and not backend_error(
+            settings.TRANSCRIPTION_BACKEND
+        ):
+            await crud_job.enqueue(db, TRANSCRIBE_SESSION, {"session_id": session_id})
+        await db.commit()
+        return url
+
+    @staticmethod
+    async def transcribe(db: AsyncSession, session_id: int) -> Job:
+        """
+        Demander la transcription de l'audio d'une session ; ses dialogues
+        seront remplacés par le résultat.
+
+        Raises:
+            HTTPException: 404 si la session n'existe pas, 409 si elle n'a
+                pas encore d'audio, 503 si le backend de transcription n'est
+                pas utilisable.
+        """
+        error = backend_error(settings.TRANSCRIPTION_BACKEND)
+        if error:
+            raise HTTPException(
+                status_code=503, detail=f"Transcription indisponible : {error}"
+            )
+        return await SessionService._enqueue_audio_job(
+            db, session_id, TRANSCRIBE_SESSION
+        )
+
+    @staticmethod
+    async def identify_speakers(db: AsyncSession, session_id: int) -> Job:
+        """
+        Demander la reconnaissance des joueurs qui parlent dans les dialogues
+        d'une session, d'après leurs empreintes vocales.
+
+        Raises:
+            HTTPException: 404 si la session n'existe pas, 409 si elle n'a
+                pas encore d'audio.
+        """
+        return await SessionService._enqueue_audio_job(
+            db, session_id, IDENTIFY_SPEAKERS
+        )
+
+    @staticmethod
+    async def compute_waveform(db: AsyncSession, session_id: int) -> Job:
+        """
+        Demander le calcul de la forme d'onde de l'audio d'une session (fait
+        automatiquement à chaque envoi si WAVEFORM_ON_UPLOAD).
+
+        Raises:
+            HTTPException: 404 si la session n'existe pas, 409 si elle n'a
+                pas encore d'audio.
+        """
+        return await SessionService._enqueue_audio_job(db, session_id, COMPUTE_WAVEFORM)
+
+    @staticmethod
+    async def _enqueue_audio_job(
+        db: AsyncSession, session_id: int, job_type: str
+    ) -> Job:
+        session = await crud_session.get_by_id(db, session_id=session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+        if not session.audio_path:
+            raise HTTPException(status_code=409, detail="Session has no audio")
+        job = await crud_job.enqueue(db, job_type, {"session_id": session_id})
+        await db.commit()
+        return job
+
+    @staticmethod
+    async def create_upload(
+        db: AsyncSession,
+        session_id: int,
+        length: Optional[str],
+        metadata: Optional[str],
+    ) -> str:
+        """
+        Déclarer un envoi reprenable de l'audio d'une session et retourner
+        son ID. Le nom et le type du fichier sont les métadonnées tus
+        `filename` et `filetype`.
+
+        Raises:
+            HTTPException: 404 si la session n'existe pas, 400 si la taille ou
+                les métadonnées sont invalides ou si ce n'est pas un audio,
+                413 si la taille dépasse le maximum.
+        """
+        if not length or not length.isdigit():
+            raise HTTPException(status_code=400, detail="Invalid Upload-Length")
+        try:
+            info = parse_metadata(metadata)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        SessionService.check_audio(info.get("filetype"), length)
+        if not await crud_session.get_updated_at(db, session_id=session_id):
+            raise HTTPException(status_code=404, detail="Session not found")
+        return await resumable_uploads.create(
+            int(length),
+            session_id=session_id,
+            filename=info.get("filename"),
+            content_type=info["filetype"],
+        )
+
+    @staticmethod
+    async def get_upload(session_id: int, upload_id: str) -> dict:
+        """
+        Description d'un envoi reprenable, dont la position atteinte.
+
+        Raises:
+            HTTPException: 404 si l'envoi n'existe pas pour cette session.
+        """
+        try:
+            info = await resumable_uploads.info(upload_id)
+        except UploadNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e)) from e
+        if info["session_id"] != session_id:
+            raise HTTPException(status_code=404, detail=str(UploadNotFoundError()))
+        return info
+
+    @staticmethod
+    async def append_upload(
+        db: AsyncSession,
+        session_id: int,
+        upload_id: str,
+        offset: Optional[str],
+        chunks: AsyncIterator[bytes],
+    ) -> int:
+        """
+        Ajouter un morceau à un envoi reprenable et retourner la nouvelle
+        position. Le morceau qui complète l'envoi le transmet au stockage ;
+        l'audio de la session n'est remplacé qu'à ce moment. Un morceau vide
+        à la fin relance cette transmission si elle a échoué.
+
+        Raises:
+            HTTPException: 400 si la position est absente, 404 si l'envoi
+                n'existe pas, 409 si la position n'est pas celle atteinte,
+                413 si le morceau dépasse la taille déclarée, 423 si un
+                autre morceau est en cours.
+        """
+        if not offset or not offset.isdigit():
+            raise HTTPException(status_code=400, detail="Invalid Upload-Offset")
+        info = await SessionService.get_upload(session_id, upload_id)
+        try:
+            async with resumable_uploads.lock(upload_id):
+                position = await resumable_uploads.append(
+                    upload_id, int(offset), chunks
+                )
+                if position == info["length"]:
+                    await SessionService._store_audio(
+                        db,
+                        session_id,
+                        info["filename"],
+                        info["content_type"],
+                        resumable_uploads.read(upload_id),
+                    )
+                    await resumable_uploads.delete(upload_id)
+        except UploadNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e)) from e
+        except UploadOffsetError as e:
+            raise HTTPException(
+                status_code=409,
+                detail=str(e),
+                headers={"Upload-Offset": str(e.offset)},
+            ) from e
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e)) from e
+        except UploadLockedError as e:
+            raise HTTPException(status_code=423, detail=str(e)) from e
+        return position
+
+    @staticmethod
+    async def cancel_upload(session_id: int, upload_id: str):
+        """
+        Abandonner un envoi reprenable et supprimer ses parties.
+        """
+        await SessionService.get_upload(session_id, upload_id)
+        try:
+            async with resumable_uploads.lock(upload_id):
+                await resumable_uploads.delete(upload_id)
+        except UploadLockedError as e:
+            raise HTTPException(status_code=423, detail=str(e)) from e
+        except UploadNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e)) from e
@@ -0,0 +1,5 @@
+# Reconnaissance vocale des enregistrements de session
+
+from .base import Segment, Transcriber
+
+__all__ = ["Segment", "Transcriber"]
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import shutil
+import wave
+from pathlib import Path
+from typing import Tuple
+
+# Format attendu par les backends : PCM 16 bits, mono, 16 kHz
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+
+class AudioDecodeError(Exception):
+    def __init__(self, message="Impossible de décoder le fichier audio."):
+        """
+        Initialiser l'exception AudioDecodeError.
+
+        Args:
+            message (str): Le message d'erreur.
+        """
+        super().__init__(message)
+
+
+def wav_info(path: Path) -> Tuple[int, int]:
+    """
+    Nombre d'échantillons et fréquence d'un fichier WAV.
+    """
+    with wave.open(str(path), "rb") as wav:
+        return wav.getnframes(), wav.getframerate()
+
+
+def data_offset(path: Path) -> int:
+    """
+    Position des échantillons dans un fichier WAV (début du bloc `data`),
+    pour les lire sans passer par `wave`.
+
+    Raises:
+        AudioDecodeError: Si le fichier n'est pas un WAV ou n'a pas de données.
+    """
+    with open(path, "rb") as file:
+        header = file.read(12)
+        if header[:4] != b"RIFF" or header[8:] != b"WAVE":
+            raise AudioDecodeError("Fichier WAV invalide.")
+        while len(chunk := file.read(8)) == 8:
+            if chunk[:4] == b"data":
+                return file.tell()
+            size = int.from_bytes(chunk[4:], "little")
+            file.seek(size + size % 2, os.SEEK_CUR)
+    raise AudioDecodeError("Fichier WAV sans données.")
+
+
+def read_frames(path: Path, start: int, count: int) -> bytes:
+    """
+    Lire `count` échantillons d'un fichier WAV à partir de `start`, sans
+    charger le reste du fichier.
+    """
+    with wave.open(str(path), "rb") as wav:
+        wav.setpos(start)
+        return wav.readframes(count)
+
+
+def _is_decoded(path: Path) -> bool:
+    try:
+        with wave.open(str(path), "rb") as wav:
+            return (
+                wav.getnchannels() == 1
+                and wav.getsampwidth() == SAMPLE_WIDTH
+                and wav.getframerate() == SAMPLE_RATE
+            )
+    except (wave.Error, EOFError):
+        return False
+
+
+async def decode(source: Path, destination: Path) -> Path:
+    """
+    Convertir un fichier audio au format des backends et retourner le chemin
+    du résultat : `source` s'il y est déjà, sinon `destination`, produit par
+    ffmpeg dans un sous-processus (la boucle d'événements n'est pas bloquée).
+
+    Raises:
+        AudioDecodeError: Si ffmpeg est absent ou ne peut pas lire le fichier.
+    """
+    if _is_decoded(source):
+        return source
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise AudioDecodeError(
+            "ffmpeg est requis pour décoder les fichiers autres que WAV 16 kHz mono."
+        )
+    process = await asyncio.create_subprocess_exec(
+        ffmpeg,
+        "-nostdin",
+        "-v",
+        "error",
+        "-y",
+        "-i",
+        str(source),
+        "-ac",
+        "1",
+        "-ar",
+        str(SAMPLE_RATE),
+        "-c:a",
+        "pcm_s16le",
+        "-f",
+        "wav",
+        str(destination),
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, errors = await process.communicate()
+    if process.returncode != 0:
+        raise AudioDecodeError(errors.decode(errors="replace").strip())
+    return destination
@@ -0,0 +1,31 @@
+from abc import ABC, abstractmethod
+from typing import List, NamedTuple, Optional
+
+
+class Segment(NamedTuple):
+    """
+    Passage transcrit. Les temps sont en millisecondes, depuis le début du
+    morceau transcrit puis, une fois fusionnés, depuis le début de la session.
+    """
+
+    start_ms: int
+    end_ms: int
+    text: str
+    speaker: Optional[str] = None  # Libellé de diarisation, si le backend en fournit
+
+
+class Transcriber(ABC):
+    """
+    Backend de reconnaissance vocale.
+
+    Une instance est créée une fois par processus du pool de transcription
+    (le chargement d'un modèle est coûteux), puis appelée pour chaque
+    morceau d'audio attribué à ce processus.
+    """
+
+    @abstractmethod
+    def transcribe(self, pcm: bytes, sample_rate: int, offset_ms: int) -> List[Segment]:
+        """
+        Transcrire un morceau d'audio PCM 16 bits mono, qui commence
+        `offset_ms` millisecondes après le début de la session.
+        """
@@ -0,0 +1,293 @@
+import asyncio
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.storage import storage
+from app.crud.crud_dialog import crud_dialog
+from app.crud.crud_player import crud_player
+from app.crud.crud_session import crud_session
+from app.crud.crud_waveform import crud_waveform
+from app.db.session import SessionLocal
+from app.transcription.audio import decode, wav_info
+from app.transcription.base import Segment
+from app.transcription.pool import TranscriptionPool
+from app.transcription.speakers import SpeakerMatcher, segment_embeddings
+from app.transcription.vad import SpeechSegment, detect_speech
+from app.transcription.waveform import compute_peaks, encode_peaks
+
+
+class Chunk(NamedTuple):
+    """
+    Morceau d'audio transcrit séparément, en échantillons. Il ne garde que
+    les passages qui commencent dans [keep_from_ms, keep_until_ms) : chaque
+    zone de chevauchement est partagée en son milieu entre les deux morceaux
+    qui la couvrent, et un passage coupé au début d'un morceau appartient au
+    précédent.
+    """
+
+    start: int
+    count: int
+    keep_from_ms: float
+    keep_until_ms: float
+
+
+def plan_chunks(
+    start: int, end: int, rate: int, chunk_seconds: float, overlap_seconds: float
+) -> List[Chunk]:
+    """
+    Découper les échantillons [start, end) en morceaux de `chunk_seconds` qui
+    se chevauchent de `overlap_seconds` : un mot coupé à la fin d'un morceau
+    est entier au début du suivant.
+    """
+    size = int(chunk_seconds * rate)
+    step = size - int(overlap_seconds * rate)
+    if step <= 0:
+        raise ValueError("Le chevauchement doit être plus court que les morceaux")
+    starts = list(range(start, max(end - size, start) + 1, step))
+    if starts[-1] + size < end:
+        starts.append(starts[-1] + step)
+    chunks = []
+    for index, chunk_start in enumerate(starts):
+        chunk_end = min(chunk_start + size, end)
+        keep_from = 0.0 if index == 0 else chunks[-1].keep_until_ms
+        if index + 1 < len(starts):
+            keep_until = (starts[index + 1] + chunk_end) / 2 * 1000 / rate
+        else:
+            keep_until = float("inf")
+        chunks.append(
+            Chunk(chunk_start, chunk_end - chunk_start, keep_from, keep_until)
+        )
+    return chunks
+
+
+def merge_segments(
+    chunks: Sequence[Chunk], results: Sequence[List[Segment]]
+) -> List[Segment]:
+    """
+    Fusionner les passages des morceaux, sans les doublons des zones de
+    chevauchement, dans l'ordre de la session.
+    """
+    segments = [
+        segment
+        for chunk, found in zip(chunks, results)
+        for segment in found
+        if segment.text and chunk.keep_from_ms <= segment.start_ms < chunk.keep_until_ms
+    ]
+    return sorted(segments, key=lambda segment: (segment.start_ms, segment.end_ms))
+
+
+async def _records(session_id: int, segments: List[Segment]) -> AsyncIterator[dict]:
+    for order, segment in enumerate(segments):
+        yield {
+            "order": order,
+            "start_ms": max(segment.start_ms, 0),
+            "end_ms": max(segment.end_ms, 0),
+            "speaker_label": segment.speaker,
+            "content": segment.text,
+            "session_id": session_id,
+        }
+
+
+async def speech_segments(
+    session_id: int, audio_path: str, audio: Path
+) -> Optional[List[SpeechSegment]]:
+    """
+    Passages parlés de l'audio décodé d'une session. Ils sont calculés une
+    fois puis enregistrés avec la session, et relus tant que son audio ne
+    change pas. Retourne None si la détection est désactivée (VAD_ENABLED).
+    """
+    if not settings.VAD_ENABLED:
+        return None
+    async with SessionLocal() as db:
+        stored = await crud_session.get_speech_segments(db, session_id)
+    if stored is not None:
+        return [SpeechSegment(*segment) for segment in stored]
+    segments = await run_in_threadpool(
+        detect_speech,
+        audio,
+        settings.VAD_ENERGY_MARGIN_DB,
+        settings.VAD_MAX_ZERO_CROSSING_RATE,
+        settings.VAD_MIN_SPEECH_MS,
+        settings.VAD_MIN_SILENCE_MS,
+        settings.VAD_PADDING_MS,
+    )
+    async with SessionLocal() as db:
+        await crud_session.set_speech_segments(db, session_id, audio_path, segments)
+    return segments
+
+
+async def transcribe_session(session_id: int) -> dict:
+    """
+    Transcrire l'audio d'une session et remplacer ses dialogues.
+
+    L'audio est téléchargé et décodé dans un répertoire temporaire ; seuls
+    ses passages parlés sont découpés en morceaux qui se chevauchent,
+    transcrits en parallèle par le pool de processus. Les passages fusionnés
+    sont importés en une transaction, puis leurs locuteurs reconnus
+    (`label_speakers`). Retourne le résultat du travail (compteurs).
+    """
+    async with SessionLocal() as db:
+        session = await crud_session.get_by_id(db, session_id=session_id)
+    if session is None or not session.audio_path:
+        return {"detail": "Session introuvable ou sans audio", "inserted": 0}
+
+    with tempfile.TemporaryDirectory(prefix="transcription-") as directory:
+        source = Path(directory) / "source"
+        await storage.download(session.audio_path, source)
+        audio = await decode(source, Path(directory) / "audio.wav")
+        frames, rate = await run_in_threadpool(wav_info, audio)
+        speech = await speech_segments(session_id, session.audio_path, audio)
+        if speech is None:
+            speech = [SpeechSegment(0, frames * 1000 // rate)]
+        # Les passages parlés sont découpés séparément : les silences qui
+        # les séparent ne sont jamais transcrits
+        chunks = [
+            chunk
+            for segment in speech
+            for chunk in plan_chunks(
+                segment.start_ms * rate // 1000,
+                min(segment.end_ms * rate // 1000, frames),
+                rate,
+                settings.TRANSCRIPTION_CHUNK_SECONDS,
+                settings.TRANSCRIPTION_OVERLAP_SECONDS,
+            )
+        ]
+        results = await asyncio.gather(
+            *(
+                transcription_pool.transcribe(audio, chunk.start, chunk.count, rate)
+                for chunk in chunks
+            )
+        )
+
+        segments = merge_segments(chunks, results)
+        async with SessionLocal() as db:
+            counts = await crud_dialog.replace_session(
+                db, session_id, _records(session_id, segments)
+            )
+        speakers = await label_speakers(session_id, audio)
+
+    return {
+        "inserted": counts["inserted"],
+        "deleted": counts["deleted"],
+        "chunks": len(chunks),
+        "duration_ms": frames * 1000 // rate,
+        "speech_ms": sum(segment.end_ms - segment.start_ms for segment in speech),
+        "speakers": speakers,
+    }
+
+
+async def identify_speakers(session_id: int) -> dict:
+    """
+    Reconnaître les joueurs qui parlent dans les dialogues existants d'une
+    session (voir `label_speakers`). Retourne le résultat du travail.
+    """
+    async with SessionLocal() as db:
+        session = await crud_session.get_by_id(db, session_id=session_id)
+    if session is None or not session.audio_path:
+        return {"detail": "Session introuvable ou sans audio", "speakers": []}
+
+    with tempfile.TemporaryDirectory(prefix="speakers-") as directory:
+        source = Path(directory) / "source"
+        await storage.download(session.audio_path, source)
+        audio = await decode(source, Path(directory) / "audio.wav")
+        return {"speakers": await label_speakers(session_id, audio)}
+
+
+async def compute_waveform(session_id: int) -> dict:
+    """
+    Calculer les niveaux de détail de la forme d'onde de l'audio d'une
+    session et les enregistrer avec elle. Retourne le résultat du travail.
+    """
+    async with SessionLocal() as db:
+        session = await crud_session.get_by_id(db, session_id=session_id)
+    if session is None or not session.audio_path:
+        return {"detail": "Session introuvable ou sans audio", "levels": 0}
+
+    with tempfile.TemporaryDirectory(prefix="waveform-") as directory:
+        source = Path(directory) / "source"
+        await storage.download(session.audio_path, source)
+        audio = await decode(source, Path(directory) / "audio.wav")
+        _, rate = await run_in_threadpool(wav_info, audio)
+        levels = await run_in_threadpool(compute_peaks, audio)
+
+    rows = [
+        {
+            "samples_per_peak": level.samples_per_peak,
+            "sample_rate": rate,
+            "peaks8": encode_peaks(level, 8),
+            "peaks16": encode_peaks(level, 16),
+        }
+        for level in levels
+    ]
+    async with SessionLocal() as db:
+        if not await crud_waveform.replace(db, session_id, session.audio_path, rows):
+            return {"detail": "L'audio de la session a changé", "levels": 0}
+    return {
+        "levels": len(rows),
+        "peaks": [len(level.minima) for level in levels],
+        "bytes": sum(len(row["peaks8"]) + len(row["peaks16"]) for row in rows),
+    }
+
+
+async def label_speakers(session_id: int, audio: Path) -> List[dict]:
+    """
+    Attribuer aux dialogues d'une session les joueurs reconnus à leur voix,
+    d'après l'audio décodé de la session.
+
+    Les empreintes des extraits de chaque dialogue sont comparées en un
+    lot à celles des joueurs de la session qui en ont une ; les dialogues
+    d'un même locuteur diarisé (speaker_label) sont reconnus ensemble. Sous
+    SPEAKER_MATCH_THRESHOLD, le dialogue reste sans locuteur. Les locuteurs
+    choisis à la main ne sont pas modifiés. Retourne, par locuteur reconnu,
+    le joueur attribué, la similarité et le nombre de dialogues.
+    """
+    async with SessionLocal() as db:
+        voices = await crud_player.get_session_voices(db, session_id)
+        if not voices:
+            return []
+        lines = await crud_dialog.get_voice_segments(db, session_id)
+    embeddings, found = await run_in_threadpool(
+        segment_embeddings, audio, [(start, end) for _, start, end, _ in lines]
+    )
+    lines = [line for line, voiced in zip(lines, found) if voiced]
+    matches = SpeakerMatcher.from_rows(voices).match_labels(
+        [label for *_, label in lines], embeddings[found]
+    )
+
+    assignments = []
+    speakers: Dict[Tuple, dict] = {}
+    for (dialog_id, *_, label), match in zip(lines, matches):
+        player_id = match.player_id
+        if match.confidence < settings.SPEAKER_MATCH_THRESHOLD:
+            player_id = None
+        assignments.append(
+            (dialog_id, player_id, match.confidence if player_id else None)
+        )
+        speaker = speakers.setdefault(
+            (label, player_id),
+            {
+                "speaker_label": label,
+                "speaker_id": player_id,
+                "confidence": 0.0,
+                "lines": 0,
+            },
+        )
+        speaker["confidence"] += match.confidence
+        speaker["lines"] += 1
+    async with SessionLocal() as db:
+        await crud_dialog.assign_speakers(db, session_id, assignments)
+    for speaker in speakers.values():
+        speaker["confidence"] = round(speaker["confidence"] / speaker["lines"], 3)
+    return list(speakers.values())
+
+
+transcription_pool = TranscriptionPool(
+    settings.TRANSCRIPTION_WORKERS,
+    settings.TRANSCRIPTION_BACKEND,
+    settings.TRANSCRIPTION_MODEL,
+    settings.TRANSCRIPTION_LANGUAGE,
+)
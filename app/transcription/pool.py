@@ -0,0 +1,109 @@
+import asyncio
+import importlib.util
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from app.transcription.audio import read_frames
+from app.transcription.base import Segment, Transcriber
+from app.transcription.stub import StubTranscriber
+from app.transcription.whisper import WhisperTranscriber
+
+# Backend de chaque processus du pool, créé à son démarrage
+_transcriber: Optional[Transcriber] = None
+
+
+def create_transcriber(backend: str, model: str, language: Optional[str]):
+    if backend == "whisper":
+        return WhisperTranscriber(model, language)
+    if backend == "stub":
+        return StubTranscriber()
+    raise RuntimeError(f"TRANSCRIPTION_BACKEND inconnu : {backend}")
+
+
+def backend_error(backend: str) -> Optional[str]:
+    """
+    Raison pour laquelle le backend ne peut pas être créé dans ce
+    déploiement (backend inconnu, paquet manquant), sans charger de modèle.
+    Retourne None si le backend est utilisable.
+    """
+    if backend == "whisper":
+        if importlib.util.find_spec("faster_whisper") is None:
+            return (
+                "Le paquet faster-whisper est requis pour "
+                "utiliser TRANSCRIPTION_BACKEND=whisper."
+            )
+        return None
+    if backend == "stub":
+        return None
+    return f"TRANSCRIPTION_BACKEND inconnu : {backend}"
+
+
+def _start(backend: str, model: str, language: Optional[str]):
+    global _transcriber
+    _transcriber = create_transcriber(backend, model, language)
+
+
+def transcribe_chunk(path: str, start: int, count: int, rate: int) -> List[Segment]:
+    """
+    Transcrire `count` échantillons du fichier à partir de `start` (exécuté
+    dans un processus du pool). Les temps retournés partent du début de la
+    session.
+    """
+    offset_ms = start * 1000 // rate
+    pcm = read_frames(Path(path), start, count)
+    return [
+        Segment(
+            segment.start_ms + offset_ms,
+            segment.end_ms + offset_ms,
+            segment.text.strip(),
+            segment.speaker,
+        )
+        for segment in _transcriber.transcribe(pcm, rate, offset_ms)
+    ]
+
+
+class TranscriptionPool:
+    """
+    Pool de processus de transcription, un par cœur par défaut.
+
+    La reconnaissance vocale est liée au CPU et ne libère pas le GIL : des
+    threads n'occuperaient qu'un cœur. Chaque processus charge le modèle une
+    fois à son démarrage, puis transcrit les morceaux qu'on lui confie.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int],
+        backend: str,
+        model: str,
+        language: Optional[str] = None,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+        self.model = model
+        self.language = language
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def transcribe(
+        self, path: Path, start: int, count: int, rate: int
+    ) -> List[Segment]:
+        if self._executor is None:
+            # spawn : un fork hériterait de la boucle d'événements et des
+            # connexions ouvertes du worker
+            self._executor = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_start,
+                initargs=(self.backend, self.model, self.language),
+            )
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, transcribe_chunk, str(path), start, count, rate
+        )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
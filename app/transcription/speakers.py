@@ -0,0 +1,213 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.transcription.audio import data_offset, wav_info
+
+# Analyse : trames de 25 ms toutes les 10 ms (à 16 kHz)
+FRAME = 400
+HOP = 160
+FFT_SIZE = 512
+MEL_BANDS = 40
+# Coefficients cepstraux gardés, sans le premier (le volume)
+CEPSTRA = 20
+# Dimension d'une empreinte : moyenne et écart-type des coefficients
+EMBEDDING_DIM = 2 * (CEPSTRA - 1)
+# Trames gardées : à moins de DYNAMIC_RANGE_DB de la plus forte, et au-dessus
+# de MIN_ENERGY_DB (énergie des échantillons 16 bits, 0 dB pour le silence)
+DYNAMIC_RANGE_DB = 30.0
+MIN_ENERGY_DB = 30.0
+# Trames utiles nécessaires à une empreinte (0,5 s)
+MIN_FRAMES = 50
+
+
+class SpeakerMatch(NamedTuple):
+    """
+    Joueur reconnu pour une voix, avec la similarité cosinus obtenue
+    (entre -1 et 1). `player_id` vaut None si aucun joueur n'est enrôlé.
+    """
+
+    player_id: Optional[int]
+    confidence: float
+
+
+@lru_cache
+def _mel_filterbank(rate: int) -> np.ndarray:
+    # Filtres triangulaires espacés sur l'échelle mel, (MEL_BANDS, bins FFT)
+    def mel(hz):
+        return 2595 * np.log10(1 + hz / 700)
+
+    def hz(mel):
+        return 700 * (10 ** (mel / 2595) - 1)
+
+    edges = hz(np.linspace(mel(20), mel(rate / 2), MEL_BANDS + 2))
+    bins = np.fft.rfftfreq(FFT_SIZE, 1 / rate)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    return np.maximum(0, np.minimum(rising, falling)).astype(np.float32)
+
+
+@lru_cache
+def _dct_matrix() -> np.ndarray:
+    # DCT-II orthonormée, (CEPSTRA, MEL_BANDS)
+    n = np.arange(MEL_BANDS)
+    k = np.arange(CEPSTRA)[:, None]
+    matrix = np.cos(np.pi * k * (2 * n + 1) / (2 * MEL_BANDS))
+    matrix *= np.sqrt(2 / MEL_BANDS)
+    matrix[0] /= np.sqrt(2)
+    return matrix.astype(np.float32)
+
+
+_WINDOW = np.hanning(FRAME).astype(np.float32)
+
+
+def voice_embedding(pcm: np.ndarray, rate: int) -> Optional[np.ndarray]:
+    """
+    Empreinte vocale (float32, EMBEDDING_DIM valeurs) d'un extrait PCM
+    16 bits : moyenne et écart-type de ses coefficients cepstraux (MFCC),
+    calculés sur les trames parlées. Retourne None si l'extrait contient
+    trop peu de parole.
+    """
+    if len(pcm) < FRAME:
+        return None
+    frames = np.lib.stride_tricks.sliding_window_view(pcm, FRAME)[::HOP]
+    samples = frames.astype(np.float32)
+    energy = 10 * np.log10(np.mean(samples * samples, axis=1) + 1.0)
+    kept = (energy >= energy.max() - DYNAMIC_RANGE_DB) & (energy >= MIN_ENERGY_DB)
+    if np.count_nonzero(kept) < MIN_FRAMES:
+        return None
+    power = np.abs(np.fft.rfft(samples[kept] * _WINDOW, FFT_SIZE)) ** 2
+    bands = np.log(power @ _mel_filterbank(rate).T + 1e-6)
+    cepstra = (bands @ _dct_matrix().T)[:, 1:]
+    return np.concatenate([cepstra.mean(axis=0), cepstra.std(axis=0)]).astype(
+        np.float32
+    )
+
+
+def segment_embeddings(
+    path: Path, segments: Sequence[Tuple[int, int]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Empreintes des extraits [début_ms, fin_ms) d'un fichier WAV PCM 16 bits
+    mono, lu par projection en mémoire (memmap) : seuls les extraits sont
+    chargés. Retourne la matrice des empreintes et, pour chaque extrait, un
+    booléen indiquant s'il en a une (assez de parole).
+    """
+    frames, rate = wav_info(path)
+    embeddings = np.zeros((len(segments), EMBEDDING_DIM), dtype=np.float32)
+    found = np.zeros(len(segments), dtype=bool)
+    if not frames:
+        return embeddings, found
+    pcm = np.memmap(
+        path, dtype="<i2", mode="r", offset=data_offset(path), shape=(frames,)
+    )
+    for index, (start_ms, end_ms) in enumerate(segments):
+        embedding = voice_embedding(
+            pcm[start_ms * rate // 1000 : end_ms * rate // 1000], rate
+        )
+        if embedding is not None:
+            embeddings[index] = embedding
+            found[index] = True
+    return embeddings, found
+
+
+def file_embedding(path: Path) -> Optional[np.ndarray]:
+    """
+    Empreinte vocale de tout un fichier WAV PCM 16 bits mono (échantillon
+    d'enrôlement), ou None s'il contient trop peu de parole.
+    """
+    embeddings, found = segment_embeddings(path, [(0, _duration_ms(path))])
+    return embeddings[0] if found[0] else None
+
+
+def _duration_ms(path: Path) -> int:
+    frames, rate = wav_info(path)
+    return frames * 1000 // rate
+
+
+def to_bytes(embedding: np.ndarray) -> bytes:
+    return embedding.astype("<f4").tobytes()
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<f4")
+
+
+class SpeakerMatcher:
+    """
+    Plus proche voisin parmi les empreintes des joueurs d'une session,
+    gardées en une matrice NumPy.
+
+    Les empreintes sont centrées et réduites dimension par dimension avec
+    les statistiques de l'ensemble comparé (joueurs et voix à reconnaître) :
+    ce qui distingue les voix entre elles pèse plus que ce qu'ont en commun
+    toutes les voix et le micro. Les voix sont ensuite comparées en une
+    multiplication de matrices (similarité cosinus).
+    """
+
+    def __init__(self, player_ids: Sequence[int], embeddings: np.ndarray):
+        self.player_ids = np.asarray(player_ids, dtype=np.int64)
+        self.embeddings = np.asarray(embeddings, dtype=np.float32).reshape(
+            len(self.player_ids), EMBEDDING_DIM
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Tuple[int, bytes]]) -> "SpeakerMatcher":
+        """
+        Construire le matcher depuis des lignes (ID du joueur, empreinte).
+        """
+        return cls(
+            [player_id for player_id, _ in rows],
+            np.array([from_bytes(data) for _, data in rows], dtype=np.float32),
+        )
+
+    def match(self, embeddings: np.ndarray) -> List[SpeakerMatch]:
+        """
+        Joueur le plus proche de chaque voix, toutes comparées à la fois.
+        """
+        if not len(embeddings):
+            return []
+        if not len(self.player_ids):
+            return [SpeakerMatch(None, 0.0)] * len(embeddings)
+        everything = np.vstack([self.embeddings, embeddings])
+        mean = everything.mean(axis=0)
+        scale = everything.std(axis=0) + 1e-6
+        players = _normalize((self.embeddings - mean) / scale)
+        voices = _normalize((embeddings - mean) / scale)
+        similarity = voices @ players.T
+        best = similarity.argmax(axis=1)
+        confidence = similarity[np.arange(len(best)), best]
+        return [
+            SpeakerMatch(int(self.player_ids[index]), float(score))
+            for index, score in zip(best, confidence)
+        ]
+
+    def match_labels(
+        self, labels: Sequence[Optional[str]], embeddings: np.ndarray
+    ) -> List[SpeakerMatch]:
+        """
+        Reconnaître des extraits diarisés : les extraits d'un même locuteur
+        (même `labels[i]`) sont reconnus ensemble, d'après la moyenne de
+        leurs empreintes, et reçoivent le même joueur. Les extraits sans
+        locuteur sont reconnus un par un.
+        """
+        groups: Dict[Optional[str], List[int]] = {}
+        for index, label in enumerate(labels):
+            groups.setdefault(label, []).append(index)
+        unlabelled = groups.pop(None, [])
+        keys = [[index] for index in unlabelled] + list(groups.values())
+        pooled = np.array(
+            [embeddings[indices].mean(axis=0) for indices in keys], dtype=np.float32
+        ).reshape(len(keys), EMBEDDING_DIM)
+        matches: List[Optional[SpeakerMatch]] = [None] * len(labels)
+        for indices, match in zip(keys, self.match(pooled)):
+            for index in indices:
+                matches[index] = match
+        return matches
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / (np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-6)
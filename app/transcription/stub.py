@@ -0,0 +1,36 @@
+from typing import List
+
+from app.transcription.base import Segment, Transcriber
+
+# Durée des passages produits
+STUB_SEGMENT_MS = 5000
+
+
+class StubTranscriber(Transcriber):
+    """
+    Backend déterministe pour les tests et le développement, sans modèle.
+
+    Produit un passage toutes les STUB_SEGMENT_MS millisecondes de la
+    session, alterné entre deux locuteurs et coupé aux bords du morceau
+    comme le serait un mot tronqué. Les passages sont calés sur les temps de
+    la session : deux morceaux qui se chevauchent produisent les mêmes, ce
+    qui permet de vérifier leur fusion.
+    """
+
+    def transcribe(self, pcm: bytes, sample_rate: int, offset_ms: int) -> List[Segment]:
+        end_ms = offset_ms + len(pcm) // 2 * 1000 // sample_rate
+        index = offset_ms // STUB_SEGMENT_MS
+        segments = []
+        while index * STUB_SEGMENT_MS < end_ms:
+            start_ms = max(index * STUB_SEGMENT_MS, offset_ms)
+            stop_ms = min((index + 1) * STUB_SEGMENT_MS, end_ms)
+            segments.append(
+                Segment(
+                    start_ms - offset_ms,
+                    stop_ms - offset_ms,
+                    f"Passage {index + 1}",
+                    f"SPEAKER_{index % 2}",
+                )
+            )
+            index += 1
+        return segments
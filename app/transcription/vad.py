@@ -0,0 +1,121 @@
+from pathlib import Path
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+
+from app.transcription.audio import data_offset, wav_info
+
+# Durée d'une trame d'analyse
+FRAME_MS = 30
+# Trames analysées à la fois : la mémoire reste bornée quelle que soit la
+# durée de l'enregistrement (2000 trames = 1 minute)
+BLOCK_FRAMES = 2000
+# Percentile des énergies pris comme bruit de fond de l'enregistrement
+NOISE_PERCENTILE = 10
+
+
+class SpeechSegment(NamedTuple):
+    """
+    Passage parlé, en millisecondes depuis le début de l'enregistrement.
+    """
+
+    start_ms: int
+    end_ms: int
+
+
+def frame_features(pcm: np.ndarray, frame: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Énergie (en dB) et taux de passage par zéro de chaque trame complète de
+    `frame` échantillons PCM 16 bits, calculés pour toutes les trames à la
+    fois.
+    """
+    frames = pcm[: len(pcm) // frame * frame].reshape(-1, frame)
+    samples = frames.astype(np.float32)
+    energy = 10 * np.log10(np.mean(samples * samples, axis=1) + 1.0)
+    signs = np.signbit(frames)
+    crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1)
+    return energy, crossings / np.float32(frame - 1)
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Débuts et fins (exclues) des suites de trames vraies
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.view(np.int8), [0]))))
+    return edges[0::2], edges[1::2]
+
+
+def _merge(
+    starts: np.ndarray, ends: np.ndarray, min_gap: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    # Réunir les suites séparées de moins de `min_gap` trames
+    if not len(starts):
+        return starts, ends
+    kept = starts[1:] - ends[:-1] >= min_gap
+    return starts[np.r_[True, kept]], ends[np.r_[kept, True]]
+
+
+def speech_frames(
+    energy: np.ndarray,
+    crossings: np.ndarray,
+    margin_db: float,
+    max_crossing_rate: float,
+) -> np.ndarray:
+    """
+    Trames parlées : assez énergiques par rapport au bruit de fond de
+    l'enregistrement, sans le taux de passage par zéro élevé des bruits
+    (dés, souffle, papier). Les consonnes sifflantes ainsi écartées sont
+    récupérées par le lissage de `detect_speech`.
+    """
+    if not len(energy):
+        return np.zeros(0, dtype=bool)
+    threshold = np.percentile(energy, NOISE_PERCENTILE) + margin_db
+    return (energy > threshold) & (crossings < max_crossing_rate)
+
+
+def detect_speech(
+    path: Path,
+    margin_db: float,
+    max_crossing_rate: float,
+    min_speech_ms: int,
+    min_silence_ms: int,
+    padding_ms: int,
+) -> List[SpeechSegment]:
+    """
+    Passages parlés d'un fichier WAV PCM 16 bits mono.
+
+    Le fichier est projeté en mémoire (memmap) et analysé par blocs de
+    trames : un enregistrement de plusieurs heures n'est jamais chargé en
+    entier. Les trames parlées sont ensuite lissées : les silences de moins
+    de `min_silence_ms` sont comblés, les passages de moins de
+    `min_speech_ms` écartés, et chaque passage élargi de `padding_ms` pour
+    ne pas couper le début ou la fin d'un mot.
+    """
+    frames, rate = wav_info(path)
+    frame = rate * FRAME_MS // 1000
+    if frames < frame:
+        return []
+    pcm = np.memmap(
+        path, dtype="<i2", mode="r", offset=data_offset(path), shape=(frames,)
+    )
+    block = frame * BLOCK_FRAMES
+    features = [
+        frame_features(pcm[start : start + block], frame)
+        for start in range(0, frames, block)
+    ]
+    energy = np.concatenate([energy for energy, _ in features])
+    crossings = np.concatenate([crossings for _, crossings in features])
+    del pcm
+
+    mask = speech_frames(energy, crossings, margin_db, max_crossing_rate)
+    starts, ends = _merge(*_runs(mask), min_silence_ms // FRAME_MS)
+    long_enough = ends - starts >= min_speech_ms / FRAME_MS
+    starts, ends = starts[long_enough], ends[long_enough]
+    padding = padding_ms // FRAME_MS
+    starts = np.maximum(starts - padding, 0)
+    ends = np.minimum(ends + padding, len(mask))
+    starts, ends = _merge(starts, ends, 1)
+
+    duration_ms = frames * 1000 // rate
+    return [
+        SpeechSegment(int(start) * FRAME_MS, min(int(end) * FRAME_MS, duration_ms))
+        for start, end in zip(starts, ends)
+    ]
@@ -0,0 +1,88 @@
+from pathlib import Path
+from typing import List, NamedTuple
+
+import numpy as np
+
+from app.transcription.audio import data_offset, wav_info
+
+# Échantillons par pic au niveau le plus détaillé (16 ms à 16 kHz)
+FINEST_SAMPLES_PER_PEAK = 256
+# Rapport de résolution entre deux niveaux successifs
+ZOOM_FACTOR = 4
+# Un niveau moins détaillé est ajouté tant que le dernier a plus de pics
+OVERVIEW_PEAKS = 2048
+# Pics calculés à la fois : la mémoire reste bornée pendant la lecture
+BLOCK_PEAKS = 4096
+
+
+class PeakLevel(NamedTuple):
+    """
+    Niveau de détail d'une forme d'onde : minimum et maximum des
+    échantillons (int16) de chaque tranche de `samples_per_peak`.
+    """
+
+    samples_per_peak: int
+    minima: np.ndarray
+    maxima: np.ndarray
+
+
+def _block_peaks(pcm: np.ndarray, size: int):
+    # Compléter la dernière tranche en répétant son dernier échantillon
+    missing = -len(pcm) % size
+    if missing:
+        pcm = np.pad(pcm, (0, missing), mode="edge")
+    buckets = pcm.reshape(-1, size)
+    return buckets.min(axis=1), buckets.max(axis=1)
+
+
+def _zoom_out(level: PeakLevel) -> PeakLevel:
+    minima, _ = _block_peaks(level.minima, ZOOM_FACTOR)
+    _, maxima = _block_peaks(level.maxima, ZOOM_FACTOR)
+    return PeakLevel(level.samples_per_peak * ZOOM_FACTOR, minima, maxima)
+
+
+def compute_peaks(path: Path) -> List[PeakLevel]:
+    """
+    Niveaux de détail de la forme d'onde d'un fichier WAV PCM 16 bits mono,
+    du plus grossier (vue d'ensemble, au plus OVERVIEW_PEAKS pics) au plus
+    fin (FINEST_SAMPLES_PER_PEAK échantillons par pic).
+
+    Le fichier est projeté en mémoire (memmap) et lu par blocs ; chaque
+    niveau est ensuite déduit du précédent, sans relire l'audio.
+    """
+    frames, _ = wav_info(path)
+    if not frames:
+        empty = np.zeros(0, dtype=np.int16)
+        return [PeakLevel(FINEST_SAMPLES_PER_PEAK, empty, empty)]
+    pcm = np.memmap(
+        path, dtype="<i2", mode="r", offset=data_offset(path), shape=(frames,)
+    )
+    block = FINEST_SAMPLES_PER_PEAK * BLOCK_PEAKS
+    peaks = [
+        _block_peaks(pcm[start : start + block], FINEST_SAMPLES_PER_PEAK)
+        for start in range(0, frames, block)
+    ]
+    del pcm
+    levels = [
+        PeakLevel(
+            FINEST_SAMPLES_PER_PEAK,
+            np.concatenate([minima for minima, _ in peaks]),
+            np.concatenate([maxima for _, maxima in peaks]),
+        )
+    ]
+    while len(levels[-1].minima) > OVERVIEW_PEAKS:
+        levels.append(_zoom_out(levels[-1]))
+    return levels[::-1]
+
+
+def encode_peaks(level: PeakLevel, bits: int) -> bytes:
+    """
+    Pics d'un niveau entrelacés (min, max, min, max...), en entiers signés
+    petit-boutistes de 8 ou 16 bits.
+    """
+    interleaved = np.empty(2 * len(level.minima), dtype="<i2")
+    interleaved[0::2] = level.minima
+    interleaved[1::2] = level.maxima
+    if bits == 8:
+        return (interleaved >> 8).astype(np.int8).tobytes()
+    return interleaved.tobytes()
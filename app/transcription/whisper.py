@@ -0,0 +1,42 @@
+from typing import List, Optional
+
+from app.transcription.base import Segment, Transcriber
+
+
+class WhisperTranscriber(Transcriber):
+    """
+    Reconnaissance locale sur CPU avec faster-whisper (modèles Whisper
+    quantifiés en int8). Ne fait pas de diarisation : les passages n'ont pas
+    de locuteur.
+
+    Nécessite le paquet `faster-whisper`, importé seulement si ce backend est
+    configuré. Chaque processus du pool utilise un seul thread : le
+    parallélisme vient du nombre de processus.
+    """
+
+    def __init__(self, model: str, language: Optional[str] = None):
+        try:
+            import numpy
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError(
+                "Le paquet faster-whisper est requis pour "
+                "utiliser TRANSCRIPTION_BACKEND=whisper."
+            ) from e
+        self._numpy = numpy
+        self.model = WhisperModel(
+            model, device="cpu", compute_type="int8", cpu_threads=1, num_workers=1
+        )
+        self.language = language
+
+    def transcribe(self, pcm: bytes, sample_rate: int, offset_ms: int) -> List[Segment]:
+        # faster-whisper attend des échantillons float32 à 16 kHz
+        audio = self._numpy.frombuffer(pcm, dtype=self._numpy.int16)
+        audio = audio.astype(self._numpy.float32) / 32768.0
+        segments, _ = self.model.transcribe(
+            audio, language=self.language, vad_filter=False
+        )
+        return [
+            Segment(int(segment.start * 1000), int(segment.end * 1000), segment.text)
+            for segment in segments
+        ]
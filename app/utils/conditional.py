@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts) -> str:
+    """
+    Construire une ETag faible à partir des éléments identifiant une version.
+    """
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def version_of(moment: Optional[datetime]) -> int:
+    """
+    Représenter un horodatage de modification en microsecondes depuis l'epoch.
+    """
+    return int(moment.timestamp() * 1_000_000) if moment else 0
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # Comparaison faible : le préfixe W/ est ignoré
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # Les dates HTTP ont une précision d'une seconde
+    return last_modified.replace(microsecond=0) <= since
+
+
+def set_validators(
+    response: Response, etag: str, last_modified: Optional[datetime] = None
+) -> dict:
+    """
+    Ajouter les validateurs (ETag, Last-Modified) à la réponse. Le client doit
+    revalider à chaque utilisation (no-cache) : la réponse n'expire pas seule.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            last_modified.astimezone(timezone.utc), usegmt=True
+        )
+    response.headers.update(headers)
+    return headers
+
+
+def check_not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+) -> Optional[Response]:
+    """
+    Ajouter les validateurs (ETag, Last-Modified) à la réponse et, si le client
+    possède déjà cette version, retourner la réponse 304 à renvoyer à la place.
+
+    If-None-Match est prioritaire sur If-Modified-Since.
+    """
+    headers = set_validators(response, etag, last_modified)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    elif if_modified_since is not None and last_modified is not None:
+        not_modified = _not_modified_since(if_modified_since, last_modified)
+    else:
+        not_modified = False
+    return Response(status_code=304, headers=headers) if not_modified else None
@@ -1,14 +1,62 @@
+import hashlib
+import time
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import ExpiredSignatureError, JWTError, jwt
 
+from app.core.cache import CacheStats, MemoryCache
 from app.core.config import settings
 from app.schemas.schema_user import UserRole
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# Payloads déjà vérifiés, par empreinte du token, jusqu'à leur expiration
+token_cache = MemoryCache(
+    settings.TOKEN_CACHE_MAX_ENTRIES,
+    settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    CacheStats(),
+)
+
+
+def decode_token(token: str) -> dict:
+    """
+    Vérifier la signature d'un token et retourner son payload.
+
+    Le payload d'un token valide est gardé en cache jusqu'à son `exp` : les
+    requêtes suivantes avec le même token évitent la vérification HMAC et le
+    décodage. Un token est refusé dès `exp`, qu'il soit en cache ou non.
+
+    Appelée par des dépendances `async def`, dans la boucle d'événements :
+    le cache n'est jamais partagé entre threads.
+
+    Raises:
+        JWTError: Si le token est invalide ou expiré.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        if time.time() < payload["exp"]:
+            token_cache.stats.local_hits += 1
+            return dict(payload)
+        token_cache.delete([key])
+
+    token_cache.stats.misses += 1
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    if "exp" not in payload:
+        # Un token sans date d'expiration n'est jamais mis en cache
+        return payload
+    expires_in = payload["exp"] - time.time()
+    if expires_in <= 0:
+        # python-jose compte en secondes entières et accepte encore le token
+        # pendant la seconde de `exp`
+        raise ExpiredSignatureError("Signature has expired.")
+    if token_cache.max_entries:
+        token_cache.set(key, payload, ttl=expires_in)
+    return dict(payload)
+
 
-def get_current_user_role(token: str = Depends(oauth2_scheme)) -> UserRole:
+async def get_current_user_role(token: str = Depends(oauth2_scheme)) -> UserRole:
     """
     Gets the current user role from the Authorization Bearer token.
 
@@ -28,9 +76,7 @@ def get_current_user_role(token: str = Depends(oauth2_scheme)) -> UserRole:
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_token(token)
         role = payload.get("role")
         if role is None:
             raise credentials_exception
@@ -53,7 +99,9 @@ def require_role(required_role: UserRole):
         HTTPException: If the user role does not match the required role.
     """
 
-    def role_dependency(current_role: UserRole = Depends(get_current_user_role)):
+    async def role_dependency(
+        current_role: UserRole = Depends(get_current_user_role),
+    ):
         if current_role != required_role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -64,7 +112,7 @@ def require_role(required_role: UserRole):
 
 
 # Fonction pour vérifier le token
-def verify_token(token: str = Depends(oauth2_scheme)):
+async def verify_token(token: str = Depends(oauth2_scheme)):
     """
     Verify the JWT token and return the payload.
 
@@ -79,9 +127,7 @@ def verify_token(token: str = Depends(oauth2_scheme)):
     """
 
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_token(token)
         username: str = payload.get("sub")
         if username is None:
             raise HTTPException(
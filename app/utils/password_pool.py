@@ -0,0 +1,79 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.utils.security import get_password_hash, verify_and_update_password
+
+
+class PasswordPoolBusyError(Exception):
+    def __init__(self, message="Trop de demandes d'authentification en cours."):
+        """
+        Initialiser l'exception PasswordPoolBusyError.
+
+        Args:
+            message (str): Le message d'erreur.
+        """
+        super().__init__(message)
+
+
+class PasswordPool:
+    """
+    Pool de processus dédié à bcrypt, avec une file d'attente bornée.
+
+    Le hachage est volontairement coûteux en CPU : exécuté dans les threads
+    du worker HTTP, une rafale de connexions occupe tous les cœurs et ralentit
+    toutes les autres routes. Ici, au plus `workers` hachages tournent en
+    parallèle, et au-delà de `queue_limit` demandes en attente, les nouvelles
+    sont refusées immédiatement (PasswordPoolBusyError) plutôt que de faire
+    grossir la latence de tout le monde.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def verify(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Vérifier un mot de passe. Retourne aussi le nouveau hash à enregistrer
+        si le hash actuel utilise d'anciens paramètres.
+        """
+        return await self._run(
+            verify_and_update_password, plain_password, hashed_password
+        )
+
+    async def hash(self, plain_password: str) -> str:
+        """
+        Hacher un mot de passe avec les paramètres actuels.
+        """
+        return await self._run(get_password_hash, plain_password)
+
+    async def _run(self, function, *args):
+        if self.pending >= self.workers + self.queue_limit:
+            raise PasswordPoolBusyError()
+        if self._executor is None:
+            # spawn : un fork hériterait de la boucle d'événements et des
+            # connexions ouvertes du worker HTTP
+            self._executor = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, function, *args
+            )
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordPool(settings.PASSWORD_WORKERS, settings.PASSWORD_QUEUE_LIMIT)
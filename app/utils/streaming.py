@@ -0,0 +1,124 @@
+import codecs
+import json
+import re
+from pathlib import Path
+from typing import AsyncIterator
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+# Blancs autorisés entre les éléments d'un tableau JSON
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+async def iter_json_records(
+    chunks: AsyncIterator[bytes], ndjson: bool = False
+) -> AsyncIterator[dict]:
+    """
+    Décoder au fil de l'eau un corps de requête contenant soit un tableau JSON
+    d'objets, soit des objets JSON séparés par des retours à la ligne (NDJSON),
+    sans jamais charger le corps complet en mémoire.
+
+    Raises:
+        ValueError: Si le corps n'est pas un JSON valide ou contient autre chose
+            que des objets.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    opened = closed = False
+    # Dernier élément lu dans le tableau : "[", "," ou "record"
+    previous = "["
+
+    async def read_more() -> bool:
+        nonlocal buffer
+        async for chunk in chunks:
+            buffer += text_decoder.decode(chunk)
+            return True
+        buffer += text_decoder.decode(b"", final=True)
+        return False
+
+    def check(record):
+        if not isinstance(record, dict):
+            raise ValueError("Chaque élément doit être un objet JSON")
+        return record
+
+    more = True
+    while more:
+        more = await read_more()
+        if ndjson:
+            *lines, buffer = buffer.split("\n")
+            if not more:
+                lines.append(buffer)
+                buffer = ""
+            for line in lines:
+                if line.strip():
+                    yield check(json.loads(line))
+            continue
+
+        pos = 0
+        while not closed:
+            if not opened:
+                stripped = buffer.lstrip()
+                if not stripped:
+                    break
+                if stripped[0] != "[":
+                    raise ValueError("Le corps doit être un tableau JSON")
+                pos = len(buffer) - len(stripped) + 1
+                opened = True
+                continue
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            char = buffer[pos]
+            if char == "]" and previous != ",":
+                closed = True
+                pos += 1
+                break
+            if previous == "record":
+                if char != ",":
+                    raise ValueError("Virgule attendue entre deux éléments")
+                previous = ","
+                pos += 1
+                continue
+            if char in ",]":
+                raise ValueError("Élément attendu dans le tableau JSON")
+            try:
+                record, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if more:
+                    break  # Objet incomplet : attendre la suite du flux
+                raise
+            previous = "record"
+            yield check(record)
+        buffer = buffer[pos:]
+
+    if not ndjson and (not closed or buffer.strip()):
+        raise ValueError("Tableau JSON incomplet ou suivi de données inattendues")
+
+
+async def iter_upload_file(
+    file: UploadFile, size: int = 1024 * 1024
+) -> AsyncIterator[bytes]:
+    """
+    Lire un fichier reçu en formulaire par morceaux de `size` octets ; les
+    lectures sur disque s'exécutent hors de la boucle d'événements.
+    """
+    while True:
+        chunk = await file.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def write_file(path: Path, chunks: AsyncIterator[bytes]):
+    """
+    Écrire un flux dans un fichier au fil de sa réception ; les écritures
+    sur disque s'exécutent hors de la boucle d'événements.
+    """
+    file = await run_in_threadpool(open, path, "wb")
+    try:
+        async for chunk in chunks:
+            await run_in_threadpool(file.write, chunk)
+    finally:
+        await run_in_threadpool(file.close)
@@ -0,0 +1,189 @@
+"""
+Worker de la file de travaux.
+
+Usage :
+    python -m app.worker [type ...] [--concurrency N]
+
+Exécute les travaux des types indiqués (tous les types connus par défaut).
+Autant de workers que voulu peuvent tourner, sur un ou plusieurs nœuds :
+ils ne partagent que PostgreSQL. SIGTERM ou SIGINT arrête le worker
+proprement : il ne prend plus de travaux et remet en file ceux en cours.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import traceback
+from contextlib import suppress
+from typing import Dict
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.logging_config import setup_logging
+from app.crud.crud_job import JOBS_CHANNEL, crud_job
+from app.db.models import Job
+from app.db.session import SessionLocal
+from app.jobs import JOB_HANDLERS, JobHandler
+from app.transcription.pipeline import transcription_pool
+
+logger = logging.getLogger(__name__)
+
+LISTEN_RETRY_DELAY = 5.0
+
+
+class Worker:
+    """
+    Boucle de réservation et d'exécution des travaux.
+
+    Le worker réserve des travaux tant qu'il lui reste de la place
+    (`concurrency`), puis attend qu'un travail se termine, qu'un nouveau soit
+    annoncé (NOTIFY) ou JOB_POLL_INTERVAL (travaux différés ou à réessayer).
+    Un signe de vie est enregistré régulièrement pour ses travaux en cours ;
+    ceux d'un worker silencieux depuis JOB_LEASE_TIMEOUT sont repris.
+    """
+
+    def __init__(self, handlers: Dict[str, JobHandler], concurrency: int):
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.limits = {t: handler.concurrency for t, handler in handlers.items()}
+        self.running: Dict[asyncio.Task, Job] = {}
+        self.wakeup = asyncio.Event()
+        self.stopping = asyncio.Event()
+
+    async def run(self):
+        logger.info(
+            "Worker %s : types %s, %d travaux simultanés",
+            self.name,
+            ", ".join(sorted(self.handlers)),
+            self.concurrency,
+        )
+        background = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._heartbeat()),
+        ]
+        try:
+            while not self.stopping.is_set():
+                self.wakeup.clear()
+                try:
+                    await self._claim()
+                except Exception:
+                    logger.exception("Réservation de travaux impossible")
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(
+                        self.wakeup.wait(), settings.JOB_POLL_INTERVAL
+                    )
+        finally:
+            for task in background:
+                task.cancel()
+            await self._release()
+
+    async def _claim(self):
+        while len(self.running) < self.concurrency:
+            async with SessionLocal() as db:
+                job = await crud_job.claim(db, self.limits, self.name)
+            if job is None:
+                return
+            task = asyncio.create_task(self._execute(job))
+            self.running[task] = job
+            task.add_done_callback(self._done)
+
+    def stop(self):
+        self.stopping.set()
+        self.wakeup.set()
+
+    def _done(self, task: asyncio.Task):
+        self.running.pop(task, None)
+        self.wakeup.set()
+
+    async def _execute(self, job: Job):
+        handler = self.handlers[job.type]
+        try:
+            result = await handler.function(job.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Travail %d (%s) en échec", job.id, job.type)
+            async with SessionLocal() as db:
+                await crud_job.fail(db, job, traceback.format_exc(limit=5))
+            return
+        async with SessionLocal() as db:
+            await crud_job.succeed(db, job, result)
+
+    async def _release(self):
+        jobs = list(self.running.values())
+        for task in list(self.running):
+            task.cancel()
+        await asyncio.gather(*self.running, return_exceptions=True)
+        for job in jobs:
+            async with SessionLocal() as db:
+                await crud_job.release(db, job)
+
+    async def _heartbeat(self):
+        interval = settings.JOB_LEASE_TIMEOUT / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with SessionLocal() as db:
+                    await crud_job.heartbeat(
+                        db, (job.id for job in self.running.values()), self.name
+                    )
+                    if await crud_job.requeue_expired(db, settings.JOB_LEASE_TIMEOUT):
+                        self.wakeup.set()
+            except Exception:
+                logger.exception("Signe de vie des travaux en cours impossible")
+
+    async def _listen(self):
+        dsn = make_url(settings.POSTGRES_URL).set(drivername="postgresql")
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(
+                    dsn.render_as_string(hide_password=False)
+                )
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(JOBS_CHANNEL, self._on_notification)
+                await closed.wait()
+            except asyncio.CancelledError:
+                if connection is not None:
+                    await connection.close()
+                raise
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("Écoute des nouveaux travaux interrompue : %s", e)
+            await asyncio.sleep(LISTEN_RETRY_DELAY)
+
+    def _on_notification(self, connection, pid, channel, payload: str):
+        if payload in self.handlers:
+            self.wakeup.set()
+
+
+async def main(types, concurrency: int):
+    unknown = set(types) - set(JOB_HANDLERS)
+    if unknown:
+        raise SystemExit(f"Types de travaux inconnus : {', '.join(sorted(unknown))}")
+    handlers = {t: JOB_HANDLERS[t] for t in types or JOB_HANDLERS}
+    worker = Worker(handlers, concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        transcription_pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker de la file de travaux")
+    parser.add_argument("types", nargs="*", help="Types de travaux à exécuter")
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY
+    )
+    arguments = parser.parse_args()
+    setup_logging()
+    asyncio.run(main(arguments.types, arguments.concurrency))
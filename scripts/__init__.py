@@ -0,0 +1 @@
+# Vérifications et mesures lancées à la main, hors de l'application
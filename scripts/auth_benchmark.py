@@ -0,0 +1,80 @@
+"""
+Micro-benchmark de l'authentification par requête.
+
+Usage :
+    python -m scripts.auth_benchmark [nombre_de_requêtes]
+
+Mesure le coût des dépendances `verify_token` et `get_current_user_role`,
+appelées ensemble comme sur une route protégée par rôle, sans puis avec le
+cache des payloads vérifiés. Vérifie d'abord qu'un token en cache est refusé
+dès son `exp` (AssertionError sinon), puis se termine en erreur si le cache
+n'accélère pas les appels.
+"""
+
+import asyncio
+import sys
+import time
+from datetime import timedelta
+
+from fastapi import HTTPException
+
+from app.utils.dependencies import get_current_user_role, token_cache, verify_token
+from app.utils.security import create_access_token
+
+
+async def _authenticate(token: str):
+    await verify_token(token)
+    await get_current_user_role(token)
+
+
+async def _per_request(token: str, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        await _authenticate(token)
+    return (time.perf_counter() - start) / requests
+
+
+async def check_expires_at_exp():
+    """
+    Un token mis en cache est accepté jusqu'à son `exp`, puis refusé dès
+    `exp` sans attendre l'éviction de l'entrée.
+    """
+    token = create_access_token(
+        {"sub": "benchmark", "role": "user"}, timedelta(seconds=2)
+    )
+    await _authenticate(token)
+    hits = token_cache.stats.local_hits
+    exp = (await verify_token(token))["exp"]
+    assert token_cache.stats.local_hits == hits + 1, "Token absent du cache"
+    await asyncio.sleep(max(exp - time.time(), 0))
+    try:
+        await verify_token(token)
+    except HTTPException as e:
+        assert e.status_code == 401, f"Code inattendu : {e.status_code}"
+    else:
+        raise AssertionError("Token en cache accepté après son exp")
+
+
+async def run(requests: int) -> bool:
+    await check_expires_at_exp()
+    token = create_access_token(
+        {"sub": "benchmark", "role": "user"}, timedelta(minutes=5)
+    )
+    max_entries = token_cache.max_entries
+    try:
+        token_cache.max_entries = 0
+        token_cache.clear()
+        uncached = await _per_request(token, requests)
+    finally:
+        token_cache.max_entries = max_entries
+    cached = await _per_request(token, requests)
+
+    print(f"sans cache : {uncached * 1e6:8.1f} µs par requête")
+    print(f"avec cache : {cached * 1e6:8.1f} µs par requête")
+    print(f"gain       : x{uncached / cached:.1f}")
+    return cached < uncached
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    sys.exit(0 if asyncio.run(run(count)) else 1)
@@ -0,0 +1,96 @@
+"""
+Benchmark du hachage des mots de passe lors d'une rafale de connexions.
+
+Usage :
+    python -m scripts.password_benchmark [connexions_simultanées]
+
+Lance une rafale de vérifications bcrypt, comme autant de logins
+simultanés, d'abord dans les threads du worker (ancien comportement) puis
+dans le pool de processus dédié. Pendant la rafale, une requête légère est
+simulée toutes les 10 ms pour mesurer la latence des autres routes.
+Affiche le débit, le p99 des logins acceptés, le nombre de refus (503) et
+le p99 des requêtes légères.
+"""
+
+import asyncio
+import json
+import statistics
+import sys
+import time
+from typing import List
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.utils.password_pool import PasswordPoolBusyError, password_pool
+from app.utils.security import get_password_hash, verify_password
+
+PROBE_INTERVAL = 0.01
+PROBE_PAYLOAD = [{"id": i, "name": f"PNJ {i}"} for i in range(200)]
+
+
+def _p99(samples: List[float]) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100)[98]
+
+
+async def _probe(latencies: List[float], stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        json.dumps(PROBE_PAYLOAD)
+        latencies.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+async def _burst(label: str, verify, logins: int, hashed: str):
+    latencies: List[float] = []
+    probes: List[float] = []
+    rejected = 0
+
+    async def login():
+        nonlocal rejected
+        start = time.perf_counter()
+        try:
+            valid = await verify("mot de passe", hashed)
+        except PasswordPoolBusyError:
+            rejected += 1
+            return
+        assert valid, "Mot de passe correct refusé"
+        latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(probes, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+
+    print(
+        f"{label:<10} {len(latencies) / elapsed:6.1f} logins/s"
+        f"  p99 login {_p99(latencies) * 1000:7.0f} ms"
+        f"  refusés {rejected:3d}"
+        f"  p99 autres routes {_p99(probes) * 1000:6.1f} ms"
+    )
+
+
+async def run(logins: int):
+    hashed = get_password_hash("mot de passe")
+    await _burst(
+        "threads",
+        lambda password, hashed: run_in_threadpool(verify_password, password, hashed),
+        logins,
+        hashed,
+    )
+    # Démarrer les processus avant la mesure
+    await asyncio.gather(
+        *(password_pool.hash("échauffement") for _ in range(password_pool.workers))
+    )
+    try:
+        await _burst("processus", password_pool.verify, logins, hashed)
+    finally:
+        password_pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 64))